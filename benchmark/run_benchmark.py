@@ -0,0 +1,227 @@
+""" Offline benchmark of the aggregation and response pipeline of AWSProwlerManager
+
+    python benchmark/run_benchmark.py --findings 100000 --output bench.json
+    python benchmark/run_benchmark.py --findings 100000 --baseline bench.json
+
+No AWS access and no prowler scan is needed, the findings are generated by benchmark/synthetic.py.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import importlib.util
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from spaceone.core import config
+from synthetic import make_compliance_framework_info, make_check_results, parse_status_mix
+
+_MATCH_RULES = {'1': ['reference.resource_id', 'provider', 'cloud_service_type', 'cloud_service_group', 'account']}
+
+
+def main():
+    args = _parse_args()
+
+    config.init_conf(package='cloudforet.plugin', service='plugin')
+    config.set_service_config()
+
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager, np
+    from cloudforet.plugin.info.collector_info import ResourceInfo
+
+    cloud_service_types = args.frameworks.split(',')
+    check_results = make_check_results(cloud_service_types, args.findings, args.checks, args.requirements,
+                                       args.regions, parse_status_mix(args.status_mix), args.seed)
+
+    manager = AWSProwlerManager()
+    manager.cloud_service_types = cloud_service_types
+    manager.cloud_service_type = cloud_service_types[0]
+    manager.compliance_framework_info = make_compliance_framework_info(cloud_service_types, args.requirements)
+    manager.max_findings_per_resource = args.max_findings_per_resource
+    manager.finding_detail = args.finding_detail
+
+    aggregation_modes = ['dict', 'columnar'] if np is not None else ['dict']
+    benchmarks = {}
+
+    for aggregation_mode in aggregation_modes:
+        manager.aggregation_mode = aggregation_mode
+        benchmarks[f'make_compliance_results[{aggregation_mode}]'] = _measure(
+            lambda: manager.make_compliance_results(check_results), args.repeat, len(check_results))
+
+    requirements = manager._aggregate(check_results)
+    benchmarks['_convert_results'] = _measure(
+        lambda: manager._convert_results(requirements), args.repeat, len(requirements))
+
+    compliance_results = manager._convert_results(requirements)
+    for response_validation in ['fast', 'full']:
+        config.set_global(RESPONSE_VALIDATION=response_validation)
+        benchmarks[f'make_response[{response_validation}]'] = _measure(
+            lambda: [manager.make_response(result, _MATCH_RULES) for result in compliance_results],
+            args.repeat, len(compliance_results))
+
+    config.set_global(RESPONSE_VALIDATION='fast')
+    responses = [manager.make_response(result, _MATCH_RULES) for result in compliance_results]
+    benchmarks['ResourceInfo'] = _measure(
+        lambda: [ResourceInfo(response) for response in responses], args.repeat, len(responses))
+
+    benchmarks.update(_measure_finding_details(manager, check_results, args.repeat))
+
+    if importlib.util.find_spec('prowler') is not None:
+        benchmarks.update(_measure_collect_setup(cloud_service_types, args.repeat))
+
+    report = {
+        'environment': _get_environment(),
+        'parameters': vars(args),
+        'benchmarks': benchmarks
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            _print_comparison(json.load(f), report)
+    else:
+        _print_report(report)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the aggregation and response pipeline.')
+    parser.add_argument('--findings', type=int, default=50000, help='Number of synthetic findings')
+    parser.add_argument('--checks', type=int, default=300, help='Number of distinct checks')
+    parser.add_argument('--requirements', type=int, default=100, help='Number of requirements per framework')
+    parser.add_argument('--regions', type=int, default=17, help='Number of regions')
+    parser.add_argument('--frameworks', default='CIS-1.5', help='Comma separated cloud service types')
+    parser.add_argument('--status-mix', default='PASS=0.6,FAIL=0.3,INFO=0.1', help='Weights of the finding statuses')
+    parser.add_argument('--max-findings-per-resource', type=int, default=0)
+    parser.add_argument('--finding-detail', choices=['all', 'fail_only', 'none'], default='all')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs per benchmark')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare with the JSON results of a previous run')
+    return parser.parse_args()
+
+
+def _measure_finding_details(manager, check_results: list, repeat: int) -> dict:
+    """ Serialization of the responses of every finding detail level, from the compliance results to the bytes
+    sent over gRPC; `bytes` is the size of the serialized responses of one collect """
+    from cloudforet.plugin.info.collector_info import ResourceInfo
+
+    finding_detail = manager.finding_detail
+    benchmarks = {}
+
+    try:
+        for detail in ['all', 'fail_only', 'none']:
+            manager.finding_detail = detail
+            compliance_results = manager.make_compliance_results(check_results)
+
+            sizes = []
+
+            def _serialize():
+                sizes.append(sum(len(ResourceInfo(manager.make_response(result, _MATCH_RULES)).SerializeToString())
+                                 for result in compliance_results))
+
+            result = _measure(_serialize, repeat, len(compliance_results))
+            result['bytes'] = sizes[-1]
+            benchmarks[f'serialization[{detail}]'] = result
+    finally:
+        manager.finding_detail = finding_detail
+
+    return benchmarks
+
+
+def _measure_collect_setup(cloud_service_types: list, repeat: int) -> dict:
+    """ Framework loading of a collect with the compliance registry, against loading every framework of the
+    installed prowler on each collect as before the registry; only measured when prowler is installed """
+    from prowler.lib.check.check import bulk_load_compliance_frameworks
+    from cloudforet.plugin.connector.aws_prowler_connector import AWSProwlerConnector
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+    from cloudforet.plugin.model.prowler.collector import COMPLIANCE_FRAMEWORKS
+
+    manager = AWSProwlerManager()
+    manager.cloud_service_types = cloud_service_types
+    compliance_frameworks = AWSProwlerConnector._get_compliance_frameworks(cloud_service_types)
+
+    def _setup_with_registry():
+        manager._check_compliance_framework()
+        manager._load_compliance_framework_info()
+        AWSProwlerConnector._get_scan_checks(compliance_frameworks)
+
+    def _setup_with_bulk_load():
+        bulk_compliance_frameworks = bulk_load_compliance_frameworks('aws')
+        for cloud_service_type in cloud_service_types:
+            requirements = bulk_compliance_frameworks[COMPLIANCE_FRAMEWORKS['aws'][cloud_service_type]].Requirements
+            {requirement.Id: requirement.Description for requirement in requirements}
+            {check_id for requirement in requirements for check_id in requirement.Checks}
+
+    # The registry loads the frameworks once per process, the collects after the first one are measured.
+    _setup_with_registry()
+
+    return {
+        'collect_setup[registry]': _measure(_setup_with_registry, repeat, len(cloud_service_types)),
+        'collect_setup[bulk_load]': _measure(_setup_with_bulk_load, repeat, len(cloud_service_types))
+    }
+
+
+def _measure(func, repeat: int, items: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started_at)
+
+    return {
+        'items': items,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+        'items_per_sec': items / min(timings) if min(timings) > 0 else None
+    }
+
+
+def _get_environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    }
+
+
+def _print_report(report: dict):
+    print(f'{"benchmark":<40} {"items":>8} {"min (s)":>10} {"median (s)":>11} {"items/s":>12} {"bytes":>12}')
+    for name, result in report['benchmarks'].items():
+        print(f'{name:<40} {result["items"]:>8} {result["min"]:>10.4f} {result["median"]:>11.4f} '
+              f'{result["items_per_sec"] or 0:>12.0f} {result.get("bytes", ""):>12}')
+
+
+def _print_comparison(baseline: dict, report: dict):
+    print(f'{"benchmark":<40} {"baseline (s)":>13} {"current (s)":>12} {"change":>8} {"bytes change":>13}')
+    for name, result in report['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            print(f'{name:<40} {"-":>13} {result["min"]:>12.4f} {"-":>8}')
+            continue
+
+        baseline_result = baseline['benchmarks'][name]
+        baseline_min = baseline_result['min']
+        change = (result['min'] - baseline_min) / baseline_min * 100 if baseline_min > 0 else 0
+        bytes_change = ''
+        if baseline_result.get('bytes') and 'bytes' in result:
+            bytes_change = f'{(result["bytes"] - baseline_result["bytes"]) / baseline_result["bytes"] * 100:+.1f}%'
+
+        print(f'{name:<40} {baseline_min:>13.4f} {result["min"]:>12.4f} {change:>+7.1f}% {bytes_change:>13}')
+
+
+if __name__ == '__main__':
+    main()
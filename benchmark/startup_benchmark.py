@@ -0,0 +1,124 @@
+""" Startup overhead of a prowler scan in the subprocess and the worker execution modes
+
+    python benchmark/startup_benchmark.py --repeat 10
+    python benchmark/startup_benchmark.py --compliance cis_1.5_aws --output startup.json
+
+The startup is everything a scan does before its first check runs: starting the interpreter, importing prowler,
+parsing the arguments, loading the check metadata and compliance frameworks and selecting the checks.
+No AWS access is needed, but prowler must be installed.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_benchmark import _get_environment
+
+# Same startup as `prowler aws ...` up to the execution of the checks
+_SUBPROCESS_STARTUP = '''
+import sys
+from prowler.lib.cli.parser import ProwlerArgumentParser
+from prowler.lib.check.check import (bulk_load_checks_metadata, bulk_load_compliance_frameworks,
+                                     update_checks_metadata_with_compliance)
+from prowler.lib.check.checks_loader import load_checks_to_execute
+
+prowler_args = ProwlerArgumentParser().parse(['prowler'] + sys.argv[1:])
+bulk_checks_metadata = bulk_load_checks_metadata(prowler_args.provider)
+bulk_compliance_frameworks = bulk_load_compliance_frameworks(prowler_args.provider)
+bulk_checks_metadata = update_checks_metadata_with_compliance(bulk_compliance_frameworks, bulk_checks_metadata)
+load_checks_to_execute(bulk_checks_metadata, bulk_compliance_frameworks, prowler_args.checks_file,
+                       prowler_args.checks, prowler_args.services, prowler_args.severity, prowler_args.compliance,
+                       prowler_args.categories, prowler_args.provider)
+'''
+
+
+def main():
+    args = _parse_args()
+
+    from cloudforet.plugin.lib import prowler_worker
+
+    if not prowler_worker._is_prowler_installed():
+        sys.exit('prowler is not installed.')
+
+    prowler_args = ['aws', '-M', 'json', '-o', '/tmp', '-F', 'output', '-z']
+    if args.compliance:
+        prowler_args += ['--compliance', args.compliance]
+
+    subprocess_times = [_measure_subprocess(prowler_args) for _ in range(args.repeat)]
+
+    pool = prowler_worker._get_pool(1)
+    started_at = time.perf_counter()
+    pool.submit(_load_checks_in_worker, prowler_args).result()
+    first_worker_time = time.perf_counter() - started_at
+
+    worker_times = []
+    for _ in range(args.repeat):
+        started_at = time.perf_counter()
+        pool.submit(_load_checks_in_worker, prowler_args).result()
+        worker_times.append(time.perf_counter() - started_at)
+
+    prowler_worker._reset_pool()
+
+    report = {
+        'environment': _get_environment(),
+        'parameters': vars(args),
+        'benchmarks': {
+            'subprocess': _summarize(subprocess_times),
+            # Includes the start of the worker process and the preload, paid once per plugin process
+            'worker[first]': {'seconds': first_worker_time},
+            'worker': _summarize(worker_times)
+        }
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    benchmarks = report['benchmarks']
+    for name, result in benchmarks.items():
+        print(f'{name:<20} {result["seconds"]:.4f}s')
+
+    print(f'{"saved per scan":<20} {benchmarks["subprocess"]["seconds"] - benchmarks["worker"]["seconds"]:.4f}s')
+
+
+def _measure_subprocess(prowler_args: list) -> float:
+    started_at = time.perf_counter()
+    subprocess.run([sys.executable, '-c', _SUBPROCESS_STARTUP] + prowler_args, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started_at
+
+
+def _load_checks_in_worker(prowler_args: list) -> int:
+    from prowler.lib.cli.parser import ProwlerArgumentParser
+    from cloudforet.plugin.lib import prowler_worker
+
+    _, checks_to_execute = prowler_worker._load_checks_to_execute(
+        ProwlerArgumentParser().parse(['prowler'] + prowler_args))
+    prowler_worker._purge_service_modules('aws')
+    return len(checks_to_execute)
+
+
+def _summarize(seconds: list) -> dict:
+    return {
+        'seconds': statistics.median(seconds),
+        'min': min(seconds),
+        'max': max(seconds)
+    }
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Startup overhead of a prowler scan per execution mode.')
+    parser.add_argument('--compliance', help='Prowler compliance framework to select the checks, e.g. cis_1.5_aws')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main()
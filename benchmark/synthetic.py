@@ -0,0 +1,85 @@
+import random
+from typing import Dict, List
+
+__all__ = ['make_compliance_framework_info', 'make_check_results', 'parse_status_mix']
+
+_SEVERITIES = ['critical', 'high', 'medium', 'low', 'informational']
+
+
+def parse_status_mix(status_mix: str) -> Dict[str, float]:
+    """ 'PASS=0.6,FAIL=0.3,INFO=0.1' -> {'PASS': 0.6, 'FAIL': 0.3, 'INFO': 0.1} """
+    weights = {}
+    for item in status_mix.split(','):
+        status, weight = item.split('=')
+        weights[status.strip().upper()] = float(weight)
+
+    return weights
+
+
+def make_compliance_framework_info(cloud_service_types: List[str], requirements: int) -> Dict[str, Dict[str, str]]:
+    """ Requirement descriptions of every framework, as AWSProwlerManager keeps them """
+    return {
+        cloud_service_type: {
+            _make_requirement_id(index): f'Synthetic requirement {index} of {cloud_service_type}'
+            for index in range(requirements)
+        }
+        for cloud_service_type in cloud_service_types
+    }
+
+
+def make_check_results(cloud_service_types: List[str], findings: int, checks: int, requirements: int,
+                       regions: int, status_mix: Dict[str, float], seed: int = 1) -> List[dict]:
+    """ Findings shaped like prowler's output.json, mapped to the synthetic requirements of every framework """
+    rand = random.Random(seed)
+
+    # Every check belongs to 1 ~ 3 requirements per framework.
+    check_requirements = {}
+    for check_index in range(checks):
+        check_id = f'synthetic_check_{check_index}'
+        check_requirements[check_id] = {
+            cloud_service_type: sorted({_make_requirement_id(rand.randrange(requirements))
+                                        for _ in range(rand.randint(1, 3))})
+            for cloud_service_type in cloud_service_types
+        }
+
+    check_ids = list(check_requirements.keys())
+    check_severities = {check_id: rand.choice(_SEVERITIES) for check_id in check_ids}
+    check_services = {check_id: f'service{index % 20}' for index, check_id in enumerate(check_ids)}
+    region_codes = [f'region-{index}' for index in range(regions)]
+    statuses = list(status_mix.keys())
+    status_weights = list(status_mix.values())
+
+    check_results = []
+    for index in range(findings):
+        check_id = rand.choice(check_ids)
+        check_results.append({
+            'AssessmentStartTime': '2023-01-01T00:00:00.000000',
+            'FindingUniqueId': f'prowler-aws-{check_id}-123456789012-{index}',
+            'Provider': 'aws',
+            'CheckID': check_id,
+            'CheckTitle': f'Synthetic check {check_id}',
+            'CheckType': ['Software and Configuration Checks'],
+            'ServiceName': check_services[check_id],
+            'SubServiceName': '',
+            'Status': rand.choices(statuses, status_weights)[0],
+            'StatusExtended': f'Synthetic status of resource {index}.',
+            'Severity': check_severities[check_id],
+            'ResourceType': 'AwsSyntheticResource',
+            'Description': f'Synthetic description of {check_id}.',
+            'Risk': 'Synthetic risk.',
+            'Remediation': {
+                'Code': {'NativeIaC': '', 'Terraform': '', 'CLI': '', 'Other': ''},
+                'Recommendation': {'Text': 'Synthetic recommendation.', 'Url': 'https://example.com'}
+            },
+            'Compliance': check_requirements[check_id],
+            'AccountId': '123456789012',
+            'Region': rand.choice(region_codes),
+            'ResourceId': f'synthetic-resource-{index}',
+            'ResourceArn': f'arn:aws:synthetic::123456789012:resource/{index}'
+        })
+
+    return check_results
+
+
+def _make_requirement_id(index: int) -> str:
+    return f'{index // 10 + 1}.{index % 10 + 1}'
@@ -18,3 +18,86 @@ LOG = {
         }
     }
 }
+
+# Connectors looked up by name; a 'backend' (e.g. 'module.FakeIdentityConnector') replaces the implementation
+CONNECTORS = {
+    'AWSIdentityConnector': {}
+}
+
+# Seconds a successful credential verification (STS identity call) is reused for the same credentials
+VERIFY_CACHE_TTL = 300
+
+# Command used to start prowler in the subprocess mode (replaceable with a fake prowler executable)
+PROWLER_COMMAND = ['python3', '-m', 'prowler']
+
+# Limits of every prowler subprocess (0 = unlimited): wall clock seconds, resident memory of its process group
+# and address space in bytes, and the size of the stderr tail kept for error messages.
+# They do not apply to the worker mode, whose long-lived workers run the scans of every collect.
+PROWLER_LIMITS = {
+    'timeout': 3 * 60 * 60,
+    'max_rss': 4 * 1024 * 1024 * 1024,
+    'max_virtual_memory': 0,
+    'stderr_tail_size': 64 * 1024
+}
+
+# Prowler execution mode: 'subprocess' (python3 -m prowler per scan) or 'worker' (pre-imported worker process,
+# without the PROWLER_LIMITS)
+PROWLER_EXECUTION_MODE = 'subprocess'
+PROWLER_WORKER_COUNT = 1
+
+# Maximum number of scans running at the same time in this process (the rest wait in a per-domain fair queue)
+MAX_CONCURRENT_SCANS = 4
+
+# Raw scan results reused by collects of the same account, credentials, regions and prowler version
+SCAN_CACHE = {
+    'enabled': True,
+    'path': '/tmp/prowler-scan-cache',
+    'ttl': 600,
+    'max_size': 1024 * 1024 * 1024
+}
+
+# Findings of the completed units (region x service) of checkpointed scans, resumed within the TTL
+CHECKPOINT_STORE = {
+    'path': '/tmp/prowler-checkpoints',
+    'ttl': 12 * 60 * 60
+}
+
+# Max age in seconds of the stored findings of slow-changing checks (check ids or glob patterns), reused by collects
+# with `reuse_fresh_checks` instead of scanning them again; checks without a max age always run
+CHECK_FRESHNESS = {
+    'path': '/tmp/prowler-check-results',
+    'default_max_age': 0,
+    'max_ages': {
+        'iam_password_policy_*': 24 * 60 * 60,
+        'iam_root_mfa_enabled': 24 * 60 * 60,
+        'iam_root_hardware_mfa_enabled': 24 * 60 * 60,
+        'account_*': 7 * 24 * 60 * 60,
+        'cloudtrail_multi_region_enabled': 6 * 60 * 60,
+        'cloudtrail_log_file_validation_enabled': 6 * 60 * 60,
+        'cloudtrail_kms_encryption_enabled': 6 * 60 * 60
+    }
+}
+
+# Content hashes of the resources emitted by delta collects (one file per domain, account and cloud service type);
+# every resource is emitted again once the last full emit of its scope is older than `full_emit_interval` seconds
+DELTA_STORE = {
+    'path': '/tmp/prowler-delta-store',
+    'max_scopes': 10000,
+    'full_emit_interval': 7 * 24 * 60 * 60
+}
+
+# Collects with `replay_file` aggregate a stored prowler output (JSON, compressed or archived) inside `path`
+# instead of scanning; disabled by default since the file is read from the plugin's file system
+REPLAY = {
+    'enabled': False,
+    'path': '/tmp/prowler-replay'
+}
+
+# Phase timings and counts of every collect, written in the Prometheus text format (e.g. for node_exporter)
+METRICS = {
+    'enabled': True,
+    'path': '/tmp/prowler-collector-metrics/prowler_collector.prom'
+}
+
+# Collect response validation: 'fast' (envelope only) or 'full' (pydantic validation of the whole resource, for debugging)
+RESPONSE_VALIDATION = 'fast'
@@ -0,0 +1 @@
+from cloudforet.plugin.connector.aws_identity_connector import AWSIdentityConnector
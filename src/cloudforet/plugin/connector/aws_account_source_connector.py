@@ -0,0 +1,66 @@
+import logging
+from typing import List
+
+from spaceone.core.connector import BaseConnector
+from cloudforet.plugin.error.custom import *
+
+__all__ = ['AccountSourceConnector', 'StaticAccountSourceConnector', 'AWSOrganizationsAccountSourceConnector',
+           'ACCOUNT_SOURCES']
+
+_LOGGER = logging.getLogger(__name__)
+_DEFAULT_MEMBER_ROLE_NAME = 'OrganizationAccountAccessRole'
+
+
+class AccountSourceConnector(BaseConnector):
+    """ Lists the member accounts of a batch collect as {'account_id': str, 'role_arn': str} """
+
+    def list_accounts(self, options: dict, secret_data: dict) -> List[dict]:
+        raise NotImplementedError('Method not implemented!')
+
+
+class StaticAccountSourceConnector(AccountSourceConnector):
+    """ Member accounts given by `options.member_role_arns` """
+
+    def list_accounts(self, options: dict, secret_data: dict) -> List[dict]:
+        accounts = []
+        for role_arn in options.get('member_role_arns', []):
+            if role_arn.count(':') < 5:
+                raise ERROR_INVALID_PARAMETER(key='options.member_role_arns', reason=f'Invalid role arn. ({role_arn})')
+
+            accounts.append({'account_id': role_arn.split(':')[4], 'role_arn': role_arn})
+
+        return accounts
+
+
+class AWSOrganizationsAccountSourceConnector(AccountSourceConnector):
+    """ Active member accounts of the AWS Organization the credentials belong to """
+
+    def list_accounts(self, options: dict, secret_data: dict) -> List[dict]:
+        import boto3
+
+        member_role_name = options.get('member_role_name', _DEFAULT_MEMBER_ROLE_NAME)
+        session = boto3.Session(aws_access_key_id=secret_data['aws_access_key_id'],
+                                aws_secret_access_key=secret_data['aws_secret_access_key'])
+
+        accounts = []
+        try:
+            for page in session.client('organizations').get_paginator('list_accounts').paginate():
+                for account in page['Accounts']:
+                    if account['Status'] != 'ACTIVE':
+                        continue
+
+                    accounts.append({
+                        'account_id': account['Id'],
+                        'role_arn': f'arn:aws:iam::{account["Id"]}:role/{member_role_name}'
+                    })
+        except Exception as e:
+            raise ERROR_ACCOUNT_SOURCE_FAILED(reason=str(e))
+
+        _LOGGER.debug(f'[list_accounts] organization accounts: {len(accounts)}')
+        return accounts
+
+
+ACCOUNT_SOURCES = {
+    'static': StaticAccountSourceConnector,
+    'organizations': AWSOrganizationsAccountSourceConnector
+}
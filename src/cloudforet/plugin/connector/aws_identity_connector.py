@@ -0,0 +1,39 @@
+import logging
+
+from spaceone.core.connector import BaseConnector
+from cloudforet.plugin.error.custom import *
+
+__all__ = ['AWSIdentityConnector']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AWSIdentityConnector(BaseConnector):
+    """ Resolves the identity of AWS credentials with STS, assuming the role first if one is given """
+
+    def get_caller_identity(self, secret_data: dict) -> dict:
+        import boto3
+
+        session = boto3.Session(aws_access_key_id=secret_data['aws_access_key_id'],
+                                aws_secret_access_key=secret_data['aws_secret_access_key'])
+
+        try:
+            if 'role_arn' in secret_data:
+                assume_role_params = {
+                    'RoleArn': secret_data['role_arn'],
+                    'RoleSessionName': 'cloudforet-prowler-verify'
+                }
+                if 'external_id' in secret_data:
+                    assume_role_params['ExternalId'] = secret_data['external_id']
+
+                credentials = session.client('sts').assume_role(**assume_role_params)['Credentials']
+                session = boto3.Session(aws_access_key_id=credentials['AccessKeyId'],
+                                        aws_secret_access_key=credentials['SecretAccessKey'],
+                                        aws_session_token=credentials['SessionToken'])
+
+            identity = session.client('sts').get_caller_identity()
+        except Exception as e:
+            raise ERROR_AUTHENTICATE_FAILURE(message=str(e))
+
+        _LOGGER.debug(f'[get_caller_identity] account: {identity["Account"]}')
+        return {'account_id': identity['Account'], 'arn': identity['Arn']}
@@ -1,27 +1,79 @@
 import os
+import time
+import lzma
 import logging
+import tarfile
+import zipfile
+import itertools
 import tempfile
 import configparser
-import subprocess
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Union
 
-from spaceone.core import utils
+from spaceone.core import config, utils
 from spaceone.core.connector import BaseConnector
 from cloudforet.plugin.error.custom import *
+from cloudforet.plugin.lib.cancellation import get_cancellation_token
+from cloudforet.plugin.lib.check_result_store import CheckResultStore
+from cloudforet.plugin.lib.checkpoint_store import CheckpointStore, make_scan_units
+from cloudforet.plugin.lib.compliance_registry import get_compliance_framework, get_prowler_version
+from cloudforet.plugin.lib.json_stream import iter_json_array
+from cloudforet.plugin.lib.metrics import PhaseTimer
+from cloudforet.plugin.lib.process import run_process, ProcessResult, ProcessCancelledError, \
+    ProcessLimitExceededError
+from cloudforet.plugin.lib.prowler_worker import execute_prowler, ProwlerWorkerError, ProwlerWorkerCancelledError
+from cloudforet.plugin.lib.scan_cache import ScanCache, make_cache_scope
+from cloudforet.plugin.lib.singleton import LazySingleton
 from cloudforet.plugin.model.prowler.collector import COMPLIANCE_FRAMEWORKS
 
 __all__ = ['AWSProwlerConnector']
 
 _LOGGER = logging.getLogger(__name__)
-_AWS_PROFILE_PATH = os.environ.get('AWS_SHARED_CREDENTIALS_FILE', os.path.expanduser('~/.aws/credentials'))
-_AWS_PROFILE_DIR = _AWS_PROFILE_PATH.rsplit('/', 1)[0]
+_DEFAULT_CHECK_BATCH_SIZE = 20
+
+
+def _make_scan_cache() -> ScanCache:
+    scan_cache_conf = config.get_global('SCAN_CACHE', {})
+    return ScanCache(scan_cache_conf.get('path', '/tmp/prowler-scan-cache'), scan_cache_conf.get('ttl', 600),
+                     scan_cache_conf.get('max_size', 1024 * 1024 * 1024))
+
+
+def _make_checkpoint_store() -> CheckpointStore:
+    checkpoint_store_conf = config.get_global('CHECKPOINT_STORE', {})
+    return CheckpointStore(checkpoint_store_conf.get('path', '/tmp/prowler-checkpoints'),
+                           checkpoint_store_conf.get('ttl', 12 * 60 * 60))
+
+
+def _make_check_result_store() -> CheckResultStore:
+    check_freshness_conf = config.get_global('CHECK_FRESHNESS', {})
+    return CheckResultStore(check_freshness_conf.get('path', '/tmp/prowler-check-results'),
+                            check_freshness_conf.get('max_ages', {}),
+                            check_freshness_conf.get('default_max_age', 0))
+
+
+_SCAN_CACHE = LazySingleton(_make_scan_cache)
+_CHECKPOINT_STORE = LazySingleton(_make_checkpoint_store)
+_CHECK_RESULT_STORE = LazySingleton(_make_check_result_store)
+
+
+def _get_scan_cache() -> Optional[ScanCache]:
+    if config.get_global('SCAN_CACHE', {}).get('enabled', False) is False:
+        return None
+
+    return _SCAN_CACHE.get()
 
 
 class AWSProfileManager:
-    def __init__(self, credentials: dict):
+    """ Writes the scan's AWS profile to a private credentials file inside the scan's temp dir
+
+    Prowler is pointed at the file with AWS_SHARED_CREDENTIALS_FILE, so concurrent scans never share a file.
+    """
+
+    def __init__(self, credentials: dict, profile_dir: str):
         self._profile_name = utils.random_string()
         self._source_profile_name = None
         self._credentials = credentials
+        self._credentials_file = os.path.join(profile_dir, f'.aws-credentials-{self._profile_name}')
 
     @property
     def profile_name(self) -> str:
@@ -39,6 +91,14 @@ class AWSProfileManager:
     def credentials(self) -> dict:
         return self._credentials
 
+    @property
+    def credentials_file(self) -> str:
+        return self._credentials_file
+
+    @property
+    def env(self) -> dict:
+        return {'AWS_SHARED_CREDENTIALS_FILE': self._credentials_file}
+
     def __enter__(self) -> 'AWSProfileManager':
         self._add_aws_profile()
         return self
@@ -50,15 +110,6 @@ class AWSProfileManager:
         _LOGGER.debug(f'[_AWSProfileManager] add aws profile: {self._profile_name}')
 
         aws_profile = configparser.ConfigParser()
-
-        if os.path.exists(_AWS_PROFILE_PATH) is False:
-            self._create_aws_profile_file(aws_profile)
-
-        aws_profile.read(_AWS_PROFILE_PATH)
-
-        if self.profile_name in aws_profile.sections():
-            self._remove_aws_profile(aws_profile)
-
         aws_profile.add_section(self.profile_name)
 
         if 'role_arn' in self._credentials:
@@ -77,31 +128,15 @@ class AWSProfileManager:
             aws_profile.set(self.profile_name, 'aws_access_key_id', self._credentials['aws_access_key_id'])
             aws_profile.set(self.profile_name, 'aws_secret_access_key', self._credentials['aws_secret_access_key'])
 
-        with open(_AWS_PROFILE_PATH, 'w') as f:
+        fd = os.open(self._credentials_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as f:
             aws_profile.write(f)
 
-    @staticmethod
-    def _create_aws_profile_file(aws_profile: configparser.ConfigParser):
-        os.makedirs(_AWS_PROFILE_DIR, exist_ok=True)
-        aws_profile['default'] = {}
-        with open(_AWS_PROFILE_PATH, 'w') as f:
-            aws_profile.write(f)
-
-    def _remove_aws_profile(self, aws_profile: configparser.ConfigParser = None):
+    def _remove_aws_profile(self):
         _LOGGER.debug(f'[_AWSProfileManager] remove aws profile: {self._profile_name}')
 
-        if aws_profile is None:
-            aws_profile = configparser.ConfigParser()
-            aws_profile.read(_AWS_PROFILE_PATH)
-
-        if self.profile_name in aws_profile.sections():
-            aws_profile.remove_section(self.profile_name)
-
-        if self.source_profile_name and self.source_profile_name in aws_profile.sections():
-            aws_profile.remove_section(self.source_profile_name)
-
-        with open(_AWS_PROFILE_PATH, 'w') as f:
-            aws_profile.write(f)
+        if os.path.exists(self._credentials_file):
+            os.remove(self._credentials_file)
 
 
 class AWSProwlerConnector(BaseConnector):
@@ -109,46 +144,462 @@ class AWSProwlerConnector(BaseConnector):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._temp_dir = None
+        self._cancellation_token = None
+        self._phase_timer = None
 
     def verify_client(self, options: dict, secret_data: dict, schema: str):
         self._check_secret_data(secret_data)
 
-        with tempfile.TemporaryDirectory():
-            with AWSProfileManager(secret_data) as aws_profile:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with AWSProfileManager(secret_data, temp_dir) as aws_profile:
                 cmd = self._command_prefix(aws_profile.profile_name)
                 cmd += ['-l']
                 _LOGGER.debug(f'[verify_client] command: {cmd}')
-                response = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                response = self._run_prowler_process(cmd, aws_profile)
                 if response.returncode != 0:
-                    raise ERROR_PROWLER_EXECUTION_FAILED(reason=response.stderr.decode('utf-8'))
-
-    def check(self, options: dict, secret_data: dict, schema: str):
+                    raise ERROR_PROWLER_EXECUTION_FAILED(reason=response.stderr.decode('utf-8', errors='replace'))
+
+    def check(self, options: dict, secret_data: dict, schema: str, phase_timer: PhaseTimer = None,
+              on_checks_completed: Callable[[List[str]], None] = None,
+              on_units_failed: Callable[[List[dict]], None] = None,
+              on_checks_reused: Callable[[Dict[str, float]], None] = None) -> Iterator[dict]:
+        """ Scan and return the findings
+
+        With `on_checks_completed`, the scan runs in check batches while the findings are consumed, and the callback
+        receives the checks whose findings have all been returned after every batch.
+
+        With `options.checkpoint`, the scan runs in checkpointed units (region x service) and only the units without
+        a stored result are scanned. The findings of the failed units are left out and `on_units_failed` receives
+        those units, unless all of them failed.
+
+        With `options.reuse_fresh_checks`, the checks whose stored findings are younger than their max age are not
+        scanned. Their findings follow the scanned ones and `on_checks_reused` receives their observation times.
+        The checks served by the scan cache are reused as well, with the time of the cached scan.
+        """
+        phase_timer = phase_timer or PhaseTimer()
         self._check_secret_data(secret_data)
+        # Shard threads kill their prowler process groups through the token of the calling collect.
+        self._cancellation_token = get_cancellation_token()
+        self._phase_timer = phase_timer
+
+        with phase_timer.phase('load_scan_checks'):
+            compliance_frameworks = self._get_compliance_frameworks(options['compliance_framework'])
+            checks = self._get_scan_checks(compliance_frameworks)
+
+        check_result_store = _CHECK_RESULT_STORE.get() if options.get('reuse_fresh_checks', False) else None
+        result_scope = None
+        fresh_checks = {}
+        if check_result_store:
+            result_scope = make_cache_scope(secret_data, options.get('regions', []), get_prowler_version())
+            if options.get('force_rescan', False) is False:
+                fresh_checks = check_result_store.get_fresh(result_scope, checks)
+
+            phase_timer.count('reused_checks', len(fresh_checks))
+            _LOGGER.debug(f'[check] reuse the findings of fresh checks: {len(fresh_checks)} / {len(checks)}')
+            if fresh_checks and on_checks_reused:
+                on_checks_reused(fresh_checks)
+
+        scan_checks = [check_id for check_id in checks if check_id not in fresh_checks]
+        observed_at = time.time()
+        failed_units = []
+        cached_checks = {}
+        if scan_checks:
+            check_results = self._scan(options, secret_data, compliance_frameworks, scan_checks,
+                                       len(scan_checks) == len(checks), phase_timer, on_checks_completed,
+                                       failed_units, cached_checks)
+        else:
+            check_results = iter([])
+
+        if failed_units and on_units_failed:
+            on_units_failed(failed_units)
+
+        if cached_checks:
+            observed_at = min(cached_checks.values())
+            if on_checks_reused:
+                on_checks_reused(cached_checks)
+
+        if check_result_store:
+            # Only the slow-changing checks are stored, and never those of failed units.
+            failed_checks = {check_id for unit in failed_units for check_id in unit['checks']}
+            stored_checks = [check_id for check_id in scan_checks
+                             if check_result_store.get_max_age(check_id) > 0 and check_id not in failed_checks]
+            reused_check_results = phase_timer.time_iter(
+                'json_loading', check_result_store.iter_findings(result_scope, fresh_checks), count_name='findings')
+            check_results = itertools.chain(
+                check_result_store.put(result_scope, stored_checks, check_results, observed_at),
+                reused_check_results)
+
+        return check_results
+
+    def _scan(self, options: dict, secret_data: dict, compliance_frameworks: List[str], checks: List[str],
+              all_checks: bool, phase_timer: PhaseTimer, on_checks_completed: Optional[Callable[[List[str]], None]],
+              failed_units: List[dict], cached_checks: Dict[str, float]) -> Iterator[dict]:
+        scan_concurrency = max(int(options.get('scan_concurrency', 1)), 1)
+
+        scan_cache = _get_scan_cache()
+        cache_scope = None
+        if scan_cache:
+            cache_scope = make_cache_scope(secret_data, options.get('regions', []), get_prowler_version())
+            if options.get('force_rescan', False) is False:
+                with phase_timer.phase('scan_cache_lookup'):
+                    cache_hit = scan_cache.get(cache_scope, checks)
+
+                _LOGGER.debug(f'[_scan] scan cache stats: {scan_cache.stats()}')
+                if cache_hit is not None:
+                    check_results, scanned_at = cache_hit
+                    # The findings were observed by the cached scan, not now.
+                    cached_checks.update((check_id, scanned_at) for check_id in checks)
+                    return phase_timer.time_iter('json_loading', check_results, count_name='findings')
+
+        if options.get('checkpoint', False):
+            check_results = self._run_checkpointed_scan(options, secret_data, checks, scan_concurrency, phase_timer,
+                                                        failed_units)
+
+        elif on_checks_completed is not None:
+            shards = self._make_shards(options, scan_concurrency, compliance_frameworks, checks, stream=True)
+            phase_timer.count('prowler_shards', len(shards))
+            check_results = self._stream_shards(secret_data, shards, scan_concurrency, phase_timer,
+                                                on_checks_completed)
+        else:
+            shards = self._make_shards(options, scan_concurrency, compliance_frameworks, checks,
+                                       all_checks=all_checks)
+            phase_timer.count('prowler_shards', len(shards))
+
+            temp_dir = tempfile.TemporaryDirectory()
+            try:
+                with AWSProfileManager(secret_data, temp_dir.name) as aws_profile:
+                    with phase_timer.phase('prowler_execution'):
+                        shard_results = self._run_shards(aws_profile, shards, temp_dir.name, scan_concurrency)
+            except Exception:
+                temp_dir.cleanup()
+                raise
+
+            check_results = phase_timer.time_iter('json_loading', self._iter_check_results(temp_dir, shard_results),
+                                                  count_name='findings')
+
+        # An incomplete scan is never cached as if it covered all checks.
+        if scan_cache and not failed_units:
+            return scan_cache.put(cache_scope, checks, check_results)
+
+        return check_results
+
+    def replay(self, replay_file: str, phase_timer: PhaseTimer = None) -> Iterator[dict]:
+        """ Return the findings of a stored prowler output instead of scanning """
+        phase_timer = phase_timer or PhaseTimer()
+        _LOGGER.debug(f'[replay] replay prowler output: {replay_file}')
+        return phase_timer.time_iter('json_loading', self._iter_replay_file(replay_file), count_name='findings')
+
+    @staticmethod
+    def _iter_replay_file(replay_file: str) -> Iterator[dict]:
+        try:
+            yield from iter_json_array(replay_file)
+        except (OSError, ValueError, EOFError, lzma.LZMAError, tarfile.TarError, zipfile.BadZipFile) as e:
+            raise ERROR_INVALID_REPLAY_FILE(replay_file=replay_file, reason=str(e))
+
+    @staticmethod
+    def get_scan_cache_stats() -> dict:
+        scan_cache = _get_scan_cache()
+        return scan_cache.stats() if scan_cache else {}
+
+    @staticmethod
+    def _make_shards(options: dict, scan_concurrency: int, compliance_frameworks: List[str],
+                     checks: List[str], stream: bool = False, all_checks: bool = True) -> List[dict]:
         regions = options.get('regions', [])
 
-        compliance_framework = COMPLIANCE_FRAMEWORKS['aws'].get(options['compliance_framework'])
+        # A streamed scan is always split into check batches, so that checks finish one batch after another.
+        # A scan of only some checks of the framework names them instead of the framework.
+        if scan_concurrency == 1 and len(compliance_frameworks) == 1 and not stream and all_checks:
+            return [{'regions': regions, 'checks': None, 'compliance': compliance_frameworks[0]}]
+
+        # Every finding carries the compliance map of all frameworks,
+        # so several frameworks are covered by one scan over the union of their checks.
+        if scan_concurrency == 1 and not stream:
+            return [{'regions': regions, 'checks': checks, 'compliance': None}]
+
+        check_batch_size = max(int(options.get('check_batch_size', _DEFAULT_CHECK_BATCH_SIZE)), 1)
+        check_batches = [checks[i:i + check_batch_size] for i in range(0, len(checks), check_batch_size)]
+
+        # Without a region filter prowler decides which regions are enabled, so only checks are split.
+        region_shards = [[region] for region in regions] or [[]]
+
+        shards = []
+        for check_batch in check_batches:
+            for region_shard in region_shards:
+                shards.append({'regions': region_shard, 'checks': check_batch, 'compliance': None})
+
+        _LOGGER.debug(f'[_make_shards] {len(shards)} shards '
+                      f'(checks = {len(checks)}, regions = {len(regions)}, concurrency = {scan_concurrency})')
+        return shards
+
+    def _run_checkpointed_scan(self, options: dict, secret_data: dict, checks: List[str], scan_concurrency: int,
+                               phase_timer: PhaseTimer, failed_units: List[dict]) -> Iterator[dict]:
+        """ Scan the units without a stored result, store each one as it completes and return the findings of all
+        completed units; the units of a scan without failures are removed once their findings are consumed """
+        checkpoint_store = _CHECKPOINT_STORE.get()
+        scope = make_cache_scope(secret_data, [], get_prowler_version())
+        units = make_scan_units(options.get('regions', []), checks)
+        if options.get('force_rescan', False):
+            pending_units = units
+        else:
+            pending_units = [unit for unit in units if checkpoint_store.get(scope, unit) is None]
+        phase_timer.count('checkpoint_units', len(units))
+        phase_timer.count('checkpoint_units_resumed', len(units) - len(pending_units))
+        _LOGGER.debug(f'[_run_checkpointed_scan] units = {len(units)}, pending units = {len(pending_units)}')
+
+        first_error = None
+        if pending_units:
+            check_batch_size = max(int(options.get('check_batch_size', _DEFAULT_CHECK_BATCH_SIZE)), 1)
+            unit_batches = self._make_unit_batches(pending_units, check_batch_size)
+            phase_timer.count('prowler_shards', len(unit_batches))
+
+            with tempfile.TemporaryDirectory() as temp_dir, AWSProfileManager(secret_data, temp_dir) as aws_profile, \
+                    ThreadPoolExecutor(max_workers=scan_concurrency) as executor, phase_timer.phase('prowler_execution'):
+                futures = []
+                for index, unit_batch in enumerate(unit_batches):
+                    shard_dir = os.path.join(temp_dir, f'shard-{index}')
+                    futures.append(executor.submit(self._run_unit_batch, aws_profile, unit_batch, shard_dir,
+                                                   checkpoint_store, scope))
+
+                for unit_batch, future in zip(unit_batches, futures):
+                    try:
+                        future.result()
+                    except ERROR_SCAN_CANCELLED:
+                        for pending_future in futures:
+                            pending_future.cancel()
+                        raise
+                    except Exception as e:
+                        reason = getattr(e, 'message', str(e))
+                        _LOGGER.warning(f'[_run_checkpointed_scan] {len(unit_batch)} units failed: {reason}')
+                        first_error = first_error or e
+                        failed_units.extend(dict(unit, reason=reason) for unit in unit_batch)
+
+        if len(failed_units) == len(units):
+            raise first_error
+
+        completed_units = []
+        failed_unit_keys = {(unit['region'], unit['service']) for unit in failed_units}
+        for unit in units:
+            if (unit['region'], unit['service']) in failed_unit_keys:
+                continue
+
+            findings_file = checkpoint_store.get(scope, unit)
+            if findings_file is None:
+                failed_units.append(dict(unit, reason='Checkpoint expired during the scan.'))
+            else:
+                completed_units.append((findings_file, unit['checks']))
+
+        check_results = self._iter_checkpoints(completed_units)
+        if not failed_units:
+            # Every unit completed, so nothing is left to resume once the findings are consumed.
+            check_results = self._remove_checkpoints(check_results, checkpoint_store, scope, units)
+
+        return phase_timer.time_iter('json_loading', check_results, count_name='findings')
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with AWSProfileManager(secret_data) as aws_profile:
-                cmd = self._command_prefix(aws_profile.profile_name)
+    @staticmethod
+    def _make_unit_batches(units: List[dict], check_batch_size: int) -> List[List[dict]]:
+        # One prowler run covers consecutive units of the same region up to the check batch size.
+        unit_batches = []
+        unit_batch = []
+        batch_checks = 0
+        for unit in units:
+            if unit_batch and (unit['region'] != unit_batch[0]['region'] or
+                               batch_checks + len(unit['checks']) > check_batch_size):
+                unit_batches.append(unit_batch)
+                unit_batch = []
+                batch_checks = 0
+
+            unit_batch.append(unit)
+            batch_checks += len(unit['checks'])
+
+        if unit_batch:
+            unit_batches.append(unit_batch)
+
+        return unit_batches
+
+    def _run_unit_batch(self, aws_profile: AWSProfileManager, units: List[dict], output_dir: str,
+                        checkpoint_store: CheckpointStore, scope: str):
+        region = units[0]['region']
+        shard = {
+            'regions': [region] if region else [],
+            'checks': [check_id for unit in units for check_id in unit['checks']],
+            'compliance': None
+        }
+
+        shard_result = self._run_shard(aws_profile, shard, output_dir)
+        checkpoint_store.put(scope, units, self._iter_shard_result(shard_result))
 
-                cmd += ['-M', 'json', '-o', temp_dir, '-F', 'output', '-z']
-                cmd += ['--compliance', compliance_framework]
+    @staticmethod
+    def _iter_checkpoints(completed_units: List[tuple]) -> Iterator[dict]:
+        for findings_file, checks in completed_units:
+            yield from CheckpointStore.iter_findings(findings_file, checks)
 
-                if regions:
-                    region_filter = ['-f'] + regions
-                    cmd += region_filter
+    @staticmethod
+    def _remove_checkpoints(check_results: Iterator[dict], checkpoint_store: CheckpointStore, scope: str,
+                            units: List[dict]) -> Iterator[dict]:
+        yield from check_results
+        checkpoint_store.remove(scope, units)
 
-                _LOGGER.debug(f'[check] command: {cmd}')
+    @staticmethod
+    def _get_scan_checks(compliance_frameworks: List[str]) -> List[str]:
+        checks = set()
+        for compliance_framework in compliance_frameworks:
+            checks.update(get_compliance_framework('aws', compliance_framework).checks)
 
-                response = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-                if response.returncode != 0:
-                    raise ERROR_PROWLER_EXECUTION_FAILED(reason=response.stderr.decode('utf-8'))
+        return sorted(checks)
 
-                output_json_file = os.path.join(temp_dir, 'output.json')
-                check_results = utils.load_json_from_file(output_json_file)
+    @staticmethod
+    def _get_compliance_frameworks(compliance_framework: Union[str, List[str]]) -> List[str]:
+        if isinstance(compliance_framework, str):
+            compliance_framework = [compliance_framework]
+
+        return [COMPLIANCE_FRAMEWORKS['aws'][name] for name in compliance_framework]
+
+    def _run_shards(self, aws_profile: AWSProfileManager, shards: List[dict], temp_dir: str,
+                    scan_concurrency: int) -> List[Union[str, List[dict]]]:
+        if len(shards) == 1:
+            return [self._run_shard(aws_profile, shards[0], temp_dir)]
+
+        # Every idle thread takes the next pending shard from the executor's shared queue,
+        # so at most `scan_concurrency` prowler processes run and slow shards do not hold back the rest.
+        with ThreadPoolExecutor(max_workers=scan_concurrency) as executor:
+            futures = []
+            for index, shard in enumerate(shards):
+                shard_dir = os.path.join(temp_dir, f'shard-{index}')
+                futures.append(executor.submit(self._run_shard, aws_profile, shard, shard_dir))
+
+            try:
+                # Results are merged in shard order, not in completion order, to keep them deterministic.
+                return [future.result() for future in futures]
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _run_shard(self, aws_profile: AWSProfileManager, shard: dict, output_dir: str) -> Union[str, List[dict]]:
+        if self._cancellation_token and self._cancellation_token.is_cancelled:
+            raise ERROR_SCAN_CANCELLED()
+
+        args = self._prowler_args(aws_profile.profile_name)
+        args += ['-M', 'json', '-o', output_dir, '-F', 'output', '-z']
+
+        if shard['compliance']:
+            args += ['--compliance', shard['compliance']]
+
+        if shard['checks']:
+            args += ['--checks'] + shard['checks']
+
+        if shard['regions']:
+            region_filter = ['-f'] + shard['regions']
+            args += region_filter
+
+        if self._get_execution_mode() == 'worker':
+            check_results = self._execute_in_worker(args, aws_profile.env)
+            if check_results is not None:
                 return check_results
 
+        cmd = self._get_prowler_command() + args
+        _LOGGER.debug(f'[_run_shard] command: {cmd}')
+
+        response = self._run_prowler_process(cmd, aws_profile)
+        _LOGGER.debug(f'[_run_shard] resource usage: wall_time = {response.wall_time:.1f}s, '
+                      f'cpu_seconds = {response.cpu_seconds:.1f}s, peak_rss = {response.peak_rss}')
+        if self._phase_timer:
+            self._phase_timer.add_resource_usage(response.cpu_seconds, response.peak_rss)
+
+        if response.returncode != 0:
+            raise ERROR_PROWLER_EXECUTION_FAILED(reason=response.stderr.decode('utf-8', errors='replace'))
+
+        return os.path.join(output_dir, 'output.json')
+
+    def _run_prowler_process(self, cmd: List[str], aws_profile: AWSProfileManager) -> ProcessResult:
+        limits = config.get_global('PROWLER_LIMITS', {})
+
+        try:
+            return run_process(cmd, env=dict(os.environ, **aws_profile.env),
+                               cancellation_token=self._cancellation_token,
+                               timeout=limits.get('timeout', 0),
+                               max_rss=limits.get('max_rss', 0),
+                               max_virtual_memory=limits.get('max_virtual_memory', 0),
+                               stderr_tail_size=limits.get('stderr_tail_size', 64 * 1024))
+        except ProcessCancelledError:
+            raise ERROR_SCAN_CANCELLED()
+        except ProcessLimitExceededError as e:
+            raise ERROR_PROWLER_RESOURCE_LIMIT_EXCEEDED(reason=f'{e} {e.stderr.decode("utf-8", errors="replace")}')
+
+    def _execute_in_worker(self, args: List[str], env: dict) -> Optional[List[dict]]:
+        _LOGGER.debug(f'[_execute_in_worker] args: {args}')
+
+        try:
+            return execute_prowler(args, env, max_workers=config.get_global('PROWLER_WORKER_COUNT', 1),
+                                   cancellation_token=self._cancellation_token)
+        except ProwlerWorkerCancelledError:
+            raise ERROR_SCAN_CANCELLED()
+        except ProwlerWorkerError as e:
+            raise ERROR_PROWLER_EXECUTION_FAILED(reason=str(e))
+        except ImportError as e:
+            _LOGGER.warning(f'[_execute_in_worker] prowler API is not available, fall back to subprocess: {e}')
+            return None
+
+    def _stream_shards(self, secret_data: dict, shards: List[dict], scan_concurrency: int, phase_timer: PhaseTimer,
+                       on_checks_completed: Callable[[List[str]], None]) -> Iterator[dict]:
+        """ Run the shards in the background and return their findings in shard order as each shard finishes """
+        pending_shard_counts = {}
+        for shard in shards:
+            for check_id in shard['checks']:
+                pending_shard_counts[check_id] = pending_shard_counts.get(check_id, 0) + 1
+
+        with tempfile.TemporaryDirectory() as temp_dir, AWSProfileManager(secret_data, temp_dir) as aws_profile, \
+                ThreadPoolExecutor(max_workers=scan_concurrency) as executor:
+            futures = []
+            for index, shard in enumerate(shards):
+                shard_dir = os.path.join(temp_dir, f'shard-{index}')
+                futures.append(executor.submit(self._run_shard, aws_profile, shard, shard_dir))
+
+            try:
+                for shard, future in zip(shards, futures):
+                    with phase_timer.phase('prowler_execution'):
+                        shard_result = future.result()
+
+                    # The last finding of a shard is held back until its completed checks are reported,
+                    # so the caller learns about them without waiting for the next shard.
+                    last_check_result = None
+                    for check_result in phase_timer.time_iter('json_loading', self._iter_shard_result(shard_result),
+                                                              count_name='findings'):
+                        if last_check_result is not None:
+                            yield last_check_result
+                        last_check_result = check_result
+
+                    # A check is complete once every region shard of it has been returned.
+                    completed_checks = []
+                    for check_id in shard['checks']:
+                        pending_shard_counts[check_id] -= 1
+                        if pending_shard_counts[check_id] == 0:
+                            completed_checks.append(check_id)
+
+                    on_checks_completed(completed_checks)
+
+                    if last_check_result is not None:
+                        yield last_check_result
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _iter_check_results(self, temp_dir: tempfile.TemporaryDirectory,
+                            shard_results: List[Union[str, List[dict]]]) -> Iterator[dict]:
+        # Findings are parsed one at a time and the temp dir lives until the caller has consumed them all.
+        with temp_dir:
+            for shard_result in shard_results:
+                yield from self._iter_shard_result(shard_result)
+
+    @staticmethod
+    def _iter_shard_result(shard_result: Union[str, List[dict]]) -> Iterator[dict]:
+        if isinstance(shard_result, list):
+            yield from shard_result
+        elif os.path.exists(shard_result):
+            yield from iter_json_array(shard_result)
+        else:
+            # prowler does not write an output file when a shard has no findings
+            _LOGGER.debug(f'[_iter_shard_result] no output file: {shard_result}')
 
     @staticmethod
     def _check_secret_data(secret_data: dict):
@@ -159,5 +610,16 @@ class AWSProwlerConnector(BaseConnector):
             raise ERROR_REQUIRED_PARAMETER(key='secret_data.aws_secret_access_key')
 
     @staticmethod
-    def _command_prefix(aws_profile_name: str) -> List[str]:
-        return ['python3', '-m', 'prowler', 'aws', '-p', aws_profile_name, '-b']
+    def _get_execution_mode() -> str:
+        return config.get_global('PROWLER_EXECUTION_MODE', 'subprocess')
+
+    @staticmethod
+    def _get_prowler_command() -> List[str]:
+        return config.get_global('PROWLER_COMMAND', ['python3', '-m', 'prowler'])
+
+    def _command_prefix(self, aws_profile_name: str) -> List[str]:
+        return self._get_prowler_command() + self._prowler_args(aws_profile_name)
+
+    @staticmethod
+    def _prowler_args(aws_profile_name: str) -> List[str]:
+        return ['aws', '-p', aws_profile_name, '-b']
@@ -3,3 +3,28 @@ from spaceone.core.error import *
 
 class ERROR_PROWLER_EXECUTION_FAILED(ERROR_BASE):
     _message = 'Prowler execution is failed. (reason={reason})'
+
+
+class ERROR_PROWLER_RESOURCE_LIMIT_EXCEEDED(ERROR_BASE):
+    _message = 'Prowler exceeded a resource limit. (reason={reason})'
+
+
+class ERROR_PARTIAL_SCAN_FAILURE(ERROR_BASE):
+    _message = 'Prowler scan is partially failed, the requirements of the failed units are not collected. ' \
+               '(failed_units={failed_units}, reason={reason})'
+
+
+class ERROR_INVALID_REPLAY_FILE(ERROR_BASE):
+    _message = 'Replay file is invalid. (replay_file={replay_file}, reason={reason})'
+
+
+class ERROR_SCAN_CANCELLED(ERROR_BASE):
+    _message = 'Prowler scan is cancelled.'
+
+
+class ERROR_INVALID_RESPONSE(ERROR_BASE):
+    _message = 'Invalid resource response. (key={key}, reason={reason})'
+
+
+class ERROR_ACCOUNT_SOURCE_FAILED(ERROR_BASE):
+    _message = 'Failed to list member accounts. (reason={reason})'
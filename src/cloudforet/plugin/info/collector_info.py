@@ -1,8 +1,13 @@
+import json
+import threading
+from google.protobuf import struct_pb2
 from spaceone.api.inventory.plugin import collector_pb2
 from spaceone.core.pygrpc.message_type import *
 
 __all__ = ['PluginInfo', 'ResourceInfo']
 
+_MAX_VIEW_TEMPLATES = 256
+
 
 def PluginInfo(plugin_data):
     info = {
@@ -17,8 +22,109 @@ def ResourceInfo(resource_data):
         'state': resource_data['state'],
         'message': resource_data.get('message', ''),
         'resource_type': resource_data['resource_type'],
-        'match_rules': change_struct_type(resource_data.get('match_rules')),
-        'resource': change_struct_type(resource_data.get('resource'))
+        'match_rules': change_struct_type(resource_data.get('match_rules'))
     }
 
-    return collector_pb2.ResourceInfo(**info)
+    resource_info = collector_pb2.ResourceInfo(**info)
+
+    # The resource is encoded in place, since passing a Struct to the constructor copies it once more.
+    resource = resource_data.get('resource')
+    if isinstance(resource, dict):
+        _encode_resource(resource_info.resource, resource)
+
+    return resource_info
+
+
+def _encode_resource(struct, resource: dict):
+    """ Fill the same message as change_struct_type(resource) in one pass over the resource dict
+
+    Cloud service types and compliance cloud services carry a constant `metadata.view` block,
+    which is encoded once and copied from a template afterwards.
+    """
+    struct.SetInParent()
+
+    fields = struct.fields
+    for key, value in resource.items():
+        if key == 'metadata' and type(value) is dict and value:
+            _encode_metadata(fields[key], value)
+        else:
+            _encode_value(fields[key], value)
+
+
+def _encode_metadata(value_pb, metadata: dict):
+    fields = value_pb.struct_value.fields
+    for key, value in metadata.items():
+        if key == 'view' and type(value) is dict:
+            template = _VIEW_TEMPLATES.get(value)
+            if template is not None:
+                fields[key].struct_value.CopyFrom(template)
+                continue
+
+        _encode_value(fields[key], value)
+
+
+def _encode_struct(struct, value: dict):
+    fields = struct.fields
+    for key, item in value.items():
+        _encode_value(fields[key], item)
+
+
+def _encode_value(value_pb, value):
+    # Exact type checks for the types the manager emits, in the same order of precedence as Struct.update.
+    value_type = type(value)
+    if value_type is str:
+        value_pb.string_value = value
+    elif value_type is dict:
+        if value:
+            _encode_struct(value_pb.struct_value, value)
+        else:
+            value_pb.struct_value.SetInParent()
+    elif value_type is list:
+        if value:
+            values = value_pb.list_value.values
+            for item in value:
+                _encode_value(values.add(), item)
+        else:
+            value_pb.list_value.SetInParent()
+    elif value_type is int or value_type is float:
+        value_pb.number_value = value
+    elif value is None:
+        value_pb.null_value = 0
+    elif value_type is bool:
+        value_pb.bool_value = value
+    else:
+        # Subclasses (e.g. str enums) and protobuf containers take the generic path.
+        value_pb.Clear()
+        struct = struct_pb2.Struct()
+        struct.update({'value': value})
+        value_pb.CopyFrom(struct.fields['value'])
+
+
+class _ViewTemplates:
+    """ Encoded `metadata.view` blocks keyed by their JSON form """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._templates = {}
+
+    def get(self, view: dict):
+        try:
+            key = json.dumps(view)
+        except (TypeError, ValueError):
+            return None
+
+        template = self._templates.get(key)
+        if template is None:
+            template = struct_pb2.Struct()
+            _encode_struct(template, view)
+
+            with self._lock:
+                if len(self._templates) >= self.max_size:
+                    self._templates.clear()
+                self._templates[key] = template
+
+        return template
+
+
+_VIEW_TEMPLATES = _ViewTemplates(_MAX_VIEW_TEMPLATES)
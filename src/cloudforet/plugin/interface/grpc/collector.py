@@ -3,6 +3,7 @@ from spaceone.core.pygrpc import BaseAPI
 from cloudforet.plugin.service.collector_service import CollectorService
 from cloudforet.plugin.info.collector_info import PluginInfo, ResourceInfo
 from cloudforet.plugin.info.common_info import EmptyInfo
+from cloudforet.plugin.lib.cancellation import CancellationToken, cancellation_scope
 
 
 class Collector(BaseAPI, collector_pb2_grpc.CollectorServicer):
@@ -26,7 +27,12 @@ class Collector(BaseAPI, collector_pb2_grpc.CollectorServicer):
     def collect(self, request, context):
         params, metadata = self.parse_request(request, context)
 
+        # The callback runs when the RPC ends for any reason, so a cancelled or timed out collect kills its scans.
+        cancellation_token = CancellationToken()
+        context.add_callback(cancellation_token.cancel)
+
         with self.locator.get_service(CollectorService, metadata) as collector_service:
-            response_stream = collector_service.collect(params)
-            for resource_data in response_stream:
-                yield self.locator.get_info(ResourceInfo, resource_data)
+            with cancellation_scope(cancellation_token):
+                response_stream = collector_service.collect(params)
+                for resource_data in response_stream:
+                    yield self.locator.get_info(ResourceInfo, resource_data)
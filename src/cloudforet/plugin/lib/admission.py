@@ -0,0 +1,117 @@
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+from cloudforet.plugin.lib.cancellation import CancellationToken
+
+__all__ = ['AdmissionController', 'AdmissionCancelledError']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AdmissionCancelledError(Exception):
+    pass
+
+
+class AdmissionController:
+    """ Bounds the number of concurrent scans in the process
+
+    Waiting scans are kept in one FIFO queue per domain and domains are served round robin,
+    so a domain that submits many scans at once cannot starve the others.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(max_concurrency, 1)
+        self._condition = threading.Condition()
+        self._running = 0
+        self._queues = {}
+        self._domain_order = deque()
+        self._stats = {'admitted': 0, 'wait_time_total': 0.0, 'wait_time_max': 0.0}
+
+    @contextmanager
+    def admit(self, domain_id: str = None, cancellation_token: Optional[CancellationToken] = None):
+        ticket = object()
+        started_at = time.monotonic()
+
+        if cancellation_token:
+            cancellation_token.add_callback(self._wake_up)
+
+        with self._condition:
+            if domain_id not in self._queues:
+                self._queues[domain_id] = deque()
+                self._domain_order.append(domain_id)
+            self._queues[domain_id].append(ticket)
+
+            try:
+                self._condition.wait_for(lambda: self._is_cancelled(cancellation_token) or self._is_next(ticket))
+                if self._is_cancelled(cancellation_token):
+                    raise AdmissionCancelledError('Scan is cancelled while waiting for admission.')
+            except BaseException:
+                self._dequeue(domain_id, ticket, served=False)
+                self._condition.notify_all()
+                raise
+            finally:
+                if cancellation_token:
+                    cancellation_token.remove_callback(self._wake_up)
+
+            self._dequeue(domain_id, ticket)
+            self._running += 1
+
+            wait_time = time.monotonic() - started_at
+            self._stats['admitted'] += 1
+            self._stats['wait_time_total'] += wait_time
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], wait_time)
+
+            # Other queued scans may be admissible now that the round robin has moved on.
+            self._condition.notify_all()
+
+        _LOGGER.debug(f'[admit] scan is admitted: domain_id = {domain_id}, wait_time = {wait_time:.2f}s, '
+                      f'running = {self._running}, queue_depth = {self.queue_depth}')
+
+        try:
+            yield wait_time
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._condition.notify_all()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        with self._condition:
+            stats = dict(self._stats)
+            stats['running'] = self._running
+            stats['queue_depth'] = self.queue_depth
+            stats['queue_depth_by_domain'] = {domain_id: len(queue) for domain_id, queue in self._queues.items()}
+            return stats
+
+    def _wake_up(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    @staticmethod
+    def _is_cancelled(cancellation_token: Optional[CancellationToken]) -> bool:
+        return cancellation_token is not None and cancellation_token.is_cancelled
+
+    def _is_next(self, ticket: object) -> bool:
+        if self._running >= self.max_concurrency:
+            return False
+
+        return self._queues[self._domain_order[0]][0] is ticket
+
+    def _dequeue(self, domain_id: str, ticket: object, served: bool = True):
+        queue = self._queues[domain_id]
+        queue.remove(ticket)
+
+        if not queue:
+            self._domain_order.remove(domain_id)
+            del self._queues[domain_id]
+        elif served:
+            # The served domain goes to the back of the round robin.
+            self._domain_order.remove(domain_id)
+            self._domain_order.append(domain_id)
@@ -0,0 +1,70 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+__all__ = ['CancellationToken', 'cancellation_scope', 'get_cancellation_token']
+
+_LOGGER = logging.getLogger(__name__)
+_LOCAL = threading.local()
+
+
+class CancellationToken:
+    """ Cancellation state of one collect, shared by every thread working for it
+
+    Callbacks (e.g. killing a prowler process group) run once, in the thread that cancels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks = list(self._callbacks)
+            self._callbacks = []
+
+        _LOGGER.debug(f'[cancel] collect is cancelled: {len(callbacks)} callbacks')
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                _LOGGER.error(f'[cancel] cancellation callback failed: {e}', exc_info=True)
+
+    def add_callback(self, callback: Callable[[], None]):
+        """ Register a callback, which runs immediately if the token is already cancelled """
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return
+
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+@contextmanager
+def cancellation_scope(cancellation_token: Optional[CancellationToken]):
+    """ Make the token the current one of this thread, where get_cancellation_token() finds it """
+    previous_token = getattr(_LOCAL, 'cancellation_token', None)
+    _LOCAL.cancellation_token = cancellation_token
+
+    try:
+        yield cancellation_token
+    finally:
+        _LOCAL.cancellation_token = previous_token
+
+
+def get_cancellation_token() -> Optional[CancellationToken]:
+    return getattr(_LOCAL, 'cancellation_token', None)
@@ -0,0 +1,94 @@
+import os
+import time
+import fnmatch
+import logging
+from typing import Dict, Iterable, Iterator, List
+
+from cloudforet.plugin.lib.file_store import FileStore, make_hash
+from cloudforet.plugin.lib.json_stream import iter_json_array
+
+__all__ = ['CheckResultStore']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CheckResultStore(FileStore):
+    """ On-disk findings of single checks, reused while they are younger than the max age of their check
+
+    `max_ages` maps check ids or glob patterns of check ids to seconds; the exact id wins over patterns and checks
+    without an entry (or with 0) always run. An entry is the findings file of one check in one scope, its mtime is
+    the time the findings were observed.
+    """
+
+    def __init__(self, path: str, max_ages: Dict[str, int], default_max_age: int = 0):
+        super().__init__(path)
+        self.max_ages = max_ages
+        self.default_max_age = default_max_age
+        self._resolved_max_ages: Dict[str, int] = {}
+
+    def get_max_age(self, check_id: str) -> int:
+        max_age = self._resolved_max_ages.get(check_id)
+        if max_age is None:
+            max_age = self.max_ages.get(check_id)
+            if max_age is None:
+                max_age = next((age for pattern, age in self.max_ages.items()
+                                if fnmatch.fnmatchcase(check_id, pattern)), self.default_max_age)
+
+            self._resolved_max_ages[check_id] = max_age
+
+        return max_age
+
+    def get_fresh(self, scope: str, checks: List[str]) -> Dict[str, float]:
+        """ Observation times of the checks whose stored findings are younger than their max age """
+        now = time.time()
+        fresh_checks = {}
+        for check_id in checks:
+            max_age = self.get_max_age(check_id)
+            if max_age <= 0:
+                continue
+
+            try:
+                observed_at = os.stat(self._get_findings_file(scope, check_id)).st_mtime
+            except OSError:
+                continue
+
+            if now - observed_at <= max_age:
+                fresh_checks[check_id] = observed_at
+
+        return fresh_checks
+
+    def iter_findings(self, scope: str, checks: Iterable[str]) -> Iterator[dict]:
+        for check_id in checks:
+            yield from iter_json_array(self._get_findings_file(scope, check_id))
+
+    def put(self, scope: str, checks: List[str], findings: Iterable[dict], observed_at: float) -> Iterator[dict]:
+        """ Pass the findings through and store those of `checks` once they are all consumed """
+        checks = set(checks)
+        writers = {}
+
+        try:
+            for finding in findings:
+                check_id = finding['CheckID']
+                if check_id in checks:
+                    if check_id not in writers:
+                        writers[check_id] = self._open_writer()
+                    writers[check_id].write(finding)
+
+                yield finding
+
+            # A check without findings is stored as well, it found nothing to report.
+            for check_id in checks:
+                if check_id not in writers:
+                    writers[check_id] = self._open_writer()
+
+            for check_id, writer in writers.items():
+                writer.commit(self._get_findings_file(scope, check_id), mtime=observed_at)
+        finally:
+            for writer in writers.values():
+                writer.discard()
+
+        # Nothing older than the longest max age can be reused by any check.
+        self._evict_expired(max([self.default_max_age] + list(self.max_ages.values())))
+
+    def _get_findings_file(self, scope: str, check_id: str) -> str:
+        return os.path.join(self.path, f'{scope}-{make_hash(check_id)}.json')
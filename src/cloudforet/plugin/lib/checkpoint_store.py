@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from cloudforet.plugin.lib.file_store import FileStore, make_hash
+from cloudforet.plugin.lib.json_stream import iter_json_array
+
+__all__ = ['CheckpointStore', 'make_scan_units', 'get_check_service']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_check_service(check_id: str) -> str:
+    """ Prowler check ids start with their service name, e.g. iam_root_mfa_enabled -> iam """
+    return check_id.split('_', 1)[0]
+
+
+def make_scan_units(regions: List[str], checks: List[str]) -> List[dict]:
+    """ Checkpoint units of a scan: the checks of one service in one region
+
+    Without a region filter prowler decides which regions are enabled, so a unit covers all of them.
+    """
+    service_checks: Dict[str, List[str]] = {}
+    for check_id in checks:
+        service_checks.setdefault(get_check_service(check_id), []).append(check_id)
+
+    units = []
+    for region in regions or ['']:
+        for service, service_check_ids in sorted(service_checks.items()):
+            units.append({'region': region, 'service': service, 'checks': sorted(service_check_ids)})
+
+    return units
+
+
+class CheckpointStore(FileStore):
+    """ On-disk findings of the completed units of checkpointed scans
+
+    An entry is the findings file of one unit (region x service) and a sidecar with the checks it covers, so a
+    failed or interrupted scan can be resumed by running only the units that are missing. The entries of a scan
+    are removed once it completed every unit, entries older than the TTL are stale and removed whenever a unit is
+    stored.
+    """
+
+    sidecar_suffixes = ('.checks',)
+
+    def __init__(self, path: str, ttl: int):
+        super().__init__(path)
+        self.ttl = ttl
+
+    def get(self, scope: str, unit: dict) -> Optional[str]:
+        """ Findings file of a unit that completed within the TTL with at least the unit's checks """
+        findings_file = self._get_entry_path(scope, unit) + '.json'
+        try:
+            if time.time() - os.stat(findings_file).st_mtime > self.ttl:
+                return None
+
+            with open(self._get_entry_path(scope, unit) + '.checks', 'r') as f:
+                if not set(unit['checks']).issubset(json.load(f)):
+                    return None
+        except (OSError, ValueError):
+            return None
+
+        return findings_file
+
+    def put(self, scope: str, units: List[dict], findings: Iterable[dict]):
+        """ Split the findings of a prowler run over the units it covered and store every unit """
+        check_units = {check_id: index for index, unit in enumerate(units) for check_id in unit['checks']}
+        writers = []
+
+        try:
+            for _ in units:
+                writers.append(self._open_writer())
+
+            for finding in findings:
+                index = check_units.get(finding['CheckID'])
+                if index is not None:
+                    writers[index].write(finding)
+
+            for unit, writer in zip(units, writers):
+                entry_path = self._get_entry_path(scope, unit)
+                self._write_json_file(entry_path + '.checks', sorted(unit['checks']))
+                writer.commit(entry_path + '.json')
+        finally:
+            for writer in writers:
+                writer.discard()
+
+        self._evict_expired(self.ttl)
+
+    def remove(self, scope: str, units: List[dict]):
+        """ Remove the stored units of a scan that has nothing left to resume """
+        for unit in units:
+            self._remove_entry(self._get_entry_path(scope, unit) + '.json')
+
+    @staticmethod
+    def iter_findings(findings_file: str, checks: List[str]) -> Iterator[dict]:
+        # A unit stored by a scan of more frameworks can hold findings of checks that were not requested now.
+        checks = set(checks)
+        for finding in iter_json_array(findings_file):
+            if finding['CheckID'] in checks:
+                yield finding
+
+    def _get_entry_path(self, scope: str, unit: dict) -> str:
+        return os.path.join(self.path, f'{scope}-{make_hash([unit["region"], unit["service"]])}')
@@ -0,0 +1,108 @@
+import os
+import logging
+import threading
+from typing import Dict, List
+
+__all__ = ['ComplianceFramework', 'get_compliance_framework', 'get_prowler_version']
+
+_LOGGER = logging.getLogger(__name__)
+_PROWLER_VERSION = None
+
+
+class ComplianceFramework:
+    """ Prowler compliance framework with the indexes the collector looks up on every finding """
+
+    __slots__ = ('name', 'provider', 'requirement_descriptions', 'requirement_checks', 'check_requirements')
+
+    def __init__(self, name: str, provider: str, requirements: list):
+        self.name = name
+        self.provider = provider
+        self.requirement_descriptions: Dict[str, str] = {}
+        self.requirement_checks: Dict[str, List[str]] = {}
+        self.check_requirements: Dict[str, List[str]] = {}
+
+        for requirement in requirements:
+            self.requirement_descriptions[requirement.Id] = requirement.Description
+            self.requirement_checks[requirement.Id] = list(requirement.Checks)
+
+            for check_id in requirement.Checks:
+                self.check_requirements.setdefault(check_id, []).append(requirement.Id)
+
+    @property
+    def checks(self) -> List[str]:
+        return sorted(self.check_requirements.keys())
+
+
+class _ComplianceFrameworkRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prowler_version = None
+        self._frameworks: Dict[tuple, ComplianceFramework] = {}
+
+    def get(self, provider: str, name: str) -> ComplianceFramework:
+        prowler_version = get_prowler_version()
+
+        with self._lock:
+            if prowler_version != self._prowler_version:
+                _LOGGER.debug(f'[get] prowler version is changed, reset compliance frameworks: '
+                              f'{self._prowler_version} -> {prowler_version}')
+                self._frameworks = {}
+                self._prowler_version = prowler_version
+
+            key = (provider, name)
+            if key not in self._frameworks:
+                self._frameworks[key] = ComplianceFramework(name, provider, _load_requirements(provider, name))
+
+            return self._frameworks[key]
+
+
+def _load_requirements(provider: str, name: str) -> list:
+    import prowler
+
+    compliance_file = os.path.join(os.path.dirname(prowler.__file__), 'compliance', provider, f'{name}.json')
+
+    try:
+        from prowler.lib.check.compliance_models import load_compliance_framework
+    except ImportError:
+        load_compliance_framework = None
+
+    if load_compliance_framework and os.path.exists(compliance_file):
+        _LOGGER.debug(f'[_load_requirements] load compliance framework: {compliance_file}')
+        return load_compliance_framework(compliance_file).Requirements
+
+    from prowler.lib.check.check import bulk_load_compliance_frameworks
+
+    _LOGGER.debug(f'[_load_requirements] load all compliance frameworks: {provider}')
+    compliance_frameworks = bulk_load_compliance_frameworks(provider)
+    if name not in compliance_frameworks:
+        raise KeyError(name)
+
+    return compliance_frameworks[name].Requirements
+
+
+def get_prowler_version() -> str:
+    """ Version of the installed prowler, read once per process """
+    global _PROWLER_VERSION
+
+    if _PROWLER_VERSION is None:
+        _PROWLER_VERSION = _read_prowler_version()
+
+    return _PROWLER_VERSION
+
+
+def _read_prowler_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('prowler')
+    except Exception:
+        from prowler.config.config import prowler_version
+        return prowler_version
+
+
+_REGISTRY = _ComplianceFrameworkRegistry()
+
+
+def get_compliance_framework(provider: str, name: str) -> ComplianceFramework:
+    """ Return the compliance framework, loading it only once per installed prowler version """
+    return _REGISTRY.get(provider, name)
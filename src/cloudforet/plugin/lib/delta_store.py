@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from cloudforet.plugin.lib.file_store import FileStore, make_hash
+
+__all__ = ['DeltaStore', 'make_delta_scope', 'make_resource_hash']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def make_delta_scope(domain_id: str, account: str, provider: str, cloud_service_type: str) -> str:
+    """ Delta scope of a resource: the resources of one cloud service type in one account of a domain """
+    return make_hash([domain_id, account, provider, cloud_service_type])
+
+
+def make_resource_hash(resource: dict) -> str:
+    """ Stable 64 bit content hash of a resource, independent of the key order of its dicts
+
+    The observation times of the requirement and its checks are left out: a fresh scan with the same findings
+    would change them at every collect. The inventory gets the new times with the next full emit.
+    """
+    data = resource.get('data')
+    if isinstance(data, dict) and 'observed_at' in data:
+        data = {key: value for key, value in data.items() if key != 'observed_at'}
+        if 'checks' in data:
+            data['checks'] = [{key: value for key, value in check.items() if key != 'observed_at'}
+                              for check in data['checks']]
+        resource = dict(resource, data=data)
+
+    return make_hash(resource, digest_size=8)
+
+
+class DeltaStore(FileStore):
+    """ On-disk store of the content hashes of the resources emitted by the last collect
+
+    One file per delta scope maps `reference.resource_id` to a 64 bit content hash. A scope file is replaced as a
+    whole after every successful delta collect, so resources that disappeared are dropped with it. A scope is
+    emitted in full again once its last full emit is older than `full_emit_interval` seconds (never if 0), so
+    resources the inventory missed are eventually sent again. The least recently saved scopes are evicted when
+    there are more than `max_scopes` of them.
+    """
+
+    def __init__(self, path: str, max_scopes: int, full_emit_interval: float = 0):
+        super().__init__(path)
+        self.max_scopes = max_scopes
+        self.full_emit_interval = full_emit_interval
+        self._lock = threading.Lock()
+
+    def load(self, scope: str) -> Tuple[Dict[str, str], Optional[float]]:
+        """ Resource hashes of the scope and the time of its last full emit, nothing if it is due for a full emit """
+        try:
+            with open(self._get_scope_file(scope), 'r') as f:
+                scope_data = json.load(f)
+            full_emitted_at = scope_data['full_emitted_at']
+            resource_hashes = scope_data['resources']
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}, None
+
+        if 0 < self.full_emit_interval <= time.time() - full_emitted_at:
+            return {}, None
+
+        return resource_hashes, full_emitted_at
+
+    def save(self, scope: str, resource_hashes: Dict[str, str], full_emitted_at: float):
+        self._write_json_file(self._get_scope_file(scope),
+                              {'full_emitted_at': full_emitted_at, 'resources': resource_hashes})
+        _LOGGER.debug(f'[save] save delta scope: {scope} (resources = {len(resource_hashes)})')
+        self._evict()
+
+    def invalidate(self, scope: str):
+        """ Forget the hashes of the scope, its next delta collect emits every resource """
+        self._remove_entry(self._get_scope_file(scope))
+        _LOGGER.debug(f'[invalidate] invalidate delta scope: {scope}')
+
+    def _get_scope_file(self, scope: str) -> str:
+        return os.path.join(self.path, f'{scope}.json')
+
+    def _evict(self):
+        with self._lock:
+            scope_files = sorted(self._list_entries(), key=lambda entry: entry[0].st_mtime)
+            for _, scope_file in scope_files[:max(len(scope_files) - self.max_scopes, 0)]:
+                self._remove_entry(scope_file)
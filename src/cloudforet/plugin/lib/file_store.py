@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import glob
+import hashlib
+import logging
+import tempfile
+from typing import List, Tuple
+
+__all__ = ['FileStore', 'JSONArrayWriter', 'make_hash']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def make_hash(value, digest_size: int = 16) -> str:
+    """ Stable hex digest of a JSON value, independent of the key order of its dicts """
+    return hashlib.blake2b(json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode(),
+                           digest_size=digest_size).hexdigest()
+
+
+class JSONArrayWriter:
+    """ JSON array written item by item to a temp file, which replaces the target file on commit
+
+    A writer that is discarded before its commit leaves nothing behind, so readers only ever see complete files.
+    """
+
+    def __init__(self, path: str):
+        fd, self._temp_file = tempfile.mkstemp(dir=path, prefix='.', suffix='.tmp')
+        self._f = os.fdopen(fd, 'w')
+        self._f.write('[')
+        self._committed = False
+        self.count = 0
+
+    def write(self, item):
+        if self.count > 0:
+            self._f.write(',\n')
+        json.dump(item, self._f)
+        self.count += 1
+
+    def commit(self, file_path: str, mtime: float = None):
+        self._f.write(']')
+        self._f.close()
+        os.replace(self._temp_file, file_path)
+        self._committed = True
+
+        if mtime is not None:
+            os.utime(file_path, (mtime, mtime))
+
+    def discard(self):
+        self._f.close()
+        if not self._committed and os.path.exists(self._temp_file):
+            os.remove(self._temp_file)
+
+
+class FileStore:
+    """ Directory of JSON entry files (`*.json`), each with optional sidecar files, that are written atomically
+
+    Subclasses decide which entries to evict, the base lists the entries and removes an entry with its sidecars.
+    """
+
+    sidecar_suffixes: Tuple[str, ...] = ()
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _open_writer(self) -> JSONArrayWriter:
+        os.makedirs(self.path, exist_ok=True)
+        return JSONArrayWriter(self.path)
+
+    def _write_json_file(self, file_path: str, value):
+        os.makedirs(self.path, exist_ok=True)
+        fd, temp_file = tempfile.mkstemp(dir=self.path, prefix='.', suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f, separators=(',', ':'))
+
+            os.replace(temp_file, file_path)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    def _list_entries(self) -> List[Tuple[os.stat_result, str]]:
+        entries = []
+        for entry_file in glob.glob(os.path.join(self.path, '*.json')):
+            try:
+                entries.append((os.stat(entry_file), entry_file))
+            except OSError:
+                continue
+
+        return entries
+
+    def _remove_entry(self, entry_file: str):
+        _LOGGER.debug(f'[_remove_entry] evict {type(self).__name__} entry: {entry_file}')
+        entry_path = entry_file[:-len('.json')]
+        for file_path in [entry_file] + [entry_path + suffix for suffix in self.sidecar_suffixes]:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+    def _evict_expired(self, max_age: float) -> int:
+        now = time.time()
+        evicted = 0
+        for stat, entry_file in self._list_entries():
+            if now - stat.st_mtime > max_age:
+                self._remove_entry(entry_file)
+                evicted += 1
+
+        return evicted
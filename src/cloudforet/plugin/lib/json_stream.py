@@ -0,0 +1,131 @@
+import io
+import bz2
+import gzip
+import json
+import lzma
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from typing import Iterator, List, TextIO
+
+__all__ = ['iter_json_array', 'open_json_file']
+
+_CHUNK_SIZE = 1024 * 1024
+_MAX_ITEM_SIZE = 64 * 1024 * 1024
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+_TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+_COMPRESSIONS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open
+}
+
+
+@contextmanager
+def open_json_file(file_path: str) -> Iterator[TextIO]:
+    """ Open a JSON file as text, also when it is compressed (.gz, .bz2, .xz) or the only JSON file of an archive
+    (.zip, .tar, .tar.gz, ...) """
+    lower_file_path = file_path.lower()
+
+    if lower_file_path.endswith('.zip'):
+        with zipfile.ZipFile(file_path) as archive:
+            member = _get_json_member(archive.namelist(), file_path)
+            with io.TextIOWrapper(archive.open(member), encoding='utf-8') as f:
+                yield f
+
+    elif lower_file_path.endswith(_TAR_EXTENSIONS):
+        with tarfile.open(file_path) as archive:
+            member = _get_json_member([info.name for info in archive.getmembers() if info.isfile()], file_path)
+            with io.TextIOWrapper(archive.extractfile(member), encoding='utf-8') as f:
+                yield f
+
+    else:
+        extension = next((extension for extension in _COMPRESSIONS if lower_file_path.endswith(extension)), None)
+        if extension:
+            f = _COMPRESSIONS[extension](file_path, 'rt', encoding='utf-8')
+        else:
+            f = open(file_path, 'r')
+
+        with f:
+            yield f
+
+
+def _get_json_member(names: List[str], file_path: str) -> str:
+    json_names = [name for name in names if name.lower().endswith('.json')]
+    if len(json_names) != 1:
+        raise ValueError(f'Archive must contain exactly one JSON file. (file_path = {file_path}, '
+                         f'json_files = {json_names})')
+
+    return json_names[0]
+
+
+def iter_json_array(file_path: str, chunk_size: int = _CHUNK_SIZE,
+                    max_item_size: int = _MAX_ITEM_SIZE) -> Iterator[dict]:
+    """ Yield the items of a top-level JSON array one at a time.
+
+    Only the current item and one read chunk are kept in memory,
+    so the peak memory does not depend on the size of the file. The file can be compressed, see open_json_file.
+    An item that is malformed or larger than `max_item_size` characters raises ValueError.
+    """
+    decoder = json.JSONDecoder()
+
+    with open_json_file(file_path) as f:
+        buffer = ''
+        position = 0
+        started = False
+        eof = False
+
+        while True:
+            position = _skip_separators(buffer, position, started)
+
+            if position < len(buffer) and not started:
+                if buffer[position] != '[':
+                    raise ValueError(f'JSON array is expected. (file_path = {file_path})')
+                started = True
+                position += 1
+                continue
+
+            if position < len(buffer) and buffer[position] == ']':
+                return
+
+            if position < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    # A value that ends with the buffer can go on in the next chunk, so can a number before
+                    # its fraction or exponent.
+                    if eof or (end < len(buffer) and
+                               (type(item) not in (int, float) or buffer[end] not in _NUMBER_CHARS)):
+                        yield item
+                        position = end
+                        continue
+
+                if len(buffer) - position > max_item_size:
+                    raise ValueError(f'JSON array item is malformed or larger than {max_item_size} characters. '
+                                     f'(file_path = {file_path})')
+
+            if eof:
+                if started:
+                    raise ValueError(f'JSON array is not closed. (file_path = {file_path})')
+                return
+
+            chunk = f.read(chunk_size)
+            eof = chunk == ''
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def _skip_separators(buffer: str, position: int, started: bool) -> int:
+    while position < len(buffer):
+        char = buffer[position]
+        if char in _WHITESPACE or (started and char == ','):
+            position += 1
+        else:
+            break
+
+    return position
@@ -0,0 +1,174 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List
+
+__all__ = ['PhaseTimer', 'MetricsRegistry', 'get_metrics_registry']
+
+_LOGGER = logging.getLogger(__name__)
+
+_DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600, 1800, 3600)
+
+
+class PhaseTimer:
+    """ Wall clock time spent in the phases of one collect, and the counts recorded along the way """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.resource_usage: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str, exclude: List[str] = None):
+        """ Time a phase; the time recorded meanwhile by the `exclude` phases is not counted twice """
+        exclude = exclude or []
+        excluded_before = sum(self.phases.get(excluded_name, 0.0) for excluded_name in exclude)
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            excluded = sum(self.phases.get(excluded_name, 0.0) for excluded_name in exclude) - excluded_before
+            self.add(name, time.perf_counter() - started_at - excluded)
+
+    def time_iter(self, name: str, iterable: Iterable, count_name: str = None) -> Iterator:
+        """ Pass the items through and record the time spent producing them """
+        iterator = iter(iterable)
+        elapsed = 0.0
+        count = 0
+
+        try:
+            while True:
+                started_at = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started_at
+
+                count += 1
+                yield item
+        finally:
+            self.add(name, elapsed)
+            if count_name:
+                self.count(count_name, count)
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def add_resource_usage(self, cpu_seconds: float, peak_rss: int):
+        """ CPU seconds are summed over the scan processes, the peak RSS is the largest of them """
+        with self._lock:
+            self.resource_usage['cpu_seconds'] = self.resource_usage.get('cpu_seconds', 0.0) + cpu_seconds
+            self.resource_usage['peak_rss'] = max(self.resource_usage.get('peak_rss', 0), peak_rss)
+
+
+class MetricsRegistry:
+    """ Process wide counters, gauges and histograms, exported in the Prometheus text format """
+
+    def __init__(self, buckets: tuple = _DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._descriptions = {}
+        self._values = {}
+
+    def describe(self, name: str, metric_type: str, description: str):
+        with self._lock:
+            self._descriptions[name] = (metric_type, description)
+
+    def inc(self, name: str, labels: dict, value: float = 1):
+        key = _make_key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, labels: dict, value: float):
+        with self._lock:
+            self._values[_make_key(name, labels)] = value
+
+    def observe(self, name: str, labels: dict, value: float):
+        key = _make_key(name, labels)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+
+            for index, bucket in enumerate(self.buckets):
+                if value <= bucket:
+                    histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for name, (metric_type, description) in sorted(self._descriptions.items()):
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {metric_type}')
+
+                for (metric_name, labels), value in sorted(self._values.items()):
+                    if metric_name != name:
+                        continue
+
+                    if metric_type == 'histogram':
+                        lines.extend(self._render_histogram(name, labels, value))
+                    else:
+                        lines.append(f'{name}{_format_labels(labels)} {value}')
+
+            return '\n'.join(lines) + '\n'
+
+    def write_text_file(self, path: str):
+        """ Write the metrics atomically, e.g. for the textfile collector of node_exporter """
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_file = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.render())
+            os.chmod(temp_file, 0o644)
+            os.replace(temp_file, path)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    def _render_histogram(self, name: str, labels: tuple, histogram: dict) -> List[str]:
+        lines = []
+        for bucket, count in zip(self.buckets, histogram['buckets']):
+            lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bucket)),))} {count}')
+        lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {histogram["count"]}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {histogram["sum"]}')
+        lines.append(f'{name}_count{_format_labels(labels)} {histogram["count"]}')
+        return lines
+
+
+def _make_key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+
+    formatted_labels = []
+    for key, value in labels:
+        value = value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        formatted_labels.append(f'{key}="{value}"')
+
+    return '{' + ','.join(formatted_labels) + '}'
+
+
+_REGISTRY = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _REGISTRY
@@ -0,0 +1,185 @@
+import os
+import time
+import signal
+import logging
+import threading
+import subprocess
+from typing import List, Optional
+
+from cloudforet.plugin.lib.cancellation import CancellationToken
+
+__all__ = ['run_process', 'ProcessResult', 'ProcessCancelledError', 'ProcessLimitExceededError']
+
+_LOGGER = logging.getLogger(__name__)
+_KILL_TIMEOUT = 5
+_POLL_INTERVAL = 0.1
+_STDERR_CHUNK_SIZE = 4096
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class ProcessCancelledError(Exception):
+    pass
+
+
+class ProcessLimitExceededError(Exception):
+
+    def __init__(self, message: str, stderr: bytes = b''):
+        super().__init__(message)
+        self.stderr = stderr
+
+
+class ProcessResult:
+    """ Exit code, stderr tail and resource usage of a finished process """
+
+    __slots__ = ('args', 'returncode', 'stderr', 'wall_time', 'cpu_seconds', 'peak_rss')
+
+    def __init__(self, args: List[str], returncode: int, stderr: bytes, wall_time: float, cpu_seconds: float,
+                 peak_rss: int):
+        self.args = args
+        self.returncode = returncode
+        self.stderr = stderr
+        self.wall_time = wall_time
+        self.cpu_seconds = cpu_seconds
+        self.peak_rss = peak_rss
+
+
+class _StderrTail:
+    """ Drains a pipe in a background thread and keeps only the last `max_size` bytes """
+
+    def __init__(self, pipe, max_size: int):
+        self._pipe = pipe
+        self._max_size = max_size
+        self._tail = bytearray()
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        for chunk in iter(lambda: self._pipe.read1(_STDERR_CHUNK_SIZE), b''):
+            self._tail += chunk
+            if len(self._tail) > self._max_size:
+                self._dropped += len(self._tail) - self._max_size
+                del self._tail[:len(self._tail) - self._max_size]
+
+        self._pipe.close()
+
+    def get(self) -> bytes:
+        self._thread.join(_KILL_TIMEOUT)
+        if self._dropped:
+            return f'... ({self._dropped} bytes truncated)\n'.encode() + bytes(self._tail)
+        return bytes(self._tail)
+
+
+def run_process(cmd: List[str], env: dict = None, cancellation_token: Optional[CancellationToken] = None,
+                timeout: float = 0, max_rss: int = 0, max_virtual_memory: int = 0,
+                stderr_tail_size: int = 64 * 1024) -> ProcessResult:
+    """ Run a command in its own process group under a wall clock timeout and memory limits
+
+    The whole group is killed when the token is cancelled or a limit is exceeded. `max_rss` is enforced by
+    polling the resident set size of the whole group, `max_virtual_memory` with RLIMIT_AS, which every process
+    started by the command inherits. Limits of 0 are disabled.
+    """
+    started_at = time.monotonic()
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env,
+                               start_new_session=True)
+    stderr_tail = _StderrTail(process.stderr, stderr_tail_size)
+
+    if max_virtual_memory > 0:
+        _set_address_space_limit(process.pid, max_virtual_memory)
+
+    def _terminate():
+        _LOGGER.debug(f'[run_process] terminate process group: {process.pid}')
+        _signal_process_group(process.pid, signal.SIGTERM)
+        threading.Timer(_KILL_TIMEOUT, _signal_process_group, args=(process.pid, signal.SIGKILL)).start()
+
+    if cancellation_token:
+        cancellation_token.add_callback(_terminate)
+
+    limit_exceeded = None
+    try:
+        while True:
+            pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+            if pid != 0:
+                process.returncode = os.waitstatus_to_exitcode(status)
+                break
+
+            if limit_exceeded is None:
+                if 0 < timeout < time.monotonic() - started_at:
+                    limit_exceeded = f'Process exceeded the time limit of {timeout} seconds.'
+                elif max_rss > 0 and _get_group_rss(process.pid) > max_rss:
+                    limit_exceeded = f'Process exceeded the memory limit of {max_rss} bytes (RSS).'
+
+                if limit_exceeded:
+                    _LOGGER.warning(f'[run_process] {limit_exceeded} (pid = {process.pid})')
+                    _terminate()
+
+            time.sleep(_POLL_INTERVAL)
+    finally:
+        if cancellation_token:
+            cancellation_token.remove_callback(_terminate)
+
+        # Nothing started by the command outlives it, whether it finished, failed or was cancelled.
+        _signal_process_group(process.pid, signal.SIGKILL)
+        if process.returncode is None:
+            process.wait()
+
+    stderr = stderr_tail.get()
+
+    if cancellation_token and cancellation_token.is_cancelled:
+        raise ProcessCancelledError(f'Process is cancelled: {cmd[0]}')
+
+    if limit_exceeded:
+        raise ProcessLimitExceededError(limit_exceeded, stderr)
+
+    return ProcessResult(cmd, process.returncode, stderr, time.monotonic() - started_at,
+                         rusage.ru_utime + rusage.ru_stime, _get_peak_rss(rusage))
+
+
+def _set_address_space_limit(pid: int, max_virtual_memory: int):
+    try:
+        resource.prlimit(pid, resource.RLIMIT_AS, (max_virtual_memory, max_virtual_memory))
+    except (AttributeError, OSError, ValueError) as e:
+        _LOGGER.warning(f'[run_process] failed to set the address space limit: {e}')
+
+
+def _get_group_rss(pgid: int) -> int:
+    """ Resident set size of every process of the group, prowler's own workers included """
+    try:
+        pids = [int(name) for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return _get_rss(pgid)
+
+    return sum(_get_rss(pid) for pid in pids if _get_process_group(pid) == pgid)
+
+
+def _get_process_group(pid: int) -> Optional[int]:
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            # state, ppid and pgrp follow the command name in parentheses
+            return int(f.read().rsplit(')', 1)[1].split()[2])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _get_rss(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _get_peak_rss(rusage) -> int:
+    # ru_maxrss is in kilobytes on Linux
+    return rusage.ru_maxrss * 1024
+
+
+def _signal_process_group(pgid: int, signal_number: int):
+    try:
+        os.killpg(pgid, signal_number)
+    except (ProcessLookupError, PermissionError):
+        pass
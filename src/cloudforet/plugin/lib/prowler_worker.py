@@ -0,0 +1,238 @@
+import os
+import sys
+import inspect
+import importlib.util
+import contextlib
+import logging
+import threading
+import weakref
+import multiprocessing
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from cloudforet.plugin.lib.cancellation import CancellationToken
+
+__all__ = ['execute_prowler', 'ProwlerWorkerError', 'ProwlerWorkerCancelledError']
+
+_LOGGER = logging.getLogger(__name__)
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# Pools whose workers were terminated for a cancelled scan; the other scans they ran start over.
+_RECYCLED_POOLS = weakref.WeakSet()
+
+# Set in the worker processes: check metadata and compliance frameworks per provider, loaded once per process,
+# and the error of the preload, which is reported by every scan of the worker.
+_METADATA = {}
+_PRELOAD_ERROR = None
+
+
+class ProwlerWorkerError(Exception):
+    pass
+
+
+class ProwlerWorkerCancelledError(ProwlerWorkerError):
+    pass
+
+
+def execute_prowler(args: List[str], env: dict = None, max_workers: int = 1,
+                    cancellation_token: Optional[CancellationToken] = None) -> List[dict]:
+    """ Run prowler with CLI style arguments in a long-lived, pre-imported worker process.
+
+    Findings are returned as the same dicts prowler writes to output.json. A cancelled scan is dropped
+    if it is still queued; a running one cannot be stopped inside its worker, so the whole pool is recycled:
+    its workers are terminated and the other scans it was running start over in a new pool.
+    The time and memory limits of the subprocess mode (PROWLER_LIMITS) do not apply to the workers.
+    ImportError is raised when prowler cannot be imported, so the caller can run prowler as a subprocess instead.
+    """
+    if not _is_prowler_installed():
+        raise ImportError('prowler is not installed.')
+
+    while True:
+        if cancellation_token and cancellation_token.is_cancelled:
+            raise ProwlerWorkerCancelledError('Prowler scan is cancelled.')
+
+        pool = _get_pool(max_workers)
+        future = pool.submit(_execute_prowler, args, env or {})
+
+        def _cancel():
+            if not future.cancel():
+                _recycle_pool(pool)
+
+        if cancellation_token:
+            cancellation_token.add_callback(_cancel)
+
+        try:
+            return future.result()
+        except (CancelledError, BrokenProcessPool) as e:
+            if cancellation_token and cancellation_token.is_cancelled:
+                raise ProwlerWorkerCancelledError('Prowler scan is cancelled.')
+
+            if pool in _RECYCLED_POOLS:
+                _LOGGER.debug('[execute_prowler] worker pool is recycled by a cancelled scan, run the scan again')
+                continue
+
+            _reset_pool(pool)
+            raise ProwlerWorkerError(f'Prowler worker process is terminated. ({e})')
+        finally:
+            if cancellation_token:
+                cancellation_token.remove_callback(_cancel)
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    global _POOL
+
+    with _POOL_LOCK:
+        if _POOL is None:
+            _LOGGER.debug(f'[_get_pool] start prowler worker pool: max_workers = {max_workers}')
+            _POOL = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=_preload_prowler)
+        return _POOL
+
+
+def _reset_pool(pool: ProcessPoolExecutor = None):
+    """ Drop the current pool, or the given one if it is still the current pool """
+    global _POOL
+
+    with _POOL_LOCK:
+        if _POOL is not None and pool in (None, _POOL):
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+def _recycle_pool(pool: ProcessPoolExecutor):
+    """ Terminate the workers of a pool that runs a cancelled scan, new scans start another pool """
+    global _POOL
+
+    with _POOL_LOCK:
+        if pool in _RECYCLED_POOLS:
+            return
+
+        _LOGGER.debug('[_recycle_pool] terminate the prowler workers of a cancelled scan')
+        _RECYCLED_POOLS.add(pool)
+        if _POOL is pool:
+            _POOL = None
+
+    # ProcessPoolExecutor has no public way to stop a running call, its workers are terminated instead.
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _is_prowler_installed() -> bool:
+    return importlib.util.find_spec('prowler') is not None
+
+
+def _preload_prowler():
+    # Importing prowler, boto3 and the check metadata is the expensive part of a scan's startup.
+    # A failing initializer would break the whole pool, so the error is kept and raised by the scans instead.
+    global _PRELOAD_ERROR
+
+    try:
+        _load_metadata('aws')
+    except Exception as e:
+        _PRELOAD_ERROR = e
+
+
+def _load_metadata(provider: str) -> tuple:
+    if provider not in _METADATA:
+        from prowler.lib.check.check import (bulk_load_checks_metadata, bulk_load_compliance_frameworks,
+                                             update_checks_metadata_with_compliance)
+
+        bulk_checks_metadata = bulk_load_checks_metadata(provider)
+        bulk_compliance_frameworks = bulk_load_compliance_frameworks(provider)
+        bulk_checks_metadata = update_checks_metadata_with_compliance(bulk_compliance_frameworks,
+                                                                      bulk_checks_metadata)
+        _METADATA[provider] = (bulk_checks_metadata, bulk_compliance_frameworks)
+
+    return _METADATA[provider]
+
+
+def _execute_prowler(args: List[str], env: dict) -> List[dict]:
+    old_environ = dict(os.environ)
+    os.environ.update(env)
+
+    try:
+        if _PRELOAD_ERROR is not None:
+            raise _PRELOAD_ERROR
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return _run_checks(args)
+    except SystemExit as e:
+        raise ProwlerWorkerError(f'Prowler exited with code {e.code}.')
+    except (ProwlerWorkerError, ImportError):
+        raise
+    except Exception as e:
+        raise ProwlerWorkerError(f'{type(e).__name__}: {e}')
+    finally:
+        os.environ.clear()
+        os.environ.update(old_environ)
+
+
+def _run_checks(args: List[str]) -> List[dict]:
+    from prowler.lib.cli.parser import ProwlerArgumentParser
+    from prowler.lib.check.check import execute_checks
+    from prowler.providers.common.audit_info import set_provider_audit_info
+    from prowler.providers.common.outputs import set_provider_output_options
+
+    prowler_args = ProwlerArgumentParser().parse(['prowler'] + args)
+    provider = prowler_args.provider
+    bulk_checks_metadata, checks_to_execute = _load_checks_to_execute(prowler_args)
+
+    # Service clients fetch their resources with the audit info of the moment they are imported,
+    # so the clients and the checks bound to them are re-imported for every scan.
+    _purge_service_modules(provider)
+
+    audit_info = set_provider_audit_info(provider, prowler_args.__dict__)
+    output_options = set_provider_output_options(provider, prowler_args, audit_info, prowler_args.allowlist_file,
+                                                 bulk_checks_metadata)
+    # Findings are handed back as objects, so prowler does not have to write any report file.
+    output_options.output_modes = []
+
+    findings = execute_checks(checks_to_execute, provider, audit_info, output_options)
+    return [_make_check_result(finding, audit_info, output_options) for finding in findings]
+
+
+def _make_check_result(finding, audit_info, output_options) -> dict:
+    from prowler.lib.outputs.models import Check_Output_JSON
+
+    try:
+        from prowler.lib.outputs.json import fill_json
+    except ImportError:
+        from prowler.lib.outputs.outputs import fill_json
+
+    finding_output = Check_Output_JSON(**finding.check_metadata.dict())
+
+    # Older prowler releases do not take the output options (and do not fill the compliance map).
+    if len(inspect.signature(fill_json).parameters) > 3:
+        fill_json(finding_output, audit_info, finding, output_options)
+    else:
+        fill_json(finding_output, audit_info, finding)
+
+    return finding_output.dict()
+
+
+def _load_checks_to_execute(prowler_args) -> tuple:
+    from prowler.lib.check.checks_loader import load_checks_to_execute
+
+    bulk_checks_metadata, bulk_compliance_frameworks = _load_metadata(prowler_args.provider)
+    checks_to_execute = load_checks_to_execute(
+        bulk_checks_metadata, bulk_compliance_frameworks, prowler_args.checks_file, prowler_args.checks,
+        prowler_args.services, prowler_args.severity, prowler_args.compliance, prowler_args.categories,
+        prowler_args.provider)
+
+    return bulk_checks_metadata, sorted(checks_to_execute)
+
+
+def _purge_service_modules(provider: str):
+    """ Drop the service client modules and the check modules, which import the clients by name
+
+    The service modules with the resource models and the rest of prowler stay imported.
+    """
+    prefix = f'prowler.providers.{provider}.services.'
+    for module_name in [name for name in sys.modules if name.startswith(prefix)]:
+        names = module_name[len(prefix):].split('.')
+        # <service>.<service>_client and <service>.<check>.<check>
+        if names[-1].endswith('_client') or (len(names) == 3 and names[1] == names[2]):
+            del sys.modules[module_name]
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import glob
+import logging
+import threading
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from cloudforet.plugin.lib.file_store import FileStore, make_hash
+from cloudforet.plugin.lib.json_stream import iter_json_array
+
+__all__ = ['ScanCache', 'make_cache_scope']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def make_cache_scope(secret_data: dict, regions: List[str], prowler_version: str) -> str:
+    """ Cache scope of a scan: who scans (account and credential identity), where and with which prowler """
+    role_arn = secret_data.get('role_arn', '')
+    account_id = secret_data.get('account_id') or (role_arn.split(':')[4] if role_arn.count(':') >= 5 else '')
+    credential_identity = make_hash([secret_data.get('aws_access_key_id'), role_arn,
+                                     secret_data.get('external_id', '')])
+
+    return make_hash([account_id, credential_identity, sorted(regions), prowler_version])
+
+
+class ScanCache(FileStore):
+    """ On-disk cache of raw prowler findings
+
+    An entry is the findings file of one scan and a sidecar with its check set. A lookup within the same scope
+    is a hit when an entry is younger than the TTL and its checks cover the requested checks, so the scan of one
+    framework can be reused by another. Entries are written atomically and evicted least recently used first
+    when the cache grows beyond `max_size` bytes.
+    """
+
+    sidecar_suffixes = ('.checks',)
+
+    def __init__(self, path: str, ttl: int, max_size: int):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._stats = {'hit': 0, 'miss': 0, 'write': 0, 'eviction': 0}
+
+    def get(self, scope: str, checks: List[str]) -> Optional[Tuple[Iterator[dict], float]]:
+        """ Findings of a cached scan covering the checks and the time of that scan """
+        now = time.time()
+        required_checks = set(checks)
+
+        for checks_file in glob.glob(os.path.join(self.path, f'{scope}-*.checks')):
+            findings_file = checks_file[:-len('.checks')] + '.json'
+            try:
+                stat = os.stat(findings_file)
+                if now - stat.st_mtime > self.ttl:
+                    continue
+
+                with open(checks_file, 'r') as f:
+                    if not required_checks.issubset(json.load(f)):
+                        continue
+
+                # Only the access time is touched, so the TTL keeps counting from the scan itself.
+                os.utime(findings_file, (now, stat.st_mtime))
+                findings = self._iter_findings(findings_file, required_checks)
+            except (OSError, ValueError):
+                continue
+
+            self._count('hit')
+            _LOGGER.debug(f'[get] scan cache hit: {findings_file}')
+            return findings, stat.st_mtime
+
+        self._count('miss')
+        return None
+
+    def put(self, scope: str, checks: List[str], findings: Iterable[dict]) -> Iterator[dict]:
+        """ Pass the findings through and store them once they are all consumed """
+        entry_path = os.path.join(self.path, f'{scope}-{make_hash(sorted(checks))}')
+        writer = self._open_writer()
+
+        try:
+            for finding in findings:
+                writer.write(finding)
+                yield finding
+
+            self._write_json_file(entry_path + '.checks', sorted(checks))
+            writer.commit(entry_path + '.json')
+        finally:
+            writer.discard()
+
+        self._count('write')
+        self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def _iter_findings(findings_file: str, checks: set) -> Iterator[dict]:
+        # An entry of more checks also holds findings that were not requested, e.g. of checks reused from elsewhere.
+        for finding in iter_json_array(findings_file):
+            if finding['CheckID'] in checks:
+                yield finding
+
+    def _evict(self):
+        entries = self._list_entries()
+        total_size = sum(stat.st_size for stat, _ in entries)
+
+        # Least recently used first
+        for stat, findings_file in sorted(entries, key=lambda entry: entry[0].st_atime):
+            if total_size <= self.max_size:
+                break
+
+            self._remove_entry(findings_file)
+            total_size -= stat.st_size
+            self._count('eviction')
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
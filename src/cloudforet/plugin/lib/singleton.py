@@ -0,0 +1,29 @@
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+__all__ = ['LazySingleton']
+
+T = TypeVar('T')
+
+
+class LazySingleton(Generic[T]):
+    """ Process-wide object created by `factory` on the first get(), once even with concurrent callers
+
+    The factory usually reads the global config, so the object is not created at import time.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._instance: Optional[T] = None
+
+    def get(self) -> T:
+        with self._lock:
+            if self._instance is None:
+                self._instance = self._factory()
+            return self._instance
+
+    def reset(self):
+        """ Drop the object, the next get() creates a new one with the current config """
+        with self._lock:
+            self._instance = None
@@ -1,13 +1,29 @@
+import os
+import json
 import time
-import random
+import queue
 import logging
-from typing import Generator, List
-from prowler.lib.check.check import bulk_load_compliance_frameworks
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, Iterable, List
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from spaceone.core import config
 from cloudforet.plugin.error.custom import *
 from cloudforet.plugin.manager.collector_manager import CollectorManager
 from cloudforet.plugin.connector.aws_prowler_connector import AWSProwlerConnector
-from cloudforet.plugin.model.prowler.cloud_service_type import CloudServiceType
+from cloudforet.plugin.connector.aws_account_source_connector import ACCOUNT_SOURCES
+from cloudforet.plugin.lib.admission import AdmissionController, AdmissionCancelledError
+from cloudforet.plugin.lib.cancellation import CancellationToken, cancellation_scope, get_cancellation_token
+from cloudforet.plugin.lib.compliance_registry import get_compliance_framework
+from cloudforet.plugin.lib.delta_store import DeltaStore, make_delta_scope, make_resource_hash
+from cloudforet.plugin.lib.metrics import PhaseTimer, get_metrics_registry
+from cloudforet.plugin.lib.singleton import LazySingleton
+from cloudforet.plugin.model.prowler.cloud_service_type import CloudServiceType, FindingPageCloudServiceType
 from cloudforet.plugin.model.prowler.collector import COMPLIANCE_FRAMEWORKS
 
 _LOGGER = logging.getLogger(__name__)
@@ -29,6 +45,221 @@ _SEVERITY_SCORE_MAP = {
     'UNKNOWN': 1
 }
 
+_FINDING_DETAILS = ['all', 'fail_only', 'none']
+
+_BATCH_OPTIONS = ['member_role_arns', 'account_source', 'member_role_name', 'account_concurrency']
+_DEFAULT_ACCOUNT_CONCURRENCY = 4
+# Responses of the member accounts waiting to be sent; a full queue holds the account collects back
+_ACCOUNT_RESPONSE_QUEUE_SIZE = 256
+_ACCOUNT_FINISHED = object()
+
+_STATUS_CODES = {
+    'PASS': 0,
+    'FAIL': 1,
+    'INFO': 2
+}
+
+_STATUS_NAMES = list(_STATUS_CODES.keys())
+_SEVERITY_NAMES = list(_SEVERITY_SCORE_MAP.keys())
+_SEVERITY_CODES = {severity: code for code, severity in enumerate(_SEVERITY_NAMES)}
+_SEVERITY_CODE_SCORES = np.array(list(_SEVERITY_SCORE_MAP.values()), dtype=np.int64) if np is not None else None
+# A requirement takes the severity with the highest score; of the same score, the one listed first (LOW over UNKNOWN).
+_SEVERITY_RANKS = {
+    severity: score * len(_SEVERITY_NAMES) - _SEVERITY_CODES[severity]
+    for severity, score in _SEVERITY_SCORE_MAP.items()
+}
+
+_METRICS = [
+    ('prowler_collector_collects_total', 'counter', 'Number of collects by result state'),
+    ('prowler_collector_phase_duration_seconds', 'histogram', 'Wall clock time of each collect phase'),
+    ('prowler_collector_findings_total', 'counter', 'Number of prowler findings aggregated'),
+    ('prowler_collector_resources_total', 'counter', 'Number of resources returned'),
+    ('prowler_collector_scan_cpu_seconds_total', 'counter', 'CPU seconds used by prowler processes'),
+    ('prowler_collector_scan_peak_rss_bytes', 'gauge', 'Peak resident memory of the prowler processes of the last scan'),
+    ('prowler_collector_scan_cache_events_total', 'counter', 'Scan cache hits, misses, writes and evictions'),
+    ('prowler_collector_admission_running', 'gauge', 'Number of scans running'),
+    ('prowler_collector_admission_queue_depth', 'gauge', 'Number of scans waiting for admission'),
+    ('prowler_collector_admission_wait_seconds_total', 'counter', 'Total time scans waited for admission'),
+]
+
+for _name, _type, _description in _METRICS:
+    get_metrics_registry().describe(_name, _type, _description)
+
+
+def _make_delta_store() -> DeltaStore:
+    delta_store_conf = config.get_global('DELTA_STORE', {})
+    return DeltaStore(delta_store_conf.get('path', '/tmp/prowler-delta-store'),
+                      delta_store_conf.get('max_scopes', 10000), delta_store_conf.get('full_emit_interval', 0))
+
+
+_ADMISSION_CONTROLLER = LazySingleton(lambda: AdmissionController(config.get_global('MAX_CONCURRENT_SCANS', 4)))
+_DELTA_STORE = LazySingleton(_make_delta_store)
+
+
+def _put_response(responses: queue.Queue, response, cancellation_token: CancellationToken) -> bool:
+    """ Wait for room in the queue, unless the batch is cancelled and nobody reads it anymore """
+    while True:
+        try:
+            responses.put(response, timeout=0.1)
+            return True
+        except queue.Full:
+            if cancellation_token.is_cancelled:
+                return False
+
+
+def _get_finding_order(finding: dict) -> tuple:
+    return finding['check_id'], finding['region_code'], finding['finding_id']
+
+
+def _reduce_stats(keys, statuses, scores, size: int) -> dict:
+    stats = {}
+    for status, code in _STATUS_CODES.items():
+        mask = statuses == code
+        stats[status] = np.bincount(keys[mask], minlength=size)
+        stats[f'{status}_score'] = np.bincount(keys[mask], weights=scores[mask], minlength=size).astype(np.int64)
+
+    stats['total'] = np.bincount(keys, minlength=size)
+    return stats
+
+
+def _reduce_status(stats: dict):
+    return np.where(stats['FAIL'] > 0, _STATUS_CODES['FAIL'],
+                    np.where(stats['INFO'] > 0, _STATUS_CODES['INFO'], _STATUS_CODES['PASS']))
+
+
+def _set_stats(accumulator, stats: dict, code: int):
+    accumulator.findings_total = int(stats['total'][code])
+    accumulator.findings_pass = int(stats['PASS'][code])
+    accumulator.findings_fail = int(stats['FAIL'][code])
+    accumulator.findings_info = int(stats['INFO'][code])
+    accumulator.score_pass = int(stats['PASS_score'][code])
+    accumulator.score_fail = int(stats['FAIL_score'][code])
+
+
+class _CheckAccumulator:
+    """ Running status and stats of one check within a requirement """
+
+    __slots__ = ('check_id', 'check_title', 'service', 'sub_service', 'check_type', 'status', 'severity', 'risk',
+                 'remediation', 'score_pass', 'score_fail', 'findings_total', 'findings_pass', 'findings_fail',
+                 'findings_info')
+
+    def __init__(self, check_result: dict):
+        self.check_id = check_result['CheckID']
+        self.check_title = check_result['CheckTitle']
+        self.service = check_result['ServiceName']
+        self.sub_service = check_result['SubServiceName']
+        self.check_type = check_result['CheckType']
+        self.status = 'PASS'
+        self.severity = _SEVERITY_MAP.get(check_result['Severity'], 'UNKNOWN')
+        self.risk = check_result['Risk']
+        self.remediation = check_result['Remediation']
+        self.score_pass = 0
+        self.score_fail = 0
+        self.findings_total = 0
+        self.findings_pass = 0
+        self.findings_fail = 0
+        self.findings_info = 0
+
+    def add(self, status: str, score: int):
+        self.findings_total += 1
+
+        if status == 'FAIL':
+            self.status = 'FAIL'
+            self.score_fail += score
+            self.findings_fail += 1
+        elif status == 'INFO':
+            if self.status != 'FAIL':
+                self.status = 'INFO'
+            self.findings_info += 1
+        else:
+            self.score_pass += score
+            self.findings_pass += 1
+
+
+class _RequirementAccumulator:
+    """ Running status and stats of one compliance requirement, including the tally of its checks by status
+
+    Nothing depends on the order of the findings: the description and the service are those of the requirement's
+    first check by id, so a sharded or partly reused scan gives the same requirement as a serial one. Earlier
+    releases took them from the first finding in prowler's output, which is not the lowest check id when prowler
+    reports another check of the requirement first.
+    """
+
+    __slots__ = ('compliance_id', 'cloud_service_type', 'requirement_id', 'name', 'description', 'status',
+                 'severity', 'service', 'account', 'region_code', 'checks', 'findings', 'check_status_counts',
+                 'score_pass', 'score_fail', 'findings_total', 'findings_pass', 'findings_fail', 'findings_info',
+                 'code', 'check_id')
+
+    def __init__(self, compliance_id: str, cloud_service_type: str, requirement_id: str, name: str, severity: str,
+                 check_result: dict):
+        self.compliance_id = compliance_id
+        self.cloud_service_type = cloud_service_type
+        self.requirement_id = requirement_id
+        self.name = name
+        self.description = check_result['Description']
+        self.status = 'PASS'
+        self.severity = severity
+        self.service = check_result['ServiceName']
+        self.account = check_result['AccountId']
+        self.region_code = check_result['Region']
+        self.checks = {}
+        self.findings = []
+        self.check_status_counts = {'PASS': 0, 'FAIL': 0, 'INFO': 0}
+        self.score_pass = 0
+        self.score_fail = 0
+        self.findings_total = 0
+        self.findings_pass = 0
+        self.findings_fail = 0
+        self.findings_info = 0
+        self.code = None
+        self.check_id = check_result['CheckID']
+
+    def add_check(self, check_result: dict) -> _CheckAccumulator:
+        check = _CheckAccumulator(check_result)
+        self.checks[check.check_id] = check
+
+        if check.check_id < self.check_id:
+            self.check_id = check.check_id
+            self.description = check_result['Description']
+            self.service = check_result['ServiceName']
+
+        return check
+
+    def add(self, check_result: dict, status: str, severity: str, score: int, finding: dict):
+        if self.region_code != check_result['Region']:
+            self.region_code = 'global'
+
+        if _SEVERITY_RANKS[self.severity] < _SEVERITY_RANKS[severity]:
+            self.severity = severity
+
+        self.findings_total += 1
+
+        if status == 'FAIL':
+            self.status = 'FAIL'
+            self.score_fail += score
+            self.findings_fail += 1
+        elif status == 'INFO':
+            if self.status != 'FAIL':
+                self.status = 'INFO'
+            self.findings_info += 1
+        else:
+            self.score_pass += score
+            self.findings_pass += 1
+
+        if finding is not None:
+            self.findings.append(finding)
+
+        check = self.checks.get(check_result['CheckID'])
+        if check is None:
+            check = self.add_check(check_result)
+            self.check_status_counts[check.status] += 1
+
+        old_check_status = check.status
+        check.add(status, score)
+        if check.status != old_check_status:
+            self.check_status_counts[old_check_status] -= 1
+            self.check_status_counts[check.status] += 1
+
 
 class AWSProwlerManager(CollectorManager):
 
@@ -38,110 +269,828 @@ class AWSProwlerManager(CollectorManager):
         self.provider = 'aws'
         self.cloud_service_group = 'Prowler'
         self.cloud_service_type = None
+        self.cloud_service_types = []
         self.compliance_framework_info = {}
+        self.aggregation_mode = 'dict'
+        self.max_findings_per_resource = 0
+        self.finding_detail = 'all'
+        self.delta = False
+        self.delta_scopes = {}
+        self.stream_results = False
+        self.failed_checks = set()
+        self.reuse_fresh_checks = False
+        self.observed_at = None
+        self.check_observed_at = {}
+        self.replay_file = None
+        self.phase_timer = PhaseTimer()
+
+    def collect(self, options: dict, secret_data: dict, schema: str,
+                domain_id: str = None) -> Generator[dict, None, None]:
+        is_batch = options.get('member_role_arns') or options.get('account_source', 'static') != 'static'
+        if is_batch and not options.get('replay_file'):
+            yield from self._collect_accounts(options, secret_data, schema, domain_id)
+            return
 
-    def collect(self, options: dict, secret_data: dict, schema: str) -> Generator[dict, None, None]:
-        self.cloud_service_type = options['compliance_framework']
-        self._check_compliance_framework()
-        self._load_compliance_framework_info()
+        self.phase_timer = PhaseTimer()
+        self.cloud_service_types = self._get_cloud_service_types(options['compliance_framework'])
 
-        self._wait_random_time()
+        with self.phase_timer.phase('load_compliance_framework_info'):
+            if options['compliance_framework'] == 'all':
+                self.cloud_service_types = self._get_available_cloud_service_types(self.cloud_service_types)
 
+            self._check_compliance_framework()
+            self._load_compliance_framework_info()
+
+        if len(self.cloud_service_types) == 1:
+            self.cloud_service_type = self.cloud_service_types[0]
+
+        self.aggregation_mode = options.get('aggregation_mode', 'dict')
+        if self.aggregation_mode == 'columnar' and np is None:
+            _LOGGER.warning('[collect] numpy is not installed, fall back to the dict aggregation.')
+
+        self.max_findings_per_resource = max(int(options.get('max_findings_per_resource', 0)), 0)
+
+        self.finding_detail = options.get('finding_detail', 'all')
+        if self.finding_detail not in _FINDING_DETAILS:
+            raise ERROR_INVALID_PARAMETER(key='options.finding_detail',
+                                          reason=f'Not supported finding detail. (finding_details = {_FINDING_DETAILS})')
+
+        self.delta = options.get('delta', False)
+        self.reuse_fresh_checks = options.get('reuse_fresh_checks', False)
+
+        self.replay_file = self._get_replay_file(options['replay_file']) if options.get('replay_file') else None
+
+        self.stream_results = options.get('stream_results', False)
+        if self.stream_results and (options.get('checkpoint', False) or self.replay_file):
+            _LOGGER.debug('[collect] checkpointed and replayed scans are not streamed.')
+            self.stream_results = False
+
+        if self.stream_results and self.aggregation_mode == 'columnar':
+            _LOGGER.debug('[collect] streamed results are aggregated with the dict aggregation.')
+
+        collect_state = 'failure'
         try:
-            check_results = self.aws_prowler_connector.check(options, secret_data, schema)
-
-            # Return Cloud Service Type
-            cloud_service_type = CloudServiceType(name=self.cloud_service_type, provider=self.provider)
-            cloud_service_type.metadata['query_sets'][0]['name'] = f'AWS {self.cloud_service_type}'
-            yield self.make_response(cloud_service_type.dict(),
-                                     {'1': ['name', 'group', 'provider']},
-                                     resource_type='inventory.CloudServiceType')
-
-            # Return compliance results (Cloud Services)
-            for compliance_result in self.make_compliance_results(check_results):
-                yield self.make_response(compliance_result, {'1': [
-                    'reference.resource_id', 'provider', 'cloud_service_type', 'cloud_service_group', 'account']})
+            # A single scan covers every selected framework.
+            options = dict(options, compliance_framework=self.cloud_service_types)
+            completed_checks = []
+            failed_units = []
+            self.observed_at = time.time()
+            self.check_observed_at = {}
+
+            if self.replay_file:
+                # A replay does not scan, so it does not wait for admission.
+                check_results = self._remap_compliance(
+                    self.aws_prowler_connector.replay(self.replay_file, phase_timer=self.phase_timer))
+            else:
+                with _ADMISSION_CONTROLLER.get().admit(domain_id, get_cancellation_token()) as wait_time:
+                    self.phase_timer.add('admission_wait', wait_time)
+                    # The scanned checks are observed now, the reused ones when their stored findings were scanned.
+                    self.observed_at = time.time()
+                    check_results = self.aws_prowler_connector.check(
+                        options, secret_data, schema, phase_timer=self.phase_timer,
+                        on_checks_completed=completed_checks.extend if self.stream_results else None,
+                        on_units_failed=failed_units.extend, on_checks_reused=self.check_observed_at.update)
+                    self.failed_checks = {check_id for unit in failed_units for check_id in unit['checks']}
+
+                    # A streamed scan only runs while its results are consumed, so it keeps its admission until then.
+                    if self.stream_results:
+                        yield from self._make_cloud_service_type_responses()
+                        yield from self._make_compliance_responses(
+                            self._stream_compliance_results(check_results, completed_checks), domain_id)
+
+            if not self.stream_results:
+                yield from self._make_cloud_service_type_responses()
+                yield from self._make_compliance_responses(self.make_compliance_results(check_results), domain_id)
+
+            if failed_units:
+                collect_state = 'partial_failure'
+                yield self.error_response(self._make_partial_failure_error(failed_units))
+            else:
+                collect_state = 'success'
+
+        except AdmissionCancelledError:
+            yield self.error_response(ERROR_SCAN_CANCELLED())
 
         except Exception as e:
             yield self.error_response(e)
 
-    def make_compliance_results(self, check_results: List[dict]) -> List[dict]:
-        compliance_results = {}
+        finally:
+            self._finish_delta_scopes(collect_state == 'success')
+            self._report_phase_timings(collect_state)
+
+    @staticmethod
+    def _get_replay_file(replay_file: str) -> str:
+        """ Resolve the replay file inside the replay directory, nothing else of the file system can be read """
+        replay_conf = config.get_global('REPLAY', {})
+        if replay_conf.get('enabled', False) is False:
+            raise ERROR_INVALID_PARAMETER(key='options.replay_file', reason='Replay is not enabled.')
+
+        replay_dir = os.path.realpath(replay_conf['path'])
+        replay_file_path = os.path.realpath(os.path.join(replay_dir, replay_file))
+        if os.path.commonpath([replay_dir, replay_file_path]) != replay_dir:
+            raise ERROR_INVALID_PARAMETER(key='options.replay_file',
+                                          reason=f'Replay file must be inside the replay directory. ({replay_dir})')
+
+        if not os.path.isfile(replay_file_path):
+            raise ERROR_INVALID_PARAMETER(key='options.replay_file', reason=f'File not found. ({replay_file})')
+
+        return replay_file_path
+
+    def _remap_compliance(self, check_results: Iterable[dict]) -> Generator[dict, None, None]:
+        """ Map the replayed findings to the requirements of the installed frameworks
+
+        A stored output carries the compliance map of the prowler that scanned it, so frameworks added or changed
+        since then are backfilled from the current definitions.
+        """
+        check_requirements = {
+            cloud_service_type: get_compliance_framework(
+                self.provider, COMPLIANCE_FRAMEWORKS['aws'][cloud_service_type]).check_requirements
+            for cloud_service_type in self.cloud_service_types
+        }
+
+        for check_result in check_results:
+            compliance = dict(check_result.get('Compliance') or {})
+            for cloud_service_type, requirements in check_requirements.items():
+                requirement_ids = requirements.get(check_result['CheckID'])
+                if requirement_ids:
+                    compliance[cloud_service_type] = requirement_ids
+                else:
+                    compliance.pop(cloud_service_type, None)
+
+            check_result['Compliance'] = compliance
+            yield check_result
+
+    def _collect_accounts(self, options: dict, secret_data: dict, schema: str,
+                          domain_id: str = None) -> Generator[dict, None, None]:
+        """ Scan the member accounts of a batch concurrently and stream their results as they come
+
+        Every member account is scanned by assuming its role with the given credentials. An account that cannot be
+        collected returns its own error response, the other accounts go on.
+        """
+        account_source = options.get('account_source', 'static')
+        if account_source not in ACCOUNT_SOURCES:
+            raise ERROR_INVALID_PARAMETER(key='options.account_source',
+                                          reason=f'Not supported account source. '
+                                                 f'(account_sources = {list(ACCOUNT_SOURCES.keys())})')
+
+        accounts = self.locator.get_connector(ACCOUNT_SOURCES[account_source]).list_accounts(options, secret_data)
+        account_concurrency = max(int(options.get('account_concurrency', _DEFAULT_ACCOUNT_CONCURRENCY)), 1)
+        account_options = {key: value for key, value in options.items() if key not in _BATCH_OPTIONS}
+        _LOGGER.debug(f'[_collect_accounts] collect {len(accounts)} accounts (concurrency = {account_concurrency})')
+
+        # The accounts stop with the collect, and when the caller stops reading their responses.
+        cancellation_token = CancellationToken()
+        collect_cancellation_token = get_cancellation_token()
+        if collect_cancellation_token:
+            collect_cancellation_token.add_callback(cancellation_token.cancel)
+
+        responses = queue.Queue(maxsize=_ACCOUNT_RESPONSE_QUEUE_SIZE)
+        returned_cloud_service_types = set()
+        finished_accounts = 0
+        with ThreadPoolExecutor(max_workers=account_concurrency) as executor:
+            try:
+                for account in accounts:
+                    account_secret_data = dict(secret_data, role_arn=account['role_arn'])
+                    executor.submit(self._collect_account, account['account_id'], account_options,
+                                    account_secret_data, schema, domain_id, cancellation_token, responses)
+
+                while finished_accounts < len(accounts):
+                    response = responses.get()
+                    if response is _ACCOUNT_FINISHED:
+                        finished_accounts += 1
+                        continue
+
+                    # Every account returns the same cloud service types, they are only needed once.
+                    if response['resource_type'] == 'inventory.CloudServiceType':
+                        cloud_service_type = response['resource']['name']
+                        if cloud_service_type in returned_cloud_service_types:
+                            continue
+                        returned_cloud_service_types.add(cloud_service_type)
+
+                    yield response
+            finally:
+                if finished_accounts < len(accounts):
+                    cancellation_token.cancel()
+
+                if collect_cancellation_token:
+                    collect_cancellation_token.remove_callback(cancellation_token.cancel)
+
+    def _collect_account(self, account_id: str, options: dict, secret_data: dict, schema: str, domain_id: str,
+                         cancellation_token: CancellationToken, responses: queue.Queue):
+        collector_mgr: AWSProwlerManager = self.locator.get_manager(AWSProwlerManager)
+        with cancellation_scope(cancellation_token):
+            account_responses = collector_mgr.collect(options, secret_data, schema, domain_id)
+            try:
+                for response in account_responses:
+                    if not _put_response(responses, response, cancellation_token):
+                        return
+            except Exception as e:
+                # e.g. invalid options, which are raised before the collect starts
+                _put_response(responses, collector_mgr.error_response(e), cancellation_token)
+            finally:
+                account_responses.close()
+                _LOGGER.debug(f'[_collect_account] account is collected: {account_id}')
+                _put_response(responses, _ACCOUNT_FINISHED, cancellation_token)
+
+    def _make_cloud_service_type_responses(self) -> Generator[dict, None, None]:
+        for cloud_service_type_name in self.cloud_service_types:
+            cloud_service_type = CloudServiceType(name=cloud_service_type_name, provider=self.provider)
+            cloud_service_type.metadata['query_sets'][0]['name'] = f'AWS {cloud_service_type_name}'
+            yield from self._stream_response(self.make_response(cloud_service_type.dict(),
+                                                                {'1': ['name', 'group', 'provider']},
+                                                                resource_type='inventory.CloudServiceType'))
+
+            if self.max_findings_per_resource > 0:
+                finding_page_type = FindingPageCloudServiceType(
+                    name=self._get_finding_page_type(cloud_service_type_name), provider=self.provider)
+                yield from self._stream_response(self.make_response(finding_page_type.dict(),
+                                                                    {'1': ['name', 'group', 'provider']},
+                                                                    resource_type='inventory.CloudServiceType'))
+
+    def _make_compliance_responses(self, compliance_results: Iterable[dict],
+                                   domain_id: str) -> Generator[dict, None, None]:
+        if self.delta:
+            compliance_results = self._make_delta_results(compliance_results, domain_id)
+
+        for compliance_result in compliance_results:
+            with self.phase_timer.phase('response_validation'):
+                response = self.make_response(compliance_result, {'1': [
+                    'reference.resource_id', 'provider', 'cloud_service_type', 'cloud_service_group', 'account']})
+
+            yield from self._stream_response(response)
+
+    def _stream_response(self, response: dict) -> Generator[dict, None, None]:
+        # The time the caller spends between two resources is the protobuf encoding and the gRPC send.
+        self.phase_timer.count('resources')
+        with self.phase_timer.phase('response_streaming'):
+            yield response
+
+    def _report_phase_timings(self, collect_state: str):
+        labels = {'provider': self.provider, 'framework': ','.join(self.cloud_service_types)}
+        phases = {name: round(seconds, 6) for name, seconds in self.phase_timer.phases.items()}
+        counts = self.phase_timer.counts
+        resource_usage = self.phase_timer.resource_usage
+        timings = dict(labels, state=collect_state, phases=phases, counts=counts, resource_usage=resource_usage)
+
+        _LOGGER.info(f'[collect] phase timings: {json.dumps(timings)}')
+
+        metrics_conf = config.get_global('METRICS', {})
+        if metrics_conf.get('enabled', False) is False:
+            return
+
+        registry = get_metrics_registry()
+        registry.inc('prowler_collector_collects_total', dict(labels, state=collect_state))
+        for phase, seconds in phases.items():
+            registry.observe('prowler_collector_phase_duration_seconds', dict(labels, phase=phase), seconds)
+        registry.inc('prowler_collector_findings_total', labels, counts.get('findings', 0))
+        registry.inc('prowler_collector_resources_total', labels, counts.get('resources', 0))
+        if resource_usage:
+            registry.inc('prowler_collector_scan_cpu_seconds_total', labels, resource_usage['cpu_seconds'])
+            registry.set('prowler_collector_scan_peak_rss_bytes', labels, resource_usage['peak_rss'])
+
+        for event, value in self.aws_prowler_connector.get_scan_cache_stats().items():
+            registry.set('prowler_collector_scan_cache_events_total', {'event': event}, value)
+
+        admission_stats = _ADMISSION_CONTROLLER.get().stats()
+        registry.set('prowler_collector_admission_running', {}, admission_stats['running'])
+        registry.set('prowler_collector_admission_queue_depth', {}, admission_stats['queue_depth'])
+        registry.set('prowler_collector_admission_wait_seconds_total', {}, admission_stats['wait_time_total'])
+
+        try:
+            registry.write_text_file(metrics_conf['path'])
+        except OSError as e:
+            _LOGGER.warning(f'[_report_phase_timings] failed to write metrics: {e}')
+
+    def make_compliance_results(self, check_results: Iterable[dict]) -> List[dict]:
+        # Findings are parsed while they are aggregated, so the parsing time is left to json_loading.
+        with self.phase_timer.phase('aggregation', exclude=['json_loading']):
+            if self.aggregation_mode == 'columnar' and np is not None:
+                requirements = self._aggregate_columnar(check_results)
+            else:
+                requirements = self._aggregate(check_results)
+
+        if self.failed_checks:
+            requirements = self._drop_incomplete_requirements(requirements)
+
+        with self.phase_timer.phase('conversion'):
+            return self._convert_results(requirements)
+
+    def _drop_incomplete_requirements(self, requirements: dict) -> dict:
+        """ Leave out the requirements with a check in a failed unit, so that they keep their last collected result
+        instead of being reported on a part of their findings """
+        requirement_checks = {
+            cloud_service_type: get_compliance_framework(
+                self.provider, COMPLIANCE_FRAMEWORKS['aws'][cloud_service_type]).requirement_checks
+            for cloud_service_type in self.cloud_service_types
+        }
+
+        complete_requirements = {}
+        for compliance_id, requirement in requirements.items():
+            checks = requirement_checks[requirement.cloud_service_type].get(requirement.requirement_id, [])
+            if self.failed_checks.isdisjoint(checks):
+                complete_requirements[compliance_id] = requirement
+
+        _LOGGER.debug(f'[_drop_incomplete_requirements] incomplete requirements: '
+                      f'{len(requirements) - len(complete_requirements)}')
+        return complete_requirements
+
+    @staticmethod
+    def _make_partial_failure_error(failed_units: List[dict]) -> ERROR_PARTIAL_SCAN_FAILURE:
+        unit_names = [f'{unit["region"] or "all regions"}/{unit["service"]}' for unit in failed_units]
+        return ERROR_PARTIAL_SCAN_FAILURE(failed_units=', '.join(unit_names), reason=failed_units[0]['reason'])
+
+    def _stream_compliance_results(self, check_results: Iterable[dict],
+                                   completed_checks: List[str]) -> Generator[dict, None, None]:
+        """ Aggregate the findings while the scan runs and return every requirement once all its checks completed
+
+        The connector appends to `completed_checks` while it returns the findings of the next batch,
+        so the aggregation is paused at every batch boundary to hand out the requirements that are complete.
+        """
+        check_results = iter(check_results)
+        requirement_checks = {
+            cloud_service_type: get_compliance_framework(
+                self.provider, COMPLIANCE_FRAMEWORKS['aws'][cloud_service_type]).requirement_checks
+            for cloud_service_type in self.cloud_service_types
+        }
+        requirements = {}
+        returned_compliance_ids = set()
+        finished_checks = set()
+        scan_finished = False
+
+        def _iter_batch():
+            nonlocal scan_finished
+            for check_result in check_results:
+                yield check_result
+                if completed_checks:
+                    return
+            scan_finished = True
+
+        while not scan_finished:
+            with self.phase_timer.phase('aggregation', exclude=['json_loading', 'prowler_execution']):
+                self._aggregate(_iter_batch(), requirements)
+
+            finished_checks.update(completed_checks)
+            completed_checks.clear()
+
+            completed_requirements = {}
+            for compliance_id, requirement in requirements.items():
+                if compliance_id in returned_compliance_ids:
+                    continue
+
+                checks = requirement_checks[requirement.cloud_service_type].get(requirement.requirement_id, [])
+                if scan_finished or finished_checks.issuperset(checks):
+                    completed_requirements[compliance_id] = requirement
+
+            if completed_requirements:
+                _LOGGER.debug(f'[_stream_compliance_results] completed requirements: {len(completed_requirements)} '
+                              f'(finished checks = {len(finished_checks)})')
+                returned_compliance_ids.update(completed_requirements.keys())
+
+                with self.phase_timer.phase('conversion'):
+                    compliance_results = self._convert_results(completed_requirements)
+
+                yield from compliance_results
+
+    def _aggregate(self, check_results: Iterable[dict], requirements: dict = None) -> dict:
+        if requirements is None:
+            requirements = {}
+
         for check_result in check_results:
-            account = check_result['AccountId']
-            requirements = check_result.get('Compliance', {}).get(self.cloud_service_type, [])
-            for requirement_id in requirements:
-                compliance_id = f'prowler:aws:{account}:{self.cloud_service_type}:{requirement_id}'.lower()
-                check_id = check_result['CheckID']
-                status = check_result['Status']
-                region_code = check_result['Region']
+            compliance = check_result.get('Compliance', {})
+            account = None
+
+            for cloud_service_type in self.cloud_service_types:
+                requirement_ids = compliance.get(cloud_service_type)
+                if not requirement_ids:
+                    continue
+
+                if account is None:
+                    account = check_result['AccountId']
+                    status = check_result['Status']
+                    severity = _SEVERITY_MAP.get(check_result['Severity'], 'UNKNOWN')
+                    score = _SEVERITY_SCORE_MAP[severity]
+                    finding = self._make_finding(check_result) if self._is_detailed(status) else None
+
+                for requirement_id in requirement_ids:
+                    compliance_id = f'prowler:aws:{account}:{cloud_service_type}:{requirement_id}'.lower()
+
+                    requirement = requirements.get(compliance_id)
+                    if requirement is None:
+                        requirement = _RequirementAccumulator(
+                            compliance_id, cloud_service_type, requirement_id,
+                            self.compliance_framework_info[cloud_service_type][requirement_id], severity, check_result)
+                        requirements[compliance_id] = requirement
+
+                    requirement.add(check_result, status, severity, score, finding)
+
+        return requirements
+
+    def _aggregate_columnar(self, check_results: Iterable[dict]) -> dict:
+        """ Same result as _aggregate, but the stats are computed with grouped NumPy reductions
+
+        The per-finding loop only looks up the group of the finding (its check in its account with the same
+        compliance map) and records the group, status, severity and region as integer codes. The (finding,
+        requirement) rows are expanded from the groups with NumPy, and the detailed findings are handed to the
+        requirements of their group as a whole.
+        """
+        requirements = {}
+        checks = []
+        check_requirement_codes = array('q')
+        check_codes = {}
+        region_codes = {}
+        groups = {}
+
+        # The (requirement, check) pairs of every group, stored one group after another
+        pair_requirement_column = array('q')
+        pair_check_column = array('q')
+        group_offsets = array('q')
+        group_sizes = array('q')
+        group_requirements = []
+        group_findings = []
+
+        group_column = array('q')
+        status_column = array('q')
+        severity_column = array('q')
+        region_column = array('q')
+
+        for check_result in check_results:
+            compliance = check_result.get('Compliance', {})
+            group_key = (check_result['AccountId'], check_result['CheckID'])
+
+            group_code = None
+            for group_compliance, code in groups.get(group_key, ()):
+                if group_compliance == compliance:
+                    group_code = code
+                    break
+
+            # Findings of the same check map to the same requirements, so the pairs are resolved once per group.
+            if group_code is None:
+                group_code = len(group_requirements)
+                groups.setdefault(group_key, []).append((compliance, group_code))
+                group_offsets.append(len(pair_requirement_column))
+                requirements_of_group = []
+
+                account, check_id = group_key
                 severity = _SEVERITY_MAP.get(check_result['Severity'], 'UNKNOWN')
-                score = _SEVERITY_SCORE_MAP[severity]
+                for cloud_service_type in self.cloud_service_types:
+                    for requirement_id in compliance.get(cloud_service_type) or []:
+                        compliance_id = f'prowler:aws:{account}:{cloud_service_type}:{requirement_id}'.lower()
 
-                if compliance_id not in compliance_results:
-                    compliance_results[compliance_id] = self._make_base_compliance_result(
-                        compliance_id, requirement_id, severity, check_result)
+                        requirement = requirements.get(compliance_id)
+                        if requirement is None:
+                            requirement = _RequirementAccumulator(
+                                compliance_id, cloud_service_type, requirement_id,
+                                self.compliance_framework_info[cloud_service_type][requirement_id], severity,
+                                check_result)
+                            requirement.code = len(requirements)
+                            requirements[compliance_id] = requirement
 
-                check_exists = check_id in compliance_results[compliance_id]['data']['checks']
+                        check_code = check_codes.get((requirement.code, check_id))
+                        if check_code is None:
+                            check = requirement.add_check(check_result)
+                            check_code = len(checks)
+                            check_codes[(requirement.code, check_id)] = check_code
+                            checks.append(check)
+                            check_requirement_codes.append(requirement.code)
 
-                if compliance_results[compliance_id]['region_code'] != region_code:
-                    compliance_results[compliance_id]['region_code'] = 'global'
+                        pair_requirement_column.append(requirement.code)
+                        pair_check_column.append(check_code)
+                        requirements_of_group.append(requirement)
 
-                compliance_results[compliance_id]['data']['severity'] = self._update_severity(
-                    compliance_results[compliance_id]['data']['severity'], severity)
+                group_sizes.append(len(requirements_of_group))
+                group_requirements.append(requirements_of_group)
+                group_findings.append([])
 
-                compliance_results[compliance_id]['data'] = self._update_compliance_status_and_stats(
-                    compliance_results[compliance_id]['data'], status, score)
+            if not group_requirements[group_code]:
+                continue
 
-                compliance_results[compliance_id]['data']['findings'].append(self._make_finding(check_result))
+            status = check_result['Status']
+            group_column.append(group_code)
+            status_column.append(_STATUS_CODES.get(status, 0))
+            severity_column.append(_SEVERITY_CODES[_SEVERITY_MAP.get(check_result['Severity'], 'UNKNOWN')])
+            region_column.append(region_codes.setdefault(check_result['Region'], len(region_codes)))
+            if self._is_detailed(status):
+                group_findings[group_code].append(self._make_finding(check_result))
 
-                if not check_exists:
-                    compliance_results[compliance_id]['data']['checks'][check_id] = self._make_check(check_result)
+        if not requirements:
+            return requirements
 
-                compliance_results[compliance_id]['data']['checks'][check_id] = self._update_check_status_and_stats(
-                    compliance_results[compliance_id]['data']['checks'][check_id], status, score)
+        # Findings are sorted at conversion, so the findings of a group are handed over in one piece.
+        for requirements_of_group, findings in zip(group_requirements, group_findings):
+            if findings:
+                for requirement in requirements_of_group:
+                    requirement.findings.extend(findings)
 
-        return self._convert_results(compliance_results)
+        # Every finding becomes one row per pair of its group: row r of finding f is the pair at
+        # group_offsets[group of f] + (r - first row of f).
+        finding_groups = np.frombuffer(group_column, dtype=np.int64)
+        finding_sizes = np.frombuffer(group_sizes, dtype=np.int64)[finding_groups]
+        finding_starts = np.cumsum(finding_sizes) - finding_sizes
+        finding_keys = np.repeat(np.arange(len(finding_groups), dtype=np.int64), finding_sizes)
+        pair_keys = np.repeat(np.frombuffer(group_offsets, dtype=np.int64)[finding_groups] - finding_starts,
+                              finding_sizes) + np.arange(len(finding_keys), dtype=np.int64)
 
-    def _convert_results(self, compliance_results):
-        results = []
-        for compliance_result in compliance_results.values():
-            total_check_count = 0
-            pass_check_count = 0
-            fail_check_count = 0
-            info_check_count = 0
-
-            compliance_result['data']['stats']['score']['percent'] = \
-                self._calculate_score(compliance_result['data']['stats'])
-
-            changed_checks = []
-            for check in compliance_result['data']['checks'].values():
-                total_check_count += 1
-                if check['status'] == 'FAIL':
-                    fail_check_count += 1
-                elif check['status'] == 'INFO':
-                    info_check_count += 1
-                else:
-                    pass_check_count += 1
-
-                check['display'] = self._make_check_display(check['stats'])
-                check['stats']['score']['percent'] = self._calculate_score(check['stats'])
-                changed_checks.append(check)
-
-            compliance_result['data']['checks'] = changed_checks
-            compliance_result['data']['stats']['checks'] = {
-                'total': total_check_count,
-                'pass': pass_check_count,
-                'fail': fail_check_count,
-                'info': info_check_count
+        requirement_keys = np.frombuffer(pair_requirement_column, dtype=np.int64)[pair_keys]
+        check_keys = np.frombuffer(pair_check_column, dtype=np.int64)[pair_keys]
+        statuses = np.frombuffer(status_column, dtype=np.int64)[finding_keys]
+        severities = np.frombuffer(severity_column, dtype=np.int64)[finding_keys]
+        regions = np.frombuffer(region_column, dtype=np.int64)[finding_keys]
+        scores = _SEVERITY_CODE_SCORES[severities]
+
+        requirement_count = len(requirements)
+        requirement_stats = _reduce_stats(requirement_keys, statuses, scores, requirement_count)
+        check_stats = _reduce_stats(check_keys, statuses, scores, len(checks))
+
+        check_statuses = _reduce_status(check_stats)
+        check_requirement_keys = np.frombuffer(check_requirement_codes, dtype=np.int64)
+        check_status_counts = {
+            status: np.bincount(check_requirement_keys[check_statuses == code], minlength=requirement_count)
+            for status, code in _STATUS_CODES.items()
+        }
+
+        # The requirement severity has the highest score, of the same score the one with the lowest code wins.
+        max_scores = np.full(requirement_count, -1, dtype=np.int64)
+        np.maximum.at(max_scores, requirement_keys, scores)
+        max_score_rows = np.nonzero(scores == max_scores[requirement_keys])[0]
+        requirement_severities = np.full(requirement_count, len(_SEVERITY_NAMES), dtype=np.int64)
+        np.minimum.at(requirement_severities, requirement_keys[max_score_rows], severities[max_score_rows])
+
+        # The region is "global" as soon as two findings of a requirement come from different regions.
+        min_regions = np.full(requirement_count, len(region_codes), dtype=np.int64)
+        max_regions = np.full(requirement_count, -1, dtype=np.int64)
+        np.minimum.at(min_regions, requirement_keys, regions)
+        np.maximum.at(max_regions, requirement_keys, regions)
+
+        requirement_statuses = _reduce_status(requirement_stats)
+        region_names = list(region_codes.keys())
+
+        for code, requirement in enumerate(requirements.values()):
+            _set_stats(requirement, requirement_stats, code)
+            requirement.status = _STATUS_NAMES[requirement_statuses[code]]
+            requirement.severity = _SEVERITY_NAMES[requirement_severities[code]]
+            requirement.region_code = 'global' if min_regions[code] != max_regions[code] \
+                else region_names[min_regions[code]]
+            requirement.check_status_counts = {
+                status: int(counts[code]) for status, counts in check_status_counts.items()
             }
 
-            compliance_result['data']['display'] = self._make_compliance_display(compliance_result['data']['stats'])
+        for code, check in enumerate(checks):
+            _set_stats(check, check_stats, code)
+            check.status = _STATUS_NAMES[check_statuses[code]]
+
+        return requirements
 
-            results.append(compliance_result)
+    def _convert_results(self, requirements: dict) -> List[dict]:
+        """ Requirements in framework order, with their checks by id and their findings by check, region and
+        finding id
+
+        Shards and reused checks hand in the findings in another order than a serial scan, the results must not
+        depend on it. Earlier releases returned the requirements and checks in the order their first finding came
+        in, so the order of the responses differs from theirs; their content does not.
+        """
+        requirement_orders = {
+            cloud_service_type: {requirement_id: index for index, requirement_id
+                                 in enumerate(self.compliance_framework_info[cloud_service_type])}
+            for cloud_service_type in self.cloud_service_types
+        }
+        cloud_service_type_orders = {cloud_service_type: index
+                                     for index, cloud_service_type in enumerate(self.cloud_service_types)}
+
+        results = []
+        for requirement in sorted(requirements.values(), key=lambda requirement: (
+                cloud_service_type_orders[requirement.cloud_service_type],
+                requirement_orders[requirement.cloud_service_type][requirement.requirement_id])):
+            requirement.findings.sort(key=_get_finding_order)
+            results.append(self._make_compliance_result(requirement))
+
+            if 0 < self.max_findings_per_resource < len(requirement.findings):
+                results.extend(self._make_finding_pages(requirement))
 
         return results
 
+    def _make_delta_results(self, compliance_results: Iterable[dict], domain_id: str) -> Generator[dict, None, None]:
+        """ Replace the resources whose content did not change since the last delta collect with a keep-alive
+
+        The keep-alive carries only the match rule keys, so the inventory still sees the resource as collected
+        (and does not garbage collect it) without reprocessing its data. The new hashes are kept in delta_scopes
+        until the collect is finished.
+        """
+        delta_store = _DELTA_STORE.get()
+        old_resource_hashes = {}
+        unchanged = 0
+
+        for compliance_result in compliance_results:
+            scope = make_delta_scope(domain_id, compliance_result['account'], self.provider,
+                                     compliance_result['cloud_service_type'])
+            if scope not in self.delta_scopes:
+                old_resource_hashes[scope], full_emitted_at = delta_store.load(scope)
+                # A scope without hashes is emitted in full by this collect.
+                self.delta_scopes[scope] = (full_emitted_at or time.time(), {})
+
+            resource_id = compliance_result['reference']['resource_id']
+            resource_hash = make_resource_hash(compliance_result)
+            self.delta_scopes[scope][1][resource_id] = resource_hash
+
+            if old_resource_hashes[scope].get(resource_id) == resource_hash:
+                unchanged += 1
+                yield self._make_keep_alive_result(compliance_result)
+            else:
+                yield compliance_result
+
+        _LOGGER.debug(f'[_make_delta_results] unchanged resources: {unchanged}')
+
+    def _finish_delta_scopes(self, succeeded: bool):
+        """ Save the hashes of a successful delta collect, or forget the scopes it touched
+
+        The hashes stand for what the inventory has, which is only known when the collect succeeded.
+        After an error, a cancellation or a stopped stream, the next delta collect emits these scopes in full.
+        """
+        if not self.delta_scopes:
+            return
+
+        delta_store = _DELTA_STORE.get()
+        for scope, (full_emitted_at, resource_hashes) in self.delta_scopes.items():
+            if succeeded:
+                delta_store.save(scope, resource_hashes, full_emitted_at)
+            else:
+                delta_store.invalidate(scope)
+
+        self.delta_scopes = {}
+
+    @staticmethod
+    def _make_keep_alive_result(compliance_result: dict) -> dict:
+        return {
+            'reference': {
+                'resource_id': compliance_result['reference']['resource_id']
+            },
+            'account': compliance_result['account'],
+            'provider': compliance_result['provider'],
+            'cloud_service_group': compliance_result['cloud_service_group'],
+            'cloud_service_type': compliance_result['cloud_service_type']
+        }
+
+    def _make_finding_pages(self, requirement: '_RequirementAccumulator') -> List[dict]:
+        """ Findings beyond the per-resource limit go out as child resources linked to the requirement """
+        limit = self.max_findings_per_resource
+        cloud_service_type = self._get_finding_page_type(requirement.cloud_service_type)
+
+        finding_pages = []
+        for page, start in enumerate(range(limit, len(requirement.findings), limit), start=1):
+            finding_pages.append({
+                'name': requirement.name,
+                'reference': {
+                    'resource_id': f'{requirement.compliance_id}:findings:{page}',
+                },
+                'data': {
+                    'requirement_id': requirement.requirement_id,
+                    'parent_resource_id': requirement.compliance_id,
+                    'page': page,
+                    'findings': requirement.findings[start:start + limit]
+                },
+                'metadata': {
+                    'view': {
+                        'sub_data': {
+                            'reference': {
+                                'resource_type': 'inventory.CloudServiceType',
+                                'options': {
+                                    'provider': self.provider,
+                                    'cloud_service_group': self.cloud_service_group,
+                                    'cloud_service_type': cloud_service_type,
+                                }
+                            }
+                        }
+                    }
+                },
+                'account': requirement.account,
+                'provider': self.provider,
+                'cloud_service_group': self.cloud_service_group,
+                'cloud_service_type': cloud_service_type,
+                'region_code': requirement.region_code
+            })
+
+        return finding_pages
+
+    @staticmethod
+    def _get_finding_page_type(cloud_service_type: str) -> str:
+        return f'{cloud_service_type}-Findings'
+
+    def _make_compliance_result(self, requirement: '_RequirementAccumulator') -> dict:
+        findings = requirement.findings
+        finding_pages = 0
+        if 0 < self.max_findings_per_resource < len(findings):
+            finding_pages = (len(findings) - 1) // self.max_findings_per_resource
+            findings = findings[:self.max_findings_per_resource]
+
+        stats = {
+            'score': {
+                'pass': requirement.score_pass,
+                'fail': requirement.score_fail,
+                'percent': 0
+            },
+            'checks': {
+                'total': len(requirement.checks),
+                'pass': requirement.check_status_counts['PASS'],
+                'fail': requirement.check_status_counts['FAIL'],
+                'info': requirement.check_status_counts['INFO']
+            },
+            'findings': {
+                'total': requirement.findings_total,
+                'pass': requirement.findings_pass,
+                'fail': requirement.findings_fail,
+                'info': requirement.findings_info
+            }
+        }
+        stats['score']['percent'] = self._calculate_score(stats)
+
+        compliance_result = {
+            'name': requirement.name,
+            'reference': {
+                'resource_id': requirement.compliance_id,
+            },
+            'data': {
+                'requirement_id': requirement.requirement_id,
+                'description': requirement.description,
+                'status': requirement.status,
+                'severity': requirement.severity,
+                'service': requirement.service,
+                'checks': [self._make_check(requirement.checks[check_id]) for check_id in sorted(requirement.checks)],
+                'findings': findings,
+                'display': self._make_compliance_display(stats),
+                'stats': stats
+            },
+            'metadata': {
+                'view': {
+                    'sub_data': {
+                        'reference': {
+                            'resource_type': 'inventory.CloudServiceType',
+                            'options': {
+                                'provider': self.provider,
+                                'cloud_service_group': self.cloud_service_group,
+                                'cloud_service_type': requirement.cloud_service_type,
+                            }
+                        }
+                    }
+                }
+            },
+            'account': requirement.account,
+            'provider': self.provider,
+            'cloud_service_group': self.cloud_service_group,
+            'cloud_service_type': requirement.cloud_service_type,
+            'region_code': requirement.region_code
+        }
+
+        if finding_pages > 0:
+            compliance_result['data']['finding_pages'] = finding_pages
+
+        if self.reuse_fresh_checks:
+            # The requirement is as old as its oldest check.
+            compliance_result['data']['observed_at'] = self._format_observed_at(
+                min(self._get_check_observed_at(check_id) for check_id in requirement.checks))
+
+        return compliance_result
+
+    def _make_check(self, check: '_CheckAccumulator') -> dict:
+        stats = {
+            'score': {
+                'pass': check.score_pass,
+                'fail': check.score_fail,
+                'percent': 0
+            },
+            'findings': {
+                'total': check.findings_total,
+                'pass': check.findings_pass,
+                'fail': check.findings_fail,
+                'info': check.findings_info,
+            }
+        }
+        stats['score']['percent'] = self._calculate_score(stats)
+
+        check_result = {
+            'check_id': check.check_id,
+            'check_title': check.check_title,
+            'service': check.service,
+            'sub_service': check.sub_service,
+            'check_type': check.check_type,
+            'status': check.status,
+            'severity': check.severity,
+            'risk': check.risk,
+            'remediation': self._make_remediation(check.remediation),
+            'stats': stats,
+            'display': self._make_check_display(stats)
+        }
+
+        if self.reuse_fresh_checks:
+            check_result['observed_at'] = self._format_observed_at(self._get_check_observed_at(check.check_id))
+
+        return check_result
+
+    def _get_check_observed_at(self, check_id: str) -> float:
+        return self.check_observed_at.get(check_id, self.observed_at)
+
+    @staticmethod
+    def _format_observed_at(observed_at: float) -> str:
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(observed_at))
+
     @staticmethod
     def _make_check_display(check_stats):
         findings_pass = check_stats['findings']['pass']
@@ -174,40 +1123,6 @@ class AWSProwlerManager(CollectorManager):
             'findings': f'{findings_pass}/{findings_total}'
         }
 
-    @staticmethod
-    def _update_severity(old_severity: str, new_severity: str) -> str:
-        if _SEVERITY_SCORE_MAP[old_severity] < _SEVERITY_SCORE_MAP[new_severity]:
-            return new_severity
-        return old_severity
-
-    def _make_check(self, check_result: dict) -> dict:
-        check = {
-            'check_id': check_result['CheckID'],
-            'check_title': check_result['CheckTitle'],
-            'service': check_result['ServiceName'],
-            'sub_service': check_result['SubServiceName'],
-            'check_type': check_result['CheckType'],
-            'status': 'PASS',
-            'severity': _SEVERITY_MAP.get(check_result['Severity'], 'UNKNOWN'),
-            'risk': check_result['Risk'],
-            'remediation': self._make_remediation(check_result['Remediation']),
-            'stats': {
-                'score': {
-                    'pass': 0,
-                    'fail': 0,
-                    'percent': 0
-                },
-                'findings': {
-                    'total': 0,
-                    'pass': 0,
-                    'fail': 0,
-                    'info': 0,
-                }
-            }
-        }
-
-        return check
-
     @staticmethod
     def _make_remediation(remediation_info):
         recommendation = remediation_info.get('Recommendation', {})
@@ -216,6 +1131,15 @@ class AWSProwlerManager(CollectorManager):
             'link': recommendation.get('Url', ''),
         }
 
+    def _is_detailed(self, status: str) -> bool:
+        # Findings that are not detailed only update the counters and are never materialized.
+        if self.finding_detail == 'fail_only':
+            return status == 'FAIL'
+        elif self.finding_detail == 'none':
+            return False
+        else:
+            return True
+
     @staticmethod
     def _make_finding(check_result: dict) -> dict:
         return {
@@ -230,131 +1154,56 @@ class AWSProwlerManager(CollectorManager):
         }
 
     @staticmethod
-    def _update_check_status_and_stats(check: dict, status: str, score: int) -> dict:
-        check['stats']['findings']['total'] += 1
+    def _get_cloud_service_types(compliance_framework) -> List[str]:
+        all_compliance_frameworks = list(COMPLIANCE_FRAMEWORKS['aws'].keys())
 
-        if status == 'FAIL':
-            check['status'] = 'FAIL'
-            check['stats']['score']['fail'] += score
-            check['stats']['findings']['fail'] += 1
-        elif status == 'INFO':
-            if check['status'] != 'FAIL':
-                check['status'] = 'INFO'
-            check['stats']['findings']['info'] += 1
+        if compliance_framework == 'all':
+            return all_compliance_frameworks
+        elif isinstance(compliance_framework, str):
+            return [compliance_framework]
+        elif isinstance(compliance_framework, list) and len(compliance_framework) > 0:
+            return list(dict.fromkeys(compliance_framework))
         else:
-            check['stats']['score']['pass'] += score
-            check['stats']['findings']['pass'] += 1
-
-        return check
-
-    @staticmethod
-    def _update_compliance_status_and_stats(compliance_result_data: dict, status: str, score: int) -> dict:
-        compliance_result_data['stats']['findings']['total'] += 1
+            raise ERROR_INVALID_PARAMETER(key='options.compliance_framework',
+                                          reason='Compliance framework must be a string, a list or "all".')
 
-        if status == 'FAIL':
-            compliance_result_data['status'] = 'FAIL'
-            compliance_result_data['stats']['score']['fail'] += score
-            compliance_result_data['stats']['findings']['fail'] += 1
-        elif status == 'INFO':
-            if compliance_result_data['status'] != 'FAIL':
-                compliance_result_data['status'] = 'INFO'
+    def _get_available_cloud_service_types(self, cloud_service_types: List[str]) -> List[str]:
+        """ Leave out the frameworks that the installed prowler does not have """
+        available_cloud_service_types = []
+        for cloud_service_type in cloud_service_types:
+            try:
+                get_compliance_framework(self.provider, COMPLIANCE_FRAMEWORKS['aws'][cloud_service_type])
+            except KeyError:
+                _LOGGER.warning(f'[_get_available_cloud_service_types] compliance framework is not found in the '
+                                f'installed prowler, skip it: {cloud_service_type}')
+                continue
 
-            compliance_result_data['stats']['findings']['info'] += 1
-        else:
-            compliance_result_data['stats']['score']['pass'] += score
-            compliance_result_data['stats']['findings']['pass'] += 1
-
-        # if not check_exists:
-        #     compliance_result_data['stats']['checks']['total'] += 1
-        #     if status == 'FAIL':
-        #         compliance_result_data['stats']['checks']['fail'] += 1
-        #     elif status == 'PASS':
-        #         compliance_result_data['stats']['checks']['pass'] += 1
-        #     else:
-        #         compliance_result_data['stats']['checks']['info'] += 1
-
-        return compliance_result_data
-
-    def _make_base_compliance_result(self, compliance_id: str, requirement_id: str, severity: str,
-                                     check_result: dict) -> dict:
-        compliance_result = {
-            'name': self.compliance_framework_info[requirement_id],
-            'reference': {
-                'resource_id': compliance_id,
-            },
-            'data': {
-                'requirement_id': requirement_id,
-                'description': check_result['Description'],
-                'status': 'PASS',
-                'severity': severity,
-                'service': check_result['ServiceName'],
-                'checks': {},
-                'findings': [],
-                'display': {
-                    'score': '',
-                    'score_percent': '',
-                    'checks': '',
-                    'findings': ''
-                },
-                'stats': {
-                    'score': {
-                        'pass': 0,
-                        'fail': 0,
-                        'percent': 0
-                    },
-                    'checks': {
-                        'total': 0,
-                        'pass': 0,
-                        'fail': 0,
-                        'info': 0,
-                    },
-                    'findings': {
-                        'total': 0,
-                        'pass': 0,
-                        'fail': 0,
-                        'info': 0,
-                    }
-                }
-            },
-            'metadata': {
-                'view': {
-                    'sub_data': {
-                        'reference': {
-                            'resource_type': 'inventory.CloudServiceType',
-                            'options': {
-                                'provider': self.provider,
-                                'cloud_service_group': self.cloud_service_group,
-                                'cloud_service_type': self.cloud_service_type,
-                            }
-                        }
-                    }
-                }
-            },
-            'account': check_result['AccountId'],
-            'provider': self.provider,
-            'cloud_service_group': self.cloud_service_group,
-            'cloud_service_type': self.cloud_service_type,
-            'region_code': check_result['Region']
-        }
-
-        return compliance_result
+            available_cloud_service_types.append(cloud_service_type)
 
-    @staticmethod
-    def _wait_random_time():
-        random_time = round(random.uniform(0, 5), 2)
-        _LOGGER.debug(f'[_wait_random_time] sleep time: {random_time}')
+        if not available_cloud_service_types:
+            raise ERROR_INVALID_PARAMETER(key='options.compliance_framework',
+                                          reason='No compliance framework is found in the installed prowler.')
 
-        time.sleep(random_time)
+        return available_cloud_service_types
 
     def _check_compliance_framework(self):
         all_compliance_frameworks = list(COMPLIANCE_FRAMEWORKS['aws'].keys())
-        if self.cloud_service_type not in all_compliance_frameworks:
-            raise ERROR_INVALID_PARAMETER(key='options.compliance_framework',
-                                          reason=f'Not supported compliance framework. '
-                                                 f'(compliance_frameworks = {all_compliance_frameworks})')
+        for cloud_service_type in self.cloud_service_types:
+            if cloud_service_type not in all_compliance_frameworks:
+                raise ERROR_INVALID_PARAMETER(key='options.compliance_framework',
+                                              reason=f'Not supported compliance framework. '
+                                                     f'(compliance_frameworks = {all_compliance_frameworks})')
+
+            compliance_framework = COMPLIANCE_FRAMEWORKS['aws'][cloud_service_type]
+            try:
+                get_compliance_framework(self.provider, compliance_framework)
+            except KeyError:
+                raise ERROR_INVALID_PARAMETER(key='options.compliance_framework',
+                                              reason=f'Compliance framework is not found in the installed prowler. '
+                                                     f'(compliance_framework = {compliance_framework})')
 
     def _load_compliance_framework_info(self):
-        compliance_framework = COMPLIANCE_FRAMEWORKS['aws'][self.cloud_service_type]
-        compliance_frameworks = bulk_load_compliance_frameworks(self.provider)
-        for requirement in compliance_frameworks[compliance_framework].Requirements:
-            self.compliance_framework_info[requirement.Id] = requirement.Description
+        for cloud_service_type in self.cloud_service_types:
+            compliance_framework = COMPLIANCE_FRAMEWORKS['aws'][cloud_service_type]
+            self.compliance_framework_info[cloud_service_type] = \
+                get_compliance_framework(self.provider, compliance_framework).requirement_descriptions
@@ -1,15 +1,34 @@
+import time
+import hashlib
 import logging
+import threading
 from typing import Generator
 
+from spaceone.core import config
 from spaceone.core.error import *
 from spaceone.core.manager import BaseManager
+from cloudforet.plugin.error.custom import *
 from cloudforet.plugin.model.plugin_info_model import ResourceType
 from cloudforet.plugin.model.resource_info_model import ResourceInfo, State
 from cloudforet.plugin.model.prowler.collector import AWSPluginInfo, AzurePluginInfo, GoogleCloudPluginInfo
 from cloudforet.plugin.connector.aws_prowler_connector import AWSProwlerConnector
+from cloudforet.plugin.connector.aws_identity_connector import AWSIdentityConnector
 
 _LOGGER = logging.getLogger(__name__)
 
+# Credential fingerprint -> expiry time of the last successful identity verification
+_VERIFIED_CREDENTIALS = {}
+_VERIFIED_CREDENTIALS_LOCK = threading.Lock()
+
+# Envelope schema of a collect response, compiled once: field -> (allowed values or types, default)
+_RESPONSE_ENVELOPE_SCHEMA = {
+    'state': ({state.value: state for state in State}, None),
+    'resource_type': ({resource_type.value: resource_type for resource_type in ResourceType}, None),
+    'message': ((str,), None),
+    'match_rules': ((dict,), None),
+    'resource': ((dict,), None)
+}
+
 
 class CollectorManager(BaseManager):
 
@@ -37,9 +56,17 @@ class CollectorManager(BaseManager):
             raise ERROR_INVALID_PARAMETER(key='options.provider', reason='Not supported provider.')
 
     def verify_client(self, options: dict, secret_data: dict, schema: str) -> None:
+        """ Verify the credentials of a collector
+
+        AWS credentials are verified with one STS identity call by default (`verify_mode` 'identity'), which no
+        longer checks that prowler runs. `verify_mode` 'prowler' runs prowler as the verification did before.
+        """
         provider = options.get('provider')
         if provider == 'aws':
-            self.aws_prowler_connector.verify_client(options, secret_data, schema)
+            if options.get('verify_mode', 'identity') == 'prowler':
+                self.aws_prowler_connector.verify_client(options, secret_data, schema)
+            else:
+                self._verify_identity(secret_data)
         elif provider == 'azure':
             pass
         elif provider == 'google_cloud':
@@ -47,7 +74,33 @@ class CollectorManager(BaseManager):
         else:
             raise ERROR_INVALID_PARAMETER(key='options.provider', reason='Not supported provider.')
 
-    def collect(self, options: dict, secret_data: dict, schema: str) -> Generator[dict, None, None]:
+    def _verify_identity(self, secret_data: dict):
+        """ Verify the credentials with one STS call; successful verifications are cached for a short time """
+        if 'aws_access_key_id' not in secret_data:
+            raise ERROR_REQUIRED_PARAMETER(key='secret_data.aws_access_key_id')
+
+        if 'aws_secret_access_key' not in secret_data:
+            raise ERROR_REQUIRED_PARAMETER(key='secret_data.aws_secret_access_key')
+
+        fingerprint = _make_credential_fingerprint(secret_data)
+        now = time.monotonic()
+
+        with _VERIFIED_CREDENTIALS_LOCK:
+            if _VERIFIED_CREDENTIALS.get(fingerprint, 0) > now:
+                _LOGGER.debug('[_verify_identity] credentials are already verified')
+                return
+
+        # The connector is looked up by name, so it can be replaced with the CONNECTORS backend config.
+        identity_connector: AWSIdentityConnector = self.locator.get_connector('AWSIdentityConnector')
+        identity_connector.get_caller_identity(secret_data)
+
+        with _VERIFIED_CREDENTIALS_LOCK:
+            for expired_fingerprint in [key for key, expires_at in _VERIFIED_CREDENTIALS.items() if expires_at <= now]:
+                del _VERIFIED_CREDENTIALS[expired_fingerprint]
+            _VERIFIED_CREDENTIALS[fingerprint] = now + config.get_global('VERIFY_CACHE_TTL', 300)
+
+    def collect(self, options: dict, secret_data: dict, schema: str,
+                domain_id: str = None) -> Generator[dict, None, None]:
         raise NotImplementedError('Method not implemented!')
 
     def make_response(self, resource_data: dict, match_rules: dict,
@@ -78,5 +131,32 @@ class CollectorManager(BaseManager):
 
     @staticmethod
     def validate_response(resource_data):
-        response = ResourceInfo(**resource_data)
-        return response.dict()
+        # The full pydantic validation walks the whole resource dict and is only used for debugging.
+        if config.get_global('RESPONSE_VALIDATION', 'fast') == 'full':
+            response = ResourceInfo(**resource_data)
+            return response.dict()
+
+        return _validate_response_envelope(resource_data)
+
+
+def _make_credential_fingerprint(secret_data: dict) -> str:
+    credentials = [secret_data.get(key, '') for key in
+                   ['aws_access_key_id', 'aws_secret_access_key', 'role_arn', 'external_id']]
+    return hashlib.sha256('\0'.join(credentials).encode()).hexdigest()
+
+
+def _validate_response_envelope(resource_data: dict) -> dict:
+    response = {}
+    for key, (rule, default) in _RESPONSE_ENVELOPE_SCHEMA.items():
+        value = resource_data.get(key, default)
+
+        if isinstance(rule, dict):
+            if not isinstance(value, str) or value not in rule:
+                raise ERROR_INVALID_RESPONSE(key=key, reason=f'{value} is not one of {list(rule.keys())}')
+            value = rule[value]
+        elif value is not None and not isinstance(value, rule):
+            raise ERROR_INVALID_RESPONSE(key=key, reason=f'{type(value).__name__} is not {rule[0].__name__}')
+
+        response[key] = value
+
+    return response
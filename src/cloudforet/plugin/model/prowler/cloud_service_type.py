@@ -1,6 +1,116 @@
 from typing import List
 from cloudforet.plugin.model.cloud_service_type_model import BaseCloudServiceType
 
+_FINDINGS_LAYOUT = {
+    'type': 'query-search-table',
+    'name': 'Findings',
+    'options': {
+        'unwind': {
+            'path': 'data.findings'
+        },
+        'default_sort': {
+            'key': 'data.findings.status',
+            'desc': False
+        },
+        'search': [
+            {
+                'key': 'data.requirement_id',
+                'name': 'Requirement ID'
+            },
+            {
+                'key': 'data.findings.check_title',
+                'name': 'Check Title'
+            },
+            {
+                'key': 'data.findings.status',
+                'name': 'Status',
+                'enums': [
+                    'FAIL',
+                    'PASS',
+                    'INFO'
+                ]
+            },
+            {
+                'key': 'data.findings.resource_type',
+                'name': 'Resource Type'
+            },
+            {
+                'key': 'data.findings.resource',
+                'name': 'Resource'
+            },
+            {
+                'key': 'data.findings.region_code',
+                'name': 'Region'
+            }
+        ],
+        'fields': [
+            {
+                'type': 'text',
+                'key': 'data.requirement_id',
+                'name': 'Requirement ID'
+            },
+            {
+                'type': 'text',
+                'key': 'data.findings.check_title',
+                'name': 'Check Title'
+            },
+            {
+                'type': 'enum',
+                'name': 'Status',
+                'key': 'data.findings.status',
+                'options': {
+                    'FAIL': {
+                        'type': 'badge',
+                        'options': {
+                            'background_color': 'coral.500'
+                        }
+                    },
+                    'PASS': {
+                        'type': 'badge',
+                        'options': {
+                            'background_color': 'indigo.500'
+                        }
+                    },
+                    'INFO': {
+                        'type': 'badge',
+                        'options': {
+                            'background_color': 'peacock.500'
+                        }
+                    }
+                }
+            },
+            {
+                'type': 'text',
+                'key': 'data.findings.resource_type',
+                'name': 'Resource Type'
+            },
+            {
+                'type': 'text',
+                'key': 'data.findings.resource',
+                'name': 'Resource',
+                'reference': {
+                    'resource_type': 'inventory.CloudService',
+                    'reference_key': 'reference.resource_id'
+                }
+            },
+            {
+                'type': 'text',
+                'key': 'data.findings.region_code',
+                'name': 'Region',
+                'reference': {
+                    'resource_type': 'inventory.Region',
+                    'reference_key': 'region_code'
+                }
+            },
+            {
+                'type': 'text',
+                'key': 'data.findings.status_extended',
+                'name': 'Status Extended'
+            },
+        ]
+    }
+}
+
 _METADATA = {
     'query_sets': [
         {
@@ -368,115 +478,61 @@ _METADATA = {
                         ]
                     }
                 },
-                {
-                    'type': 'query-search-table',
-                    'name': 'Findings',
-                    'options': {
-                        'unwind': {
-                            'path': 'data.findings'
+                _FINDINGS_LAYOUT
+            ]
+        }
+    }
+}
+
+
+_FINDING_PAGE_METADATA = {
+    'view': {
+        'search': [
+            {
+                'key': 'data.requirement_id',
+                'name': 'Requirement ID'
+            },
+            {
+                'key': 'data.parent_resource_id',
+                'name': 'Requirement Resource ID'
+            }
+        ],
+        'table': {
+            'layout': {
+                'name': '',
+                'type': 'query-search-table',
+                'options': {
+                    'default_sort': {
+                        'key': 'data.requirement_id',
+                        'desc': False
+                    },
+                    'fields': [
+                        {
+                            'type': 'text',
+                            'key': 'data.requirement_id',
+                            'name': 'Requirement ID'
                         },
-                        'default_sort': {
-                            'key': 'data.findings.status',
-                            'desc': False
+                        {
+                            'type': 'text',
+                            'key': 'data.page',
+                            'name': 'Page'
                         },
-                        'search': [
-                            {
-                                'key': 'data.requirement_id',
-                                'name': 'Requirement ID'
-                            },
-                            {
-                                'key': 'data.findings.check_title',
-                                'name': 'Check Title'
-                            },
-                            {
-                                'key': 'data.findings.status',
-                                'name': 'Status',
-                                'enums': [
-                                    'FAIL',
-                                    'PASS',
-                                    'INFO'
-                                ]
-                            },
-                            {
-                                'key': 'data.findings.resource_type',
-                                'name': 'Resource Type'
-                            },
-                            {
-                                'key': 'data.findings.resource',
-                                'name': 'Resource'
-                            },
-                            {
-                                'key': 'data.findings.region_code',
-                                'name': 'Region'
+                        {
+                            'type': 'text',
+                            'key': 'data.parent_resource_id',
+                            'name': 'Requirement',
+                            'reference': {
+                                'resource_type': 'inventory.CloudService',
+                                'reference_key': 'reference.resource_id'
                             }
-                        ],
-                        'fields': [
-                            {
-                                'type': 'text',
-                                'key': 'data.requirement_id',
-                                'name': 'Requirement ID'
-                            },
-                            {
-                                'type': 'text',
-                                'key': 'data.findings.check_title',
-                                'name': 'Check Title'
-                            },
-                            {
-                                'type': 'enum',
-                                'name': 'Status',
-                                'key': 'data.findings.status',
-                                'options': {
-                                    'FAIL': {
-                                        'type': 'badge',
-                                        'options': {
-                                            'background_color': 'coral.500'
-                                        }
-                                    },
-                                    'PASS': {
-                                        'type': 'badge',
-                                        'options': {
-                                            'background_color': 'indigo.500'
-                                        }
-                                    },
-                                    'INFO': {
-                                        'type': 'badge',
-                                        'options': {
-                                            'background_color': 'peacock.500'
-                                        }
-                                    }
-                                }
-                            },
-                            {
-                                'type': 'text',
-                                'key': 'data.findings.resource_type',
-                                'name': 'Resource Type'
-                            },
-                            {
-                                'type': 'text',
-                                'key': 'data.findings.resource',
-                                'name': 'Resource',
-                                'reference': {
-                                    'resource_type': 'inventory.CloudService',
-                                    'reference_key': 'reference.resource_id'
-                                }
-                            },
-                            {
-                                'type': 'text',
-                                'key': 'data.findings.region_code',
-                                'name': 'Region',
-                                'reference': {
-                                    'resource_type': 'inventory.Region',
-                                    'reference_key': 'region_code'
-                                }
-                            },
-                            {
-                                'type': 'text',
-                                'key': 'data.findings.status_extended',
-                                'name': 'Status Extended'
-                            },
-                        ]
-                    }
+                        }
+                    ]
                 }
+            }
+        },
+        'sub_data': {
+            'layouts': [
+                _FINDINGS_LAYOUT
             ]
         }
     }
@@ -492,3 +548,12 @@ class CloudServiceType(BaseCloudServiceType):
     tags: dict = {
         'spaceone:icon': 'https://spaceone-custom-assets.s3.ap-northeast-2.amazonaws.com/console-assets/icons/prowler.svg'
     }
+
+
+class FindingPageCloudServiceType(BaseCloudServiceType):
+    group: str = 'Prowler'
+    metadata: dict = _FINDING_PAGE_METADATA
+    labels: List[str] = ['Security', 'Compliance']
+    tags: dict = {
+        'spaceone:icon': 'https://spaceone-custom-assets.s3.ap-northeast-2.amazonaws.com/console-assets/icons/prowler.svg'
+    }
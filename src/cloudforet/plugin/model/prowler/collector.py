@@ -162,7 +162,10 @@ class AWSPluginInfo(PluginInfo):
         ],
         'options_schema': {
             'required': ['provider', 'compliance_framework'],
-            'order': ['provider', 'compliance_framework', 'regions'],
+            'order': ['provider', 'compliance_framework', 'regions', 'scan_concurrency', 'check_batch_size',
+                      'force_rescan', 'aggregation_mode', 'max_findings_per_resource', 'finding_detail',
+                      'delta', 'stream_results', 'checkpoint', 'reuse_fresh_checks', 'member_role_arns',
+                      'account_source', 'member_role_name', 'account_concurrency', 'verify_mode', 'replay_file'],
             'type': 'object',
             'properties': {
                 'provider': {
@@ -173,8 +176,19 @@ class AWSPluginInfo(PluginInfo):
                 },
                 'compliance_framework': {
                     'title': 'Compliance Framework',
-                    'type': 'string',
-                    'enum': list(COMPLIANCE_FRAMEWORKS['aws'].keys()),
+                    'anyOf': [
+                        {
+                            'type': 'string',
+                            'enum': list(COMPLIANCE_FRAMEWORKS['aws'].keys()) + ['all']
+                        },
+                        {
+                            'type': 'array',
+                            'items': {
+                                'enum': list(COMPLIANCE_FRAMEWORKS['aws'].keys())
+                            },
+                            'minItems': 1
+                        }
+                    ],
                     'default': 'CIS-1.5'
                 },
                 'regions': {
@@ -184,6 +198,96 @@ class AWSPluginInfo(PluginInfo):
                         'enum': REGIONS['aws']
                     }
                 },
+                'scan_concurrency': {
+                    'title': 'Scan Concurrency',
+                    'type': 'integer',
+                    'minimum': 1,
+                    'default': 1
+                },
+                'check_batch_size': {
+                    'title': 'Check Batch Size',
+                    'type': 'integer',
+                    'minimum': 1,
+                    'default': 20
+                },
+                'force_rescan': {
+                    'title': 'Force Rescan',
+                    'type': 'boolean',
+                    'default': False
+                },
+                'aggregation_mode': {
+                    'title': 'Aggregation Mode',
+                    'type': 'string',
+                    'enum': ['dict', 'columnar'],
+                    'default': 'dict'
+                },
+                'max_findings_per_resource': {
+                    'title': 'Max Findings per Resource (0 = unlimited)',
+                    'type': 'integer',
+                    'minimum': 0,
+                    'default': 0
+                },
+                'finding_detail': {
+                    'title': 'Finding Detail',
+                    'type': 'string',
+                    'enum': ['all', 'fail_only', 'none'],
+                    'default': 'all'
+                },
+                'delta': {
+                    'title': 'Delta Collection (Only Changed Resources)',
+                    'type': 'boolean',
+                    'default': False
+                },
+                'stream_results': {
+                    'title': 'Stream Results While Scanning',
+                    'type': 'boolean',
+                    'default': False
+                },
+                'checkpoint': {
+                    'title': 'Checkpointed Scan (Resume Failed Regions and Services)',
+                    'type': 'boolean',
+                    'default': False
+                },
+                'reuse_fresh_checks': {
+                    'title': 'Reuse Fresh Results of Slow-Changing Checks',
+                    'type': 'boolean',
+                    'default': False
+                },
+                'member_role_arns': {
+                    'title': 'Member Account Role ARNs',
+                    'type': 'array',
+                    'items': {
+                        'type': 'string'
+                    },
+                    'default': []
+                },
+                'account_source': {
+                    'title': 'Member Account Source',
+                    'type': 'string',
+                    'enum': ['static', 'organizations'],
+                    'default': 'static'
+                },
+                'member_role_name': {
+                    'title': 'Member Account Role Name',
+                    'type': 'string',
+                    'default': 'OrganizationAccountAccessRole'
+                },
+                'account_concurrency': {
+                    'title': 'Account Concurrency',
+                    'type': 'integer',
+                    'minimum': 1,
+                    'default': 4
+                },
+                'verify_mode': {
+                    'title': 'Credential Verification (identity: STS call, prowler: Prowler run)',
+                    'type': 'string',
+                    'enum': ['identity', 'prowler'],
+                    'default': 'identity'
+                },
+                'replay_file': {
+                    'title': 'Replay Prowler Output File (Instead of Scanning)',
+                    'type': 'string'
+                },
                 # 'services': {
                 #     'title': 'Service',
                 #     'type': 'array',
@@ -0,0 +1,131 @@
+""" Build the collect results of a stored prowler output without scanning AWS
+
+    prowler-replay output.json.gz -c CIS-1.5 -c SOC2 --output results.jsonl
+    prowler-replay output.json -c CIS-1.5 --repeat 10 --protobuf
+    prowler-replay output.zip -c all
+
+The findings go through the same framework loading, aggregation and response pipeline as a collect,
+so a replay is also a repeatable, network-free load generator.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+
+from spaceone.core import config
+
+__all__ = ['main']
+
+
+def main(argv: list = None):
+    args = _parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(asctime)s [%(levelname)s] %(message)s')
+
+    config.init_conf(package='cloudforet.plugin', service='plugin')
+    config.set_service_config()
+
+    replay_file = os.path.abspath(args.replay_file)
+    # The replay directory of the plugin is opened up to the given file only.
+    config.set_global(REPLAY={'enabled': True, 'path': os.path.dirname(replay_file)}, METRICS={'enabled': False})
+
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+    from cloudforet.plugin.info.collector_info import ResourceInfo
+
+    # "all" selects every framework of the installed prowler, like the collect option.
+    compliance_framework = 'all' if 'all' in args.compliance_framework else args.compliance_framework
+    options = dict(json.loads(args.options), provider='aws', compliance_framework=compliance_framework,
+                   replay_file=replay_file)
+
+    output = _open_output(args.output)
+    runs = []
+    try:
+        for index in range(args.repeat):
+            manager = AWSProwlerManager()
+            resources = 0
+            errors = 0
+
+            started_at = time.perf_counter()
+            for response in manager.collect(options, {}, None, args.domain_id):
+                if args.protobuf:
+                    ResourceInfo(response)
+
+                if response['resource_type'] == 'inventory.ErrorResource':
+                    errors += 1
+                    print(f'error: {response["message"]}', file=sys.stderr)
+                else:
+                    resources += 1
+
+                # Only the first run is written, the others produce the same results.
+                if output and index == 0:
+                    output.write(json.dumps(response, default=str) + '\n')
+
+            runs.append({
+                'elapsed': time.perf_counter() - started_at,
+                'resources': resources,
+                'errors': errors,
+                'phases': dict(manager.phase_timer.phases),
+                'counts': dict(manager.phase_timer.counts)
+            })
+    finally:
+        if output and output is not sys.stdout:
+            output.close()
+
+    _print_summary(runs)
+    return 1 if any(run['errors'] for run in runs) else 0
+
+
+def _parse_args(argv: list = None):
+    parser = argparse.ArgumentParser(description='Build the collect results of a stored prowler output.')
+    parser.add_argument('replay_file', help='Prowler JSON output (.json), compressed (.gz, .bz2, .xz) '
+                                            'or in an archive (.zip, .tar.gz, ...)')
+    parser.add_argument('-c', '--compliance-framework', action='append', required=True,
+                        help='Cloud service type to build, e.g. CIS-1.5 (repeatable), or all')
+    parser.add_argument('--options', default='{}', help='Other collect options as JSON, '
+                                                        'e.g. \'{"finding_detail": "fail_only"}\'')
+    parser.add_argument('--domain-id', default='replay')
+    parser.add_argument('--output', help='Write the responses as JSON lines to this file (- for stdout)')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of replays')
+    parser.add_argument('--protobuf', action='store_true', help='Encode every response like the gRPC interface')
+    parser.add_argument('-v', '--verbose', action='store_true')
+
+    args = parser.parse_args(argv)
+    if not os.path.isfile(args.replay_file):
+        parser.error(f'replay file not found: {args.replay_file}')
+
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    return args
+
+
+def _open_output(output: str):
+    if output is None:
+        return None
+
+    if output == '-':
+        return sys.stdout
+
+    return open(output, 'w')
+
+
+def _print_summary(runs: list):
+    elapsed = [run['elapsed'] for run in runs]
+    last_run = runs[-1]
+
+    print(f'replays: {len(runs)}, resources: {last_run["resources"]}, errors: {last_run["errors"]}, '
+          f'findings: {last_run["counts"].get("findings", 0)}', file=sys.stderr)
+    print(f'elapsed (s): min {min(elapsed):.4f}, median {statistics.median(elapsed):.4f}, max {max(elapsed):.4f}',
+          file=sys.stderr)
+
+    for phase in last_run['phases']:
+        seconds = [run['phases'].get(phase, 0.0) for run in runs]
+        print(f'  {phase:<40} median {statistics.median(seconds):.4f}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -78,9 +78,10 @@ class CollectorService(BaseService):
         provider = params['options'].get('provider')
         secret_data = params['secret_data']
         schema = params.get('schema')
+        domain_id = params.get('domain_id')
 
         collector_mgr: CollectorManager = self._get_collector_manager_from_provider(provider)
-        iterator: Generator = collector_mgr.collect(options, secret_data, schema)
+        iterator: Generator = collector_mgr.collect(options, secret_data, schema, domain_id)
 
         for resource_data in iterator:
             yield resource_data
@@ -35,5 +35,10 @@ setup(
         'spaceone-api',
         'prowler',
     ],
+    entry_points={
+        'console_scripts': [
+            'prowler-replay = cloudforet.plugin.replay:main'
+        ]
+    },
     zip_safe=False,
 )
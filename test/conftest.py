@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(_ROOT, 'src'))
+sys.path.insert(0, os.path.join(_ROOT, 'benchmark'))
+
+from spaceone.core import config
+
+
+@pytest.fixture(autouse=True)
+def plugin_config(tmp_path):
+    """ Plugin configuration with every on-disk store under the test's temp dir and no metrics """
+    config.init_conf(package='cloudforet.plugin', service='plugin')
+    config.set_service_config()
+    config.set_global(
+        METRICS={'enabled': False},
+        SCAN_CACHE={'enabled': False, 'path': str(tmp_path / 'scan-cache')},
+        CHECKPOINT_STORE={'path': str(tmp_path / 'checkpoints')},
+        CHECK_FRESHNESS={'path': str(tmp_path / 'check-results')},
+        DELTA_STORE={'path': str(tmp_path / 'delta')}
+    )
+
+    from cloudforet.plugin.connector import aws_prowler_connector
+    from cloudforet.plugin.manager import aws_prowler_manager
+
+    # The stores are created again with the paths of this test.
+    for singleton in [aws_prowler_connector._SCAN_CACHE, aws_prowler_connector._CHECKPOINT_STORE,
+                      aws_prowler_connector._CHECK_RESULT_STORE, aws_prowler_manager._ADMISSION_CONTROLLER,
+                      aws_prowler_manager._DELTA_STORE]:
+        singleton.reset()
+
+    yield config
+
+
+@pytest.fixture
+def fake_compliance_frameworks(monkeypatch):
+    """ Compliance frameworks of test/fakes/fake_framework.py instead of those of the installed prowler """
+    from fakes.fake_framework import FRAMEWORKS, make_requirements
+    from cloudforet.plugin.lib import compliance_registry
+    from cloudforet.plugin.connector import aws_prowler_connector
+
+    def _load_requirements(provider: str, name: str) -> list:
+        if name not in FRAMEWORKS.values():
+            raise KeyError(name)
+        return make_requirements(name)
+
+    monkeypatch.setattr(compliance_registry, '_load_requirements', _load_requirements)
+    monkeypatch.setattr(compliance_registry, 'get_prowler_version', lambda: 'fake')
+    monkeypatch.setattr(aws_prowler_connector, 'get_prowler_version', lambda: 'fake')
+    monkeypatch.setattr(compliance_registry, '_REGISTRY', compliance_registry._ComplianceFrameworkRegistry())
+    return FRAMEWORKS
+
+
+@pytest.fixture
+def fake_prowler(plugin_config, fake_compliance_frameworks):
+    """ Scans run test/fakes/fake_prowler.py in the subprocess mode """
+    fake_prowler_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakes', 'fake_prowler.py')
+    plugin_config.set_global(PROWLER_COMMAND=[sys.executable, fake_prowler_path],
+                             PROWLER_EXECUTION_MODE='subprocess')
+    return fake_prowler_path
+
+
+@pytest.fixture
+def fake_prowler_worker(plugin_config, fake_compliance_frameworks, monkeypatch):
+    """ Scans run test/fakes/fake_prowler_worker.py in the worker mode, the pool is dropped afterwards """
+    from fakes import fake_prowler_worker as fake_worker
+    from cloudforet.plugin.lib import prowler_worker
+
+    monkeypatch.setattr(prowler_worker, '_is_prowler_installed', lambda: True)
+    monkeypatch.setattr(prowler_worker, '_execute_prowler', fake_worker.execute_prowler)
+    plugin_config.set_global(PROWLER_EXECUTION_MODE='worker')
+
+    yield prowler_worker
+    prowler_worker._reset_pool()
+
+
+@pytest.fixture
+def secret_data() -> dict:
+    return {'aws_access_key_id': 'AKIAFAKE', 'aws_secret_access_key': 'fake-secret'}
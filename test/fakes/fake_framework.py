@@ -0,0 +1,78 @@
+""" Compliance frameworks and findings of the fake prowler, shared by the fake and the tests """
+from types import SimpleNamespace
+from typing import Dict, List
+
+SERVICES = ['ec2', 'iam', 's3']
+CHECKS = sorted(f'{service}_check_{index}' for service in SERVICES for index in range(4))
+REGIONS = ['us-east-1', 'eu-west-1', 'ap-northeast-2']
+RESOURCES_PER_REGION = 3
+# Cloud service type -> prowler compliance framework
+FRAMEWORKS = {
+    'CIS-1.5': 'cis_1.5_aws',
+    'SOC2': 'soc2_aws'
+}
+REQUIREMENTS = 6
+
+_SEVERITIES = ['critical', 'high', 'medium', 'low', 'informational']
+
+
+def make_requirements(name: str) -> list:
+    """ Requirements shaped like prowler's compliance models, every one with 3 checks """
+    offset = list(FRAMEWORKS.values()).index(name)
+    return [
+        SimpleNamespace(Id=f'{offset + 1}.{index + 1}', Description=f'Requirement {index + 1} of {name}',
+                        Checks=sorted({CHECKS[(index * 5 + offset + step * 3) % len(CHECKS)] for step in range(3)}))
+        for index in range(REQUIREMENTS)
+    ]
+
+
+def get_framework_checks(name: str) -> List[str]:
+    return sorted({check_id for requirement in make_requirements(name) for check_id in requirement.Checks})
+
+
+def get_check_compliance(check_id: str) -> Dict[str, List[str]]:
+    compliance = {}
+    for cloud_service_type, name in FRAMEWORKS.items():
+        requirement_ids = [requirement.Id for requirement in make_requirements(name) if check_id in requirement.Checks]
+        if requirement_ids:
+            compliance[cloud_service_type] = requirement_ids
+
+    return compliance
+
+
+def make_findings(checks: List[str], regions: List[str], account_id: str = '123456789012') -> List[dict]:
+    """ Findings of a prowler run, check by check and region by region like a serial scan """
+    findings = []
+    for check_id in sorted(checks):
+        check_index = CHECKS.index(check_id)
+        service = check_id.split('_', 1)[0]
+        for region in regions:
+            for resource_index in range(RESOURCES_PER_REGION):
+                index = check_index + REGIONS.index(region) + resource_index
+                findings.append({
+                    'AssessmentStartTime': '2023-01-01T00:00:00.000000',
+                    'FindingUniqueId': f'prowler-aws-{check_id}-{account_id}-{region}-{resource_index}',
+                    'Provider': 'aws',
+                    'CheckID': check_id,
+                    'CheckTitle': f'Title of {check_id}',
+                    'CheckType': ['Software and Configuration Checks'],
+                    'ServiceName': service,
+                    'SubServiceName': '',
+                    'Status': ['PASS', 'FAIL', 'PASS', 'INFO'][index % 4],
+                    'StatusExtended': f'Status of {service} resource {resource_index} in {region}.',
+                    'Severity': _SEVERITIES[check_index % len(_SEVERITIES)],
+                    'ResourceType': 'AwsFakeResource',
+                    'Description': f'Description of {check_id}.',
+                    'Risk': f'Risk of {check_id}.',
+                    'Remediation': {
+                        'Code': {'NativeIaC': '', 'Terraform': '', 'CLI': '', 'Other': ''},
+                        'Recommendation': {'Text': f'Recommendation of {check_id}.', 'Url': 'https://example.com'}
+                    },
+                    'Compliance': get_check_compliance(check_id),
+                    'AccountId': account_id,
+                    'Region': region,
+                    'ResourceId': f'{service}-resource-{resource_index}',
+                    'ResourceArn': f'arn:aws:{service}:{region}:{account_id}:resource/{resource_index}'
+                })
+
+    return findings
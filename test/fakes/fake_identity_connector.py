@@ -0,0 +1,17 @@
+""" Stand-in for AWSIdentityConnector, set as its backend in the CONNECTORS config """
+from spaceone.core.connector import BaseConnector
+from cloudforet.plugin.error.custom import ERROR_AUTHENTICATE_FAILURE
+
+# Access key ids the fake STS was called with
+CALLS = []
+INVALID_SECRET_ACCESS_KEY = 'invalid-secret'
+
+
+class FakeAWSIdentityConnector(BaseConnector):
+
+    def get_caller_identity(self, secret_data: dict) -> dict:
+        CALLS.append(secret_data['aws_access_key_id'])
+        if secret_data['aws_secret_access_key'] == INVALID_SECRET_ACCESS_KEY:
+            raise ERROR_AUTHENTICATE_FAILURE(message='The security token included in the request is invalid.')
+
+        return {'account_id': '123456789012', 'arn': 'arn:aws:iam::123456789012:user/collector'}
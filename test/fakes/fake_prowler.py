@@ -0,0 +1,86 @@
+""" Stand-in for `python -m prowler` in the subprocess mode
+
+    fake_prowler.py aws -p <profile> -b -M json -o <dir> -F output -z [--compliance <name>] [--checks ...] [-f ...]
+
+The profile must exist in AWS_SHARED_CREDENTIALS_FILE, the findings belong to the account of its role if it has
+one. FAKE_PROWLER_DELAY delays the scan by seconds, FAKE_PROWLER_FAIL_REGION and FAKE_PROWLER_FAIL_ACCOUNT make the
+scans of that region or account fail.
+With FAKE_PROWLER_PID_DIR, a scan starts a child process for its delay, like prowler's own workers, and writes its
+and the child's pid to a file in that directory. The child holds FAKE_PROWLER_MEMORY bytes in memory.
+"""
+import os
+import sys
+import json
+import time
+import subprocess
+import configparser
+
+from fake_framework import CHECKS, REGIONS, get_framework_checks, make_findings
+
+
+def _get_values(args: list, name: str) -> list:
+    if name not in args:
+        return []
+
+    values = []
+    for value in args[args.index(name) + 1:]:
+        if value.startswith('-'):
+            break
+        values.append(value)
+
+    return values
+
+
+def _get_role_account(credentials: configparser.ConfigParser, profile: str) -> list:
+    """ The account of the assumed role, as prowler reports it """
+    role_arn = credentials.get(profile, 'role_arn', fallback='')
+    return [role_arn.split(':')[4]] if role_arn else []
+
+
+def main(args: list) -> int:
+    credentials = configparser.ConfigParser()
+    credentials.read(os.environ.get('AWS_SHARED_CREDENTIALS_FILE', ''))
+    profile = _get_values(args, '-p')[0]
+    if profile not in credentials.sections():
+        print(f'profile not found: {profile}', file=sys.stderr)
+        return 2
+
+    if '-l' in args:
+        print('\n'.join(CHECKS))
+        return 0
+
+    delay = float(os.environ.get('FAKE_PROWLER_DELAY', '0'))
+    if os.environ.get('FAKE_PROWLER_PID_DIR'):
+        memory = int(os.environ.get('FAKE_PROWLER_MEMORY', '0'))
+        child = subprocess.Popen([sys.executable, '-c', f'import time; data = b"x" * {memory}; time.sleep({delay})'])
+        pid_file = os.path.join(os.environ['FAKE_PROWLER_PID_DIR'], f'{os.getpid()}.pids')
+        with open(f'{pid_file}.tmp', 'w') as f:
+            f.write(f'{os.getpid()} {child.pid}')
+        os.replace(f'{pid_file}.tmp', pid_file)
+        child.wait()
+    else:
+        time.sleep(delay)
+
+    regions = _get_values(args, '-f') or REGIONS
+    if os.environ.get('FAKE_PROWLER_FAIL_REGION') in regions:
+        print(f'scan failed in {os.environ["FAKE_PROWLER_FAIL_REGION"]}', file=sys.stderr)
+        return 1
+
+    account = _get_role_account(credentials, profile)
+    if account and os.environ.get('FAKE_PROWLER_FAIL_ACCOUNT') == account[0]:
+        print(f'scan failed in {account[0]}', file=sys.stderr)
+        return 1
+
+    compliance = _get_values(args, '--compliance')
+    checks = _get_values(args, '--checks') or (get_framework_checks(compliance[0]) if compliance else CHECKS)
+
+    output_dir = _get_values(args, '-o')[0]
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, f'{_get_values(args, "-F")[0]}.json'), 'w') as f:
+        json.dump(make_findings(checks, regions, *account), f)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
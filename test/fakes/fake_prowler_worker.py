@@ -0,0 +1,36 @@
+""" Stand-in for the scan function that prowler_worker runs in its worker processes
+
+The findings are those of fake_prowler.py. FAKE_PROWLER_DELAY delays the scan by seconds, and with
+FAKE_PROWLER_PID_DIR the worker writes its pid to a file in that directory once the scan started.
+"""
+import os
+import time
+
+from fakes.fake_framework import CHECKS, REGIONS, get_framework_checks, make_findings
+
+
+def _get_values(args: list, name: str) -> list:
+    if name not in args:
+        return []
+
+    values = []
+    for value in args[args.index(name) + 1:]:
+        if value.startswith('-'):
+            break
+        values.append(value)
+
+    return values
+
+
+def execute_prowler(args: list, env: dict) -> list:
+    if os.environ.get('FAKE_PROWLER_PID_DIR'):
+        pid_file = os.path.join(os.environ['FAKE_PROWLER_PID_DIR'], f'{os.getpid()}.pids')
+        with open(f'{pid_file}.tmp', 'w') as f:
+            f.write(str(os.getpid()))
+        os.replace(f'{pid_file}.tmp', pid_file)
+
+    time.sleep(float(env.get('FAKE_PROWLER_DELAY', os.environ.get('FAKE_PROWLER_DELAY', '0'))))
+
+    compliance = _get_values(args, '--compliance')
+    checks = _get_values(args, '--checks') or (get_framework_checks(compliance[0]) if compliance else CHECKS)
+    return make_findings(checks, _get_values(args, '-f') or REGIONS)
@@ -0,0 +1,184 @@
+""" Scans are admitted up to the concurrency limit, FIFO within a domain and round robin across domains """
+import time
+import threading
+
+import pytest
+
+from fakes.fake_framework import REGIONS
+
+_TIMEOUT = 10
+
+
+def _wait_for(condition, timeout: float = _TIMEOUT) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+
+    return condition()
+
+
+class _Scan(threading.Thread):
+    """ Waits for admission, records it and holds the slot until released """
+
+    def __init__(self, admission_controller, domain_id: str, name: str, admitted: list, cancellation_token=None):
+        super().__init__(daemon=True)
+        self.admission_controller = admission_controller
+        self.domain_id = domain_id
+        self.scan_name = name
+        self.admitted = admitted
+        self.cancellation_token = cancellation_token
+        self.release = threading.Event()
+        self.error = None
+
+    def run(self):
+        try:
+            with self.admission_controller.admit(self.domain_id, self.cancellation_token):
+                self.admitted.append(self.scan_name)
+                self.release.wait(_TIMEOUT)
+        except Exception as e:
+            self.error = e
+
+
+def _start_queued(admission_controller, scans: list) -> list:
+    """ Start the scans one after another, each once the previous one is queued """
+    for scan in scans:
+        queue_depth = admission_controller.queue_depth
+        scan.start()
+        assert _wait_for(lambda: admission_controller.queue_depth == queue_depth + 1)
+
+    return scans
+
+
+def _release_in_turn(scans: list, admitted: list):
+    """ Release every scan as soon as it is admitted, so they run one at a time """
+    for index in range(len(scans)):
+        assert _wait_for(lambda: len(admitted) > index)
+        next(scan for scan in scans if scan.scan_name == admitted[index]).release.set()
+
+    for scan in scans:
+        scan.join(_TIMEOUT)
+
+
+def test_domains_are_served_round_robin_and_fifo():
+    from cloudforet.plugin.lib.admission import AdmissionController
+
+    admission_controller = AdmissionController(1)
+    admitted = []
+
+    blocker = _Scan(admission_controller, 'domain-blocker', 'blocker', admitted)
+    blocker.start()
+    assert _wait_for(lambda: admitted == ['blocker'])
+
+    # domain-a submits its scans first and all at once, domain-b comes later.
+    scans = _start_queued(admission_controller, [
+        _Scan(admission_controller, 'domain-a', 'a1', admitted),
+        _Scan(admission_controller, 'domain-a', 'a2', admitted),
+        _Scan(admission_controller, 'domain-a', 'a3', admitted),
+        _Scan(admission_controller, 'domain-b', 'b1', admitted),
+        _Scan(admission_controller, 'domain-b', 'b2', admitted),
+    ])
+
+    _release_in_turn([blocker] + scans, admitted)
+
+    assert admitted == ['blocker', 'a1', 'b1', 'a2', 'b2', 'a3']
+    assert admission_controller.stats()['admitted'] == 6
+
+
+def test_concurrency_is_bounded():
+    from cloudforet.plugin.lib.admission import AdmissionController
+
+    admission_controller = AdmissionController(2)
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def _scan(domain_id: str):
+        with admission_controller.admit(domain_id):
+            with lock:
+                running.append(domain_id)
+                max_running.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(domain_id)
+
+    threads = [threading.Thread(target=_scan, args=(f'domain-{index % 3}',)) for index in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(_TIMEOUT)
+
+    assert len(max_running) == 12
+    assert max(max_running) == 2
+    assert admission_controller.stats()['running'] == 0
+
+
+def test_slot_is_released_when_the_scan_raises():
+    from cloudforet.plugin.lib.admission import AdmissionController
+
+    admission_controller = AdmissionController(1)
+
+    with pytest.raises(ValueError):
+        with admission_controller.admit('domain-test'):
+            raise ValueError('scan failed')
+
+    assert admission_controller.stats()['running'] == 0
+    with admission_controller.admit('domain-test') as wait_time:
+        assert wait_time < 1
+
+
+def test_cancelled_scan_leaves_the_queue():
+    from cloudforet.plugin.lib.admission import AdmissionController, AdmissionCancelledError
+    from cloudforet.plugin.lib.cancellation import CancellationToken
+
+    admission_controller = AdmissionController(1)
+    admitted = []
+    cancellation_token = CancellationToken()
+
+    blocker = _Scan(admission_controller, 'domain-test', 'blocker', admitted)
+    blocker.start()
+    assert _wait_for(lambda: admitted == ['blocker'])
+    cancelled, waiting = _start_queued(admission_controller, [
+        _Scan(admission_controller, 'domain-test', 'cancelled', admitted, cancellation_token),
+        _Scan(admission_controller, 'domain-test', 'waiting', admitted),
+    ])
+
+    cancellation_token.cancel()
+    cancelled.join(_TIMEOUT)
+    assert isinstance(cancelled.error, AdmissionCancelledError)
+    assert admission_controller.queue_depth == 1
+
+    blocker.release.set()
+    assert _wait_for(lambda: admitted == ['blocker', 'waiting'])
+    waiting.release.set()
+    waiting.join(_TIMEOUT)
+    assert admission_controller.stats()['running'] == 0
+
+
+@pytest.mark.parametrize('stream_results', [False, True])
+def test_collects_release_their_slots(plugin_config, fake_prowler, secret_data, monkeypatch, stream_results):
+    from cloudforet.plugin.manager import aws_prowler_manager
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    plugin_config.set_global(MAX_CONCURRENT_SCANS=1)
+    options = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': 'CIS-1.5', 'scan_concurrency': 3,
+               'check_batch_size': 2, 'stream_results': stream_results}
+
+    def _get_running() -> int:
+        return aws_prowler_manager._ADMISSION_CONTROLLER.get().stats()['running']
+
+    # A collect that fails, and one that is closed before all of its responses are read
+    monkeypatch.setenv('FAKE_PROWLER_FAIL_REGION', REGIONS[0])
+    responses = list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+    assert responses[-1]['resource_type'] == 'inventory.ErrorResource'
+    assert _get_running() == 0
+
+    monkeypatch.delenv('FAKE_PROWLER_FAIL_REGION')
+    responses = AWSProwlerManager().collect(options, secret_data, None, 'domain-test')
+    next(responses)
+    responses.close()
+    assert _get_running() == 0
+
+    responses = list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+    assert [response for response in responses if response['resource_type'] == 'inventory.ErrorResource'] == []
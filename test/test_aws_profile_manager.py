@@ -0,0 +1,64 @@
+import os
+import stat
+import threading
+import configparser
+from concurrent.futures import ThreadPoolExecutor
+
+from fakes.fake_framework import REGIONS
+
+_CONCURRENCY = 64
+
+
+def _use_profile(profile_dir: str, index: int, barrier: threading.Barrier) -> str:
+    from cloudforet.plugin.connector.aws_prowler_connector import AWSProfileManager
+
+    credentials = {'aws_access_key_id': f'AKIA{index}', 'aws_secret_access_key': f'secret-{index}'}
+    if index % 2:
+        credentials.update(role_arn=f'arn:aws:iam::{index:012d}:role/scan', external_id=f'external-{index}')
+
+    with AWSProfileManager(credentials, profile_dir) as aws_profile:
+        # Every profile is written before any is read or removed.
+        barrier.wait()
+
+        assert aws_profile.env == {'AWS_SHARED_CREDENTIALS_FILE': aws_profile.credentials_file}
+        assert stat.S_IMODE(os.stat(aws_profile.credentials_file).st_mode) == 0o600
+
+        aws_profiles = configparser.ConfigParser()
+        aws_profiles.read(aws_profile.credentials_file)
+        key_profile_name = aws_profile.source_profile_name or aws_profile.profile_name
+        assert set(aws_profiles.sections()) == {aws_profile.profile_name, key_profile_name}
+        assert aws_profiles.get(key_profile_name, 'aws_access_key_id') == f'AKIA{index}'
+        assert aws_profiles.get(key_profile_name, 'aws_secret_access_key') == f'secret-{index}'
+        if index % 2:
+            assert aws_profiles.get(aws_profile.profile_name, 'external_id') == f'external-{index}'
+
+        barrier.wait()
+        return aws_profile.credentials_file
+
+
+def test_concurrent_profiles_never_share_a_file(tmp_path):
+    barrier = threading.Barrier(_CONCURRENCY)
+
+    with ThreadPoolExecutor(max_workers=_CONCURRENCY) as executor:
+        futures = [executor.submit(_use_profile, str(tmp_path), index, barrier) for index in range(_CONCURRENCY)]
+        credentials_files = [future.result() for future in futures]
+
+    assert len(set(credentials_files)) == _CONCURRENCY
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_scans_use_their_own_credentials(fake_prowler):
+    from cloudforet.plugin.connector.aws_prowler_connector import AWSProwlerConnector
+
+    def _scan(index: int) -> int:
+        secret_data = {'aws_access_key_id': f'AKIA{index}', 'aws_secret_access_key': f'secret-{index}'}
+        options = {'compliance_framework': 'CIS-1.5', 'regions': REGIONS, 'scan_concurrency': 2,
+                   'check_batch_size': 3}
+        return len(list(AWSProwlerConnector().check(options, secret_data, None)))
+
+    # The fake prowler fails when its profile is not in its credentials file.
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        finding_counts = list(executor.map(_scan, range(16)))
+
+    assert len(set(finding_counts)) == 1
+    assert finding_counts[0] > 0
@@ -0,0 +1,154 @@
+""" A batch collect scans the member accounts of the static or organizations account source """
+import os
+import sys
+import time
+import types
+
+import pytest
+
+from fakes.fake_framework import REGIONS
+
+_ACCOUNTS = ['111111111111', '222222222222', '333333333333']
+_TIMEOUT = 20
+
+
+def _make_role_arn(account_id: str, role_name: str = 'scan') -> str:
+    return f'arn:aws:iam::{account_id}:role/{role_name}'
+
+
+def _collect(secret_data: dict, **options) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    options = dict({'provider': 'aws', 'regions': REGIONS, 'compliance_framework': 'CIS-1.5'}, **options)
+    return list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+
+
+def _get_responses(responses: list, resource_type: str) -> list:
+    return [response for response in responses if response['resource_type'] == resource_type]
+
+
+def _get_accounts(responses: list) -> set:
+    return {response['resource']['account'] for response in _get_responses(responses, 'inventory.CloudService')}
+
+
+def _sort(responses: list) -> list:
+    return sorted(responses, key=lambda response: response['resource']['reference']['resource_id'])
+
+
+@pytest.fixture
+def fake_organizations(monkeypatch):
+    """ boto3 whose organization lists the given accounts, in pages of two """
+    organizations = {'accounts': []}
+
+    class _Paginator:
+        def paginate(self):
+            accounts = organizations['accounts']
+            for index in range(0, len(accounts), 2):
+                yield {'Accounts': accounts[index:index + 2]}
+
+    class _Client:
+        def get_paginator(self, operation_name: str):
+            assert operation_name == 'list_accounts'
+            return _Paginator()
+
+    class _Session:
+        def __init__(self, **kwargs):
+            pass
+
+        def client(self, service_name: str):
+            assert service_name == 'organizations'
+            return _Client()
+
+    monkeypatch.setitem(sys.modules, 'boto3', types.SimpleNamespace(Session=_Session))
+    return organizations
+
+
+def test_static_accounts_give_the_results_of_their_own_collects(fake_prowler, secret_data):
+    responses = _collect(secret_data, member_role_arns=[_make_role_arn(account_id) for account_id in _ACCOUNTS],
+                         account_concurrency=2)
+
+    assert _get_responses(responses, 'inventory.ErrorResource') == []
+    # Every account returns the same cloud service types, they are sent once.
+    assert len(_get_responses(responses, 'inventory.CloudServiceType')) == \
+        len(_get_responses(_collect(secret_data), 'inventory.CloudServiceType'))
+
+    compliance_responses = _get_responses(responses, 'inventory.CloudService')
+    assert _get_accounts(compliance_responses) == set(_ACCOUNTS)
+    for account_id in _ACCOUNTS:
+        account_responses = _collect(dict(secret_data, role_arn=_make_role_arn(account_id)))
+        assert _sort([response for response in compliance_responses if response['resource']['account'] == account_id]) \
+            == _sort(_get_responses(account_responses, 'inventory.CloudService'))
+
+
+def test_failed_account_does_not_stop_the_others(fake_prowler, secret_data, monkeypatch):
+    monkeypatch.setenv('FAKE_PROWLER_FAIL_ACCOUNT', _ACCOUNTS[1])
+
+    responses = _collect(secret_data, member_role_arns=[_make_role_arn(account_id) for account_id in _ACCOUNTS])
+
+    assert len(_get_responses(responses, 'inventory.ErrorResource')) == 1
+    assert _get_accounts(responses) == {_ACCOUNTS[0], _ACCOUNTS[2]}
+
+
+def test_invalid_account_options_are_the_error_of_every_account(fake_prowler, secret_data):
+    responses = _collect(secret_data, member_role_arns=[_make_role_arn(account_id) for account_id in _ACCOUNTS],
+                         compliance_framework='UNKNOWN')
+
+    assert [response['resource_type'] for response in responses] == ['inventory.ErrorResource'] * len(_ACCOUNTS)
+
+
+def test_invalid_role_arn_fails_the_batch(fake_prowler, secret_data):
+    from spaceone.core.error import ERROR_INVALID_PARAMETER
+
+    with pytest.raises(ERROR_INVALID_PARAMETER):
+        _collect(secret_data, member_role_arns=[_make_role_arn(_ACCOUNTS[0]), 'scan'])
+
+
+def test_organizations_accounts_are_the_active_ones(fake_prowler, secret_data, fake_organizations):
+    fake_organizations['accounts'] = [
+        {'Id': _ACCOUNTS[0], 'Status': 'ACTIVE'},
+        {'Id': '444444444444', 'Status': 'SUSPENDED'},
+        {'Id': _ACCOUNTS[1], 'Status': 'ACTIVE'},
+        {'Id': _ACCOUNTS[2], 'Status': 'ACTIVE'},
+    ]
+
+    responses = _collect(secret_data, account_source='organizations', member_role_name='audit')
+
+    assert _get_responses(responses, 'inventory.ErrorResource') == []
+    assert _get_accounts(responses) == set(_ACCOUNTS)
+
+
+def test_organizations_source_failure_fails_the_batch(fake_prowler, secret_data, fake_organizations):
+    from cloudforet.plugin.error.custom import ERROR_ACCOUNT_SOURCE_FAILED
+
+    fake_organizations['accounts'] = None
+
+    with pytest.raises(ERROR_ACCOUNT_SOURCE_FAILED):
+        _collect(secret_data, account_source='organizations')
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc'), reason='process states are read from /proc')
+def test_closed_batch_stops_its_accounts(fake_prowler, secret_data, tmp_path, monkeypatch):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+    from test_cancellation import _is_running, _wait_for
+
+    pid_dir = tmp_path / 'pids'
+    pid_dir.mkdir()
+    monkeypatch.setenv('FAKE_PROWLER_DELAY', '60')
+    monkeypatch.setenv('FAKE_PROWLER_PID_DIR', str(pid_dir))
+
+    options = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': 'CIS-1.5', 'stream_results': True,
+               'member_role_arns': [_make_role_arn(account_id) for account_id in _ACCOUNTS]}
+    responses = AWSProwlerManager().collect(options, secret_data, None, 'domain-test')
+
+    # The streamed responses of an account come while the scans still run.
+    started_at = time.monotonic()
+    assert next(responses)['resource_type'] == 'inventory.CloudServiceType'
+    assert time.monotonic() - started_at < _TIMEOUT
+    assert _wait_for(lambda: len(list(pid_dir.glob('*.pids'))) == len(_ACCOUNTS))
+
+    started_at = time.monotonic()
+    responses.close()
+    assert time.monotonic() - started_at < _TIMEOUT
+
+    pids = [int(pid) for pid_file in pid_dir.glob('*.pids') for pid in pid_file.read_text().split()]
+    assert _wait_for(lambda: not any(_is_running(pid) for pid in pids))
@@ -0,0 +1,125 @@
+""" A cancelled collect leaves no prowler process, temp directory or credentials file behind """
+import os
+import time
+import tempfile
+import threading
+
+import pytest
+
+from fakes.fake_framework import REGIONS
+
+pytestmark = pytest.mark.skipif(not os.path.isdir('/proc'), reason='process states are read from /proc')
+
+_SCAN_DELAY = 60
+_TIMEOUT = 20
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            # The state follows the command name in parentheses, zombies are already dead.
+            return f.read().rsplit(')', 1)[1].split()[0] not in ('Z', 'X')
+    except (OSError, IndexError):
+        return False
+
+
+def _wait_for(condition, timeout: float = _TIMEOUT) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+
+    return condition()
+
+
+@pytest.mark.parametrize('options', [
+    {'scan_concurrency': 3, 'check_batch_size': 4},
+    {'scan_concurrency': 3, 'check_batch_size': 4, 'stream_results': True},
+    {'scan_concurrency': 3, 'check_batch_size': 4, 'checkpoint': True},
+], ids=['sharded', 'streamed', 'checkpointed'])
+def test_cancelled_collect_leaves_nothing_behind(fake_prowler, secret_data, tmp_path, monkeypatch, options):
+    from cloudforet.plugin.lib.cancellation import CancellationToken, cancellation_scope
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    pid_dir = tmp_path / 'pids'
+    pid_dir.mkdir()
+    temp_dir = tmp_path / 'tmp'
+    temp_dir.mkdir()
+    monkeypatch.setenv('FAKE_PROWLER_DELAY', str(_SCAN_DELAY))
+    monkeypatch.setenv('FAKE_PROWLER_PID_DIR', str(pid_dir))
+    monkeypatch.setattr(tempfile, 'tempdir', str(temp_dir))
+
+    cancellation_token = CancellationToken()
+    responses = []
+
+    def _collect():
+        options_ = dict({'provider': 'aws', 'regions': REGIONS, 'compliance_framework': 'CIS-1.5'}, **options)
+        with cancellation_scope(cancellation_token):
+            responses.extend(AWSProwlerManager().collect(options_, secret_data, None, 'domain-test'))
+
+    collect_thread = threading.Thread(target=_collect)
+    collect_thread.start()
+
+    # Every shard runs a prowler process with a child of its own.
+    def _get_pids() -> list:
+        return [int(pid) for pid_file in pid_dir.glob('*.pids') for pid in pid_file.read_text().split()]
+
+    assert _wait_for(lambda: len(_get_pids()) == 2 * options['scan_concurrency'])
+    assert os.listdir(temp_dir) != []
+
+    started_at = time.monotonic()
+    cancellation_token.cancel()
+    collect_thread.join(_TIMEOUT)
+
+    assert not collect_thread.is_alive()
+    assert time.monotonic() - started_at < _SCAN_DELAY / 2
+    assert responses[-1]['resource_type'] == 'inventory.ErrorResource'
+    assert [response for response in responses if response['resource_type'] == 'inventory.CloudService'] == []
+
+    pids = _get_pids()
+    assert _wait_for(lambda: not any(_is_running(pid) for pid in pids)), \
+        f'orphaned processes: {[pid for pid in pids if _is_running(pid)]}'
+    assert os.listdir(temp_dir) == []
+
+
+def test_cancelled_worker_scans_stop_their_workers(plugin_config, fake_prowler_worker, secret_data, tmp_path,
+                                                   monkeypatch):
+    from cloudforet.plugin.lib.cancellation import CancellationToken, cancellation_scope
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    pid_dir = tmp_path / 'pids'
+    pid_dir.mkdir()
+    monkeypatch.setenv('FAKE_PROWLER_DELAY', str(_SCAN_DELAY))
+    monkeypatch.setenv('FAKE_PROWLER_PID_DIR', str(pid_dir))
+    plugin_config.set_global(PROWLER_WORKER_COUNT=3)
+
+    cancellation_token = CancellationToken()
+    responses = []
+
+    def _collect():
+        options = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': 'CIS-1.5', 'scan_concurrency': 3,
+                   'check_batch_size': 4}
+        with cancellation_scope(cancellation_token):
+            responses.extend(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+
+    collect_thread = threading.Thread(target=_collect)
+    collect_thread.start()
+
+    # The running scans cannot be dropped from the pool, their workers are terminated instead.
+    def _get_pids() -> list:
+        return [int(pid_file.read_text()) for pid_file in pid_dir.glob('*.pids')]
+
+    assert _wait_for(lambda: len(_get_pids()) == 3)
+
+    started_at = time.monotonic()
+    cancellation_token.cancel()
+    collect_thread.join(_TIMEOUT)
+
+    assert not collect_thread.is_alive()
+    assert time.monotonic() - started_at < _SCAN_DELAY / 2
+    assert responses[-1]['resource_type'] == 'inventory.ErrorResource'
+
+    pids = _get_pids()
+    assert _wait_for(lambda: not any(_is_running(pid) for pid in pids)), \
+        f'orphaned workers: {[pid for pid in pids if _is_running(pid)]}'
@@ -0,0 +1,95 @@
+import os
+import glob
+import time
+
+import pytest
+
+from fakes.fake_framework import REGIONS
+
+_MAX_AGES = {'iam_*': 3600, 's3_check_0': 3600}
+
+
+@pytest.fixture
+def check_freshness(plugin_config, fake_prowler):
+    plugin_config.set_global(CHECK_FRESHNESS={'max_ages': _MAX_AGES})
+    return plugin_config
+
+
+def _collect(secret_data: dict, **options) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    options = dict({'provider': 'aws', 'regions': REGIONS, 'compliance_framework': ['CIS-1.5', 'SOC2'],
+                    'reuse_fresh_checks': True}, **options)
+    responses = list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+    assert [response for response in responses if response['resource_type'] == 'inventory.ErrorResource'] == []
+    return [response['resource'] for response in responses if response['resource_type'] == 'inventory.CloudService']
+
+
+def _get_observed_at(resources: list) -> dict:
+    """ Pop the observation times of the requirements and their checks """
+    observed_at = {}
+    for resource in resources:
+        observed_at[resource['reference']['resource_id']] = resource['data'].pop('observed_at')
+        for check in resource['data']['checks']:
+            observed_at[check['check_id']] = check.pop('observed_at')
+
+    return observed_at
+
+
+def _format(timestamp: float) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp))
+
+
+@pytest.mark.parametrize('options', [{}, {'scan_concurrency': 3, 'check_batch_size': 2}])
+def test_reused_checks_give_the_results_of_a_full_scan(check_freshness, secret_data, options):
+    scanned_resources = _collect(secret_data, **options)
+    reused_resources = _collect(secret_data, **options)
+
+    scanned_observed_at = _get_observed_at(scanned_resources)
+    reused_observed_at = _get_observed_at(reused_resources)
+
+    assert reused_resources == scanned_resources
+    # The reused checks keep the time of the scan that observed them.
+    for check_id in ['iam_check_0', 'iam_check_3', 's3_check_0']:
+        assert reused_observed_at[check_id] == scanned_observed_at[check_id]
+
+
+def test_scan_cache_hit_keeps_the_time_of_the_cached_scan(check_freshness, secret_data, tmp_path):
+    from cloudforet.plugin.connector import aws_prowler_connector
+
+    check_freshness.set_global(SCAN_CACHE={'enabled': True})
+    _collect(secret_data)
+
+    # The cached scan is older than the stored checks, which are dropped so that the scan cache serves them.
+    scanned_at = time.time() - 300
+    cache_files = glob.glob(str(tmp_path / 'scan-cache' / '*.json'))
+    assert len(cache_files) == 1
+    os.utime(cache_files[0], (scanned_at, scanned_at))
+    for findings_file in glob.glob(str(tmp_path / 'check-results' / '*')):
+        os.remove(findings_file)
+
+    resources = _collect(secret_data)
+
+    assert aws_prowler_connector._get_scan_cache().stats()['hit'] == 1
+    assert set(_get_observed_at(resources).values()) == {_format(scanned_at)}
+
+    # The stored checks are as old as the cached scan, not as the collect that stored them.
+    findings_files = glob.glob(str(tmp_path / 'check-results' / '*.json'))
+    assert len(findings_files) > 0
+    assert [os.stat(findings_file).st_mtime for findings_file in findings_files] == \
+        pytest.approx([scanned_at] * len(findings_files))
+
+
+def test_scan_cache_and_reused_checks_count_every_finding_once(check_freshness, secret_data):
+    check_freshness.set_global(SCAN_CACHE={'enabled': True})
+
+    def _get_totals(resources: list) -> dict:
+        return {resource['reference']['resource_id']: resource['data']['stats']['findings']['total']
+                for resource in resources}
+
+    # The first collect caches a scan of every check, the later ones reuse the fresh checks from the check
+    # result store and the others from the cached scan, which also holds the fresh ones.
+    totals = [_get_totals(_collect(secret_data)) for _ in range(3)]
+
+    assert totals[1] == totals[0]
+    assert totals[2] == totals[0]
@@ -0,0 +1,55 @@
+from fakes.fake_framework import REGIONS
+
+_OPTIONS = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': 'CIS-1.5', 'checkpoint': True,
+            'scan_concurrency': 3, 'check_batch_size': 4}
+
+
+def _collect(secret_data: dict) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    return list(AWSProwlerManager().collect(_OPTIONS, secret_data, None, 'domain-test'))
+
+
+def _get_checkpoints(plugin_config) -> list:
+    from pathlib import Path
+
+    checkpoint_dir = Path(plugin_config.get_global('CHECKPOINT_STORE')['path'])
+    return sorted(path.name for path in checkpoint_dir.glob('*')) if checkpoint_dir.exists() else []
+
+
+def _get_error_responses(responses: list) -> list:
+    return [response for response in responses if response['resource_type'] == 'inventory.ErrorResource']
+
+
+def test_completed_scan_removes_its_checkpoints(plugin_config, fake_prowler, secret_data):
+    responses = _collect(secret_data)
+
+    assert _get_error_responses(responses) == []
+    assert _get_checkpoints(plugin_config) == []
+
+
+def test_failed_scan_keeps_its_checkpoints_until_resumed(plugin_config, fake_prowler, secret_data, monkeypatch):
+    monkeypatch.setenv('FAKE_PROWLER_FAIL_REGION', REGIONS[1])
+    responses = _collect(secret_data)
+
+    assert len(_get_error_responses(responses)) == 1
+    # The units of the other regions, each a findings file and its checks sidecar
+    checkpoints = _get_checkpoints(plugin_config)
+    assert len(checkpoints) > 0
+    assert len([checkpoint for checkpoint in checkpoints if checkpoint.endswith('.json')]) * 2 == len(checkpoints)
+
+    monkeypatch.delenv('FAKE_PROWLER_FAIL_REGION')
+    responses = _collect(secret_data)
+
+    assert _get_error_responses(responses) == []
+    assert _get_checkpoints(plugin_config) == []
+
+
+def test_stopped_collect_keeps_its_checkpoints(plugin_config, fake_prowler, secret_data):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    responses = AWSProwlerManager().collect(_OPTIONS, secret_data, None, 'domain-test')
+    next(responses)
+    responses.close()
+
+    assert len(_get_checkpoints(plugin_config)) > 0
@@ -0,0 +1,72 @@
+""" The columnar aggregation must give exactly the results of the dict aggregation
+
+A seeded randomized equivalence test: every seed in _SEEDS draws another synthetic scan (size, checks, requirements,
+regions, status mix, accounts, findings without compliance) and hands the findings in a shuffled order. The seeds
+are fixed, so a failure names the seed that reproduces it; nothing searches for or shrinks other inputs.
+"""
+import random
+
+import pytest
+
+from synthetic import make_compliance_framework_info, make_check_results
+
+pytest.importorskip('numpy')
+
+_CLOUD_SERVICE_TYPES = ['CIS-1.5', 'SOC2']
+_SEEDS = range(20)
+
+
+def _make_scan(seed: int) -> tuple:
+    rand = random.Random(seed)
+    requirements = rand.randint(1, 40)
+    status_mix = {status: rand.random() for status in ['PASS', 'FAIL', 'INFO']}
+    check_results = make_check_results(_CLOUD_SERVICE_TYPES, rand.randint(1, 400), rand.randint(1, 30),
+                                       requirements, rand.randint(1, 4), status_mix, seed)
+
+    for check_result in check_results:
+        # The same checks of a second account are other requirements.
+        if rand.random() < 0.2:
+            check_result['AccountId'] = '210987654321'
+
+        # Prowler leaves the compliance out of the checks of no framework.
+        if rand.random() < 0.05:
+            check_result['Compliance'] = {}
+
+    rand.shuffle(check_results)
+    return make_compliance_framework_info(_CLOUD_SERVICE_TYPES, requirements), check_results
+
+
+def _make_compliance_results(aggregation_mode: str, compliance_framework_info: dict, check_results: list,
+                             finding_detail: str, max_findings_per_resource: int) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    manager = AWSProwlerManager()
+    manager.cloud_service_types = _CLOUD_SERVICE_TYPES
+    manager.cloud_service_type = _CLOUD_SERVICE_TYPES[0]
+    manager.compliance_framework_info = compliance_framework_info
+    manager.aggregation_mode = aggregation_mode
+    manager.finding_detail = finding_detail
+    manager.max_findings_per_resource = max_findings_per_resource
+    return manager.make_compliance_results(iter(check_results))
+
+
+@pytest.mark.parametrize('max_findings_per_resource', [0, 1, 7])
+@pytest.mark.parametrize('finding_detail', ['all', 'fail_only', 'none'])
+@pytest.mark.parametrize('seed', _SEEDS)
+def test_columnar_matches_dict(seed, finding_detail, max_findings_per_resource):
+    compliance_framework_info, check_results = _make_scan(seed)
+
+    dict_results = _make_compliance_results('dict', compliance_framework_info, check_results, finding_detail,
+                                            max_findings_per_resource)
+    columnar_results = _make_compliance_results('columnar', compliance_framework_info, check_results,
+                                                finding_detail, max_findings_per_resource)
+
+    assert columnar_results == dict_results
+
+
+def test_columnar_without_requirements():
+    compliance_framework_info, check_results = _make_scan(0)
+    for check_result in check_results:
+        check_result['Compliance'] = {}
+
+    assert _make_compliance_results('columnar', compliance_framework_info, check_results, 'all', 0) == []
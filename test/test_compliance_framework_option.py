@@ -0,0 +1,51 @@
+import pytest
+
+from fakes.fake_framework import REGIONS
+
+
+@pytest.fixture
+def options_schema() -> dict:
+    from cloudforet.plugin.model.prowler.collector import AWSPluginInfo
+    return AWSPluginInfo().metadata['options_schema']
+
+
+@pytest.mark.parametrize('compliance_framework, valid', [
+    ('CIS-1.5', True),
+    ('all', True),
+    (['CIS-1.5', 'SOC2'], True),
+    ('CIS-0.1', False),
+    (['all'], False),
+    ([], False),
+])
+def test_options_schema_accepts_string_and_array(options_schema, compliance_framework, valid):
+    jsonschema = pytest.importorskip('jsonschema')
+    options = {'provider': 'aws', 'compliance_framework': compliance_framework}
+
+    if valid:
+        jsonschema.validate(options, options_schema)
+    else:
+        with pytest.raises(jsonschema.ValidationError):
+            jsonschema.validate(options, options_schema)
+
+
+def test_all_collects_the_frameworks_of_the_installed_prowler(fake_prowler, secret_data):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    options = {'provider': 'aws', 'compliance_framework': 'all', 'regions': REGIONS}
+    responses = list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+
+    assert [response for response in responses if response['resource_type'] == 'inventory.ErrorResource'] == []
+    # The fake prowler only has CIS-1.5 and SOC2.
+    assert {response['resource']['cloud_service_type'] for response in responses
+            if response['resource_type'] == 'inventory.CloudService'} == {'CIS-1.5', 'SOC2'}
+
+
+def test_missing_framework_fails_when_requested_by_name(fake_prowler, secret_data):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    from spaceone.core.error import ERROR_INVALID_PARAMETER
+
+    options = {'provider': 'aws', 'compliance_framework': ['CIS-1.5', 'HIPAA'], 'regions': REGIONS}
+
+    with pytest.raises(ERROR_INVALID_PARAMETER):
+        list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
@@ -0,0 +1,23 @@
+from cloudforet.plugin.lib import compliance_registry
+
+
+def test_prowler_version_is_read_once(monkeypatch):
+    reads = []
+    monkeypatch.setattr(compliance_registry, '_PROWLER_VERSION', None)
+    monkeypatch.setattr(compliance_registry, '_read_prowler_version', lambda: reads.append(None) or '3.0.0')
+
+    assert [compliance_registry.get_prowler_version() for _ in range(3)] == ['3.0.0'] * 3
+    assert len(reads) == 1
+
+
+def test_compliance_framework_is_loaded_once(fake_compliance_frameworks, monkeypatch):
+    loads = []
+    load_requirements = compliance_registry._load_requirements
+    monkeypatch.setattr(compliance_registry, '_load_requirements',
+                        lambda provider, name: loads.append(name) or load_requirements(provider, name))
+
+    frameworks = [compliance_registry.get_compliance_framework('aws', 'cis_1.5_aws') for _ in range(3)]
+
+    assert frameworks[0] is frameworks[1] is frameworks[2]
+    assert loads == ['cis_1.5_aws']
+    assert frameworks[0].checks == sorted(frameworks[0].check_requirements)
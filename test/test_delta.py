@@ -0,0 +1,107 @@
+import time
+
+from fakes.fake_framework import REGIONS
+
+_OPTIONS = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': ['CIS-1.5', 'SOC2'], 'delta': True}
+
+
+def _get_compliance_responses(responses) -> list:
+    return [response for response in responses if response['resource_type'] == 'inventory.CloudService']
+
+
+def _collect(secret_data: dict) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    responses = list(AWSProwlerManager().collect(_OPTIONS, secret_data, None, 'domain-test'))
+    assert [response for response in responses if response['resource_type'] == 'inventory.ErrorResource'] == []
+    return _get_compliance_responses(responses)
+
+
+def _get_scope_responses(responses: list, cloud_service_type: str) -> list:
+    return [response for response in responses if response['resource']['cloud_service_type'] == cloud_service_type]
+
+
+def _count_keep_alives(responses: list) -> int:
+    return sum(1 for response in responses if 'data' not in response['resource'])
+
+
+def test_unchanged_resources_are_kept_alive(fake_prowler, secret_data):
+    first_responses = _collect(secret_data)
+    second_responses = _collect(secret_data)
+
+    assert _count_keep_alives(first_responses) == 0
+    assert _count_keep_alives(second_responses) == len(second_responses) == len(first_responses)
+
+
+def test_failed_collect_is_emitted_in_full_again(fake_prowler, secret_data, monkeypatch):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    first_responses = _collect(secret_data)
+
+    make_response = AWSProwlerManager.make_response
+    sent = []
+
+    def _make_failing_response(self, resource_data, match_rules, resource_type='inventory.CloudService'):
+        if resource_type == 'inventory.CloudService':
+            sent.append(resource_data)
+            if len(sent) > 5:
+                raise ValueError('inventory is unavailable')
+
+        return make_response(self, resource_data, match_rules, resource_type)
+
+    monkeypatch.setattr(AWSProwlerManager, 'make_response', _make_failing_response)
+    responses = list(AWSProwlerManager().collect(_OPTIONS, secret_data, None, 'domain-test'))
+    assert responses[-1]['resource_type'] == 'inventory.ErrorResource'
+    monkeypatch.setattr(AWSProwlerManager, 'make_response', make_response)
+
+    # What the inventory kept of the failed collect is unknown, so nothing of the scopes it sent is kept alive.
+    # The scope it did not reach still holds the hashes of the first collect.
+    assert {response['cloud_service_type'] for response in sent} == {'CIS-1.5'}
+    responses = _collect(secret_data)
+    assert _count_keep_alives(_get_scope_responses(responses, 'CIS-1.5')) == 0
+    assert _count_keep_alives(_get_scope_responses(responses, 'SOC2')) == len(_get_scope_responses(responses, 'SOC2'))
+    assert _count_keep_alives(_collect(secret_data)) == len(first_responses)
+
+
+def test_stopped_collect_is_emitted_in_full_again(fake_prowler, secret_data):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    _collect(secret_data)
+
+    responses = AWSProwlerManager().collect(_OPTIONS, secret_data, None, 'domain-test')
+    assert len(_get_compliance_responses(next(responses) for _ in range(10))) > 0
+    responses.close()
+
+    assert _count_keep_alives(_collect(secret_data)) == 0
+
+
+def test_scope_is_emitted_in_full_after_interval(plugin_config, fake_prowler, secret_data, monkeypatch):
+    from cloudforet.plugin.lib import delta_store
+
+    plugin_config.set_global(DELTA_STORE={'full_emit_interval': 60})
+    first_responses = _collect(secret_data)
+    assert _count_keep_alives(_collect(secret_data)) == len(first_responses)
+
+    now = delta_store.time.time()
+    monkeypatch.setattr(delta_store.time, 'time', lambda: now + 61)
+    assert _count_keep_alives(_collect(secret_data)) == 0
+
+
+def test_rescanned_checks_with_the_same_findings_are_kept_alive(plugin_config, fake_prowler, secret_data,
+                                                                monkeypatch):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    plugin_config.set_global(CHECK_FRESHNESS={'max_ages': {'iam_*': 3600}})
+    options = dict(_OPTIONS, reuse_fresh_checks=True)
+
+    def _collect_reused() -> list:
+        responses = list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+        assert [response for response in responses if response['resource_type'] == 'inventory.ErrorResource'] == []
+        return _get_compliance_responses(responses)
+
+    first_responses = _collect_reused()
+
+    # The checks that are not reused are scanned again and observed later, with the same findings.
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 120)
+    assert _count_keep_alives(_collect_reused()) == len(first_responses)
@@ -0,0 +1,83 @@
+import os
+import json
+import time
+import threading
+
+from cloudforet.plugin.lib.file_store import FileStore, JSONArrayWriter, make_hash
+from cloudforet.plugin.lib.singleton import LazySingleton
+
+
+def test_make_hash_ignores_key_order():
+    assert make_hash({'a': 1, 'b': [1, 2]}) == make_hash({'b': [1, 2], 'a': 1})
+    assert make_hash({'a': 1}) != make_hash({'a': 2})
+    assert len(make_hash('value')) == 32
+    assert len(make_hash('value', digest_size=8)) == 16
+
+
+def test_json_array_writer_replaces_target_on_commit(tmp_path):
+    target = tmp_path / 'entry.json'
+    writer = JSONArrayWriter(str(tmp_path))
+    for index in range(3):
+        writer.write({'index': index})
+
+    assert not target.exists()
+
+    writer.commit(str(target), mtime=1000000000)
+    writer.discard()
+
+    assert json.loads(target.read_text()) == [{'index': 0}, {'index': 1}, {'index': 2}]
+    assert os.stat(target).st_mtime == 1000000000
+    assert os.listdir(tmp_path) == ['entry.json']
+
+
+def test_discarded_json_array_writer_leaves_nothing(tmp_path):
+    writer = JSONArrayWriter(str(tmp_path))
+    writer.write({'index': 0})
+    writer.discard()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_evict_expired_removes_entries_with_sidecars(tmp_path):
+    class _Store(FileStore):
+        sidecar_suffixes = ('.checks',)
+
+    store = _Store(str(tmp_path))
+    for name, mtime in [('old', time.time() - 100), ('new', time.time())]:
+        store._write_json_file(str(tmp_path / f'{name}.json'), [])
+        store._write_json_file(str(tmp_path / f'{name}.checks'), [])
+        os.utime(tmp_path / f'{name}.json', (mtime, mtime))
+
+    assert store._evict_expired(50) == 1
+    assert sorted(os.listdir(tmp_path)) == ['new.checks', 'new.json']
+
+
+def test_lazy_singleton_creates_once():
+    created = []
+    singleton = LazySingleton(lambda: created.append(object()) or created[-1])
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(singleton.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(result is created[0] for result in results)
+
+    singleton.reset()
+    assert singleton.get() is not created[0]
+
+
+def test_stores_are_created_from_partial_config(monkeypatch):
+    from spaceone.core import config
+    from cloudforet.plugin.connector import aws_prowler_connector
+
+    # e.g. a deployment that overrides SCAN_CACHE with only the keys it changes
+    monkeypatch.setattr(config, 'get_global', lambda key, default=None: {'enabled': True})
+
+    scan_cache = aws_prowler_connector._make_scan_cache()
+    assert (scan_cache.path, scan_cache.ttl, scan_cache.max_size) == ('/tmp/prowler-scan-cache', 600, 1024 ** 3)
+    assert aws_prowler_connector._make_checkpoint_store().path == '/tmp/prowler-checkpoints'
+    assert aws_prowler_connector._make_check_result_store().path == '/tmp/prowler-check-results'
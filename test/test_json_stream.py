@@ -0,0 +1,60 @@
+import gzip
+import json
+import zipfile
+
+import pytest
+
+_ITEMS = [1, 23, 456, -7.5e3, 1.5e-300, 'a "quoted", string', None, True, [], {},
+          {'nested': [1, {'deep': 'x' * 100}]}, 89]
+
+
+def _iter_json_array(file_path, **kwargs) -> list:
+    from cloudforet.plugin.lib.json_stream import iter_json_array
+
+    return list(iter_json_array(str(file_path), **kwargs))
+
+
+@pytest.mark.parametrize('separators', [(', ', ': '), (',', ':'), (',\n  ', ': ')])
+def test_items_split_over_chunks(tmp_path, separators):
+    file_path = tmp_path / 'output.json'
+    file_path.write_text(json.dumps(_ITEMS, separators=separators))
+
+    # Every chunk boundary falls somewhere inside or between the items, numbers included.
+    for chunk_size in range(1, 40):
+        assert _iter_json_array(file_path, chunk_size=chunk_size) == _ITEMS, f'chunk_size = {chunk_size}'
+
+
+def test_compressed_and_archived_files(tmp_path):
+    with gzip.open(tmp_path / 'output.json.gz', 'wt') as f:
+        json.dump(_ITEMS, f)
+
+    with zipfile.ZipFile(tmp_path / 'output.zip', 'w') as archive:
+        archive.writestr('prowler/output.json', json.dumps(_ITEMS))
+
+    assert _iter_json_array(tmp_path / 'output.json.gz', chunk_size=7) == _ITEMS
+    assert _iter_json_array(tmp_path / 'output.zip', chunk_size=7) == _ITEMS
+
+
+@pytest.mark.parametrize('content', ['', '   ', '[]', ' [ ] '])
+def test_empty_files(tmp_path, content):
+    file_path = tmp_path / 'output.json'
+    file_path.write_text(content)
+
+    assert _iter_json_array(file_path) == []
+
+
+@pytest.mark.parametrize('content', ['{"a": 1}', '[1, 2', '[1, {"a": }]', '[{"a": "unterminated]'])
+def test_malformed_files(tmp_path, content):
+    file_path = tmp_path / 'output.json'
+    file_path.write_text(content)
+
+    with pytest.raises(ValueError):
+        _iter_json_array(file_path, chunk_size=3)
+
+
+def test_malformed_item_does_not_read_the_rest_of_the_file(tmp_path):
+    file_path = tmp_path / 'output.json'
+    file_path.write_text('[{"a": 1}, {"a": ' + 'x' * 100000 + ', {"a": 2}]')
+
+    with pytest.raises(ValueError, match='larger than 1000 characters'):
+        _iter_json_array(file_path, chunk_size=100, max_item_size=1000)
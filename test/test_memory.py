@@ -0,0 +1,89 @@
+""" Peak memory of the findings pipeline must not grow with the size of prowler's output.json
+
+The generated output.json is 32 MB, twice the largest allowed peak, so the suite stays fast. The peaks do not depend
+on the file size: MEMORY_TEST_FILE_SIZE_MB=300 checks the same bounds against an output of a large account.
+"""
+import os
+import json
+import tracemalloc
+
+import pytest
+
+from synthetic import make_compliance_framework_info, make_check_results, parse_status_mix
+
+_FILE_SIZE = int(os.environ.get('MEMORY_TEST_FILE_SIZE_MB', 32)) * 1024 * 1024
+_CLOUD_SERVICE_TYPES = ['CIS-1.5', 'SOC2']
+_REQUIREMENTS = 200
+_TEMPLATE_FINDINGS = 1000
+
+_MAX_STREAM_PEAK = 12 * 1024 * 1024
+_MAX_AGGREGATION_PEAK = 16 * 1024 * 1024
+
+
+@pytest.fixture(scope='module')
+def large_output_file(tmp_path_factory):
+    """ Synthetic output.json of _FILE_SIZE bytes, the template findings are repeated with unique resources """
+    file_path = str(tmp_path_factory.mktemp('prowler') / 'output.json')
+    check_results = make_check_results(_CLOUD_SERVICE_TYPES, _TEMPLATE_FINDINGS, 300, _REQUIREMENTS, 17,
+                                       parse_status_mix('PASS=0.6,FAIL=0.3,INFO=0.1'))
+
+    findings = 0
+    written = 0
+    with open(file_path, 'w') as f:
+        f.write('[')
+        while written < _FILE_SIZE:
+            for check_result in check_results:
+                check_result = dict(check_result, FindingUniqueId=f'{check_result["FindingUniqueId"]}-{findings}',
+                                    ResourceId=f'synthetic-resource-{findings}')
+                item = (',\n' if findings else '') + json.dumps(check_result)
+                f.write(item)
+                written += len(item)
+                findings += 1
+        f.write(']')
+
+    return file_path, findings
+
+
+def _measure_peak(func) -> tuple:
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_iter_json_array_peak_memory(large_output_file):
+    from cloudforet.plugin.lib.json_stream import iter_json_array
+
+    file_path, findings = large_output_file
+    count, peak = _measure_peak(lambda: sum(1 for _ in iter_json_array(file_path)))
+
+    assert count == findings
+    assert peak < _MAX_STREAM_PEAK, f'peak {peak} bytes while streaming {os.path.getsize(file_path)} bytes'
+
+
+def test_make_compliance_results_peak_memory(large_output_file):
+    from cloudforet.plugin.lib.json_stream import iter_json_array
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    file_path, findings = large_output_file
+    manager = AWSProwlerManager()
+    manager.cloud_service_types = _CLOUD_SERVICE_TYPES
+    manager.cloud_service_type = _CLOUD_SERVICE_TYPES[0]
+    manager.compliance_framework_info = make_compliance_framework_info(_CLOUD_SERVICE_TYPES, _REQUIREMENTS)
+    # Only the requirement statistics are kept, so the results themselves do not grow with the findings.
+    manager.finding_detail = 'none'
+
+    consumed = [0]
+
+    def _iter_check_results():
+        for check_result in iter_json_array(file_path):
+            consumed[0] += 1
+            yield check_result
+
+    compliance_results, peak = _measure_peak(lambda: manager.make_compliance_results(_iter_check_results()))
+
+    assert len(compliance_results) > 0
+    assert consumed[0] == findings
+    assert peak < _MAX_AGGREGATION_PEAK, f'peak {peak} bytes while aggregating {os.path.getsize(file_path)} bytes'
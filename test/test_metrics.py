@@ -0,0 +1,121 @@
+""" Phase timings of a collect, exported in the Prometheus text format """
+import re
+import time
+
+import pytest
+
+from fakes.fake_framework import REGIONS, RESOURCES_PER_REGION, get_framework_checks
+
+_SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?P<labels>.*)\})? (?P<value>\S+)$')
+_LABEL = re.compile(r'(?P<key>[a-zA-Z_][a-zA-Z0-9_]*)="(?P<value>(?:[^"\\]|\\.)*)"')
+_PHASES = ['admission_wait', 'load_compliance_framework_info', 'prowler_execution', 'json_loading', 'aggregation',
+           'conversion', 'response_validation', 'response_streaming']
+
+
+def _parse(text: str) -> tuple:
+    """ Types of the metrics and their samples as {(name, ((label, value), ...)): value} """
+    types = {}
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            types[name] = metric_type
+        elif line and not line.startswith('#'):
+            match = _SAMPLE.match(line)
+            assert match, f'invalid sample: {line}'
+            labels = tuple(sorted((label['key'], label['value'])
+                                  for label in _LABEL.finditer(match['labels'] or '')))
+            samples[(match['name'], labels)] = float(match['value'])
+
+    return types, samples
+
+
+def _get_metric_name(sample_name: str, types: dict) -> str:
+    for suffix in ['_bucket', '_sum', '_count']:
+        if sample_name.endswith(suffix) and types.get(sample_name[:-len(suffix)]) == 'histogram':
+            return sample_name[:-len(suffix)]
+
+    return sample_name
+
+
+@pytest.fixture
+def metrics_registry(plugin_config, tmp_path, monkeypatch):
+    """ A registry of its own, written to a text file under the test's temp dir """
+    from cloudforet.plugin.lib import metrics
+    from cloudforet.plugin.manager import aws_prowler_manager
+
+    registry = metrics.MetricsRegistry()
+    for name, metric_type, description in aws_prowler_manager._METRICS:
+        registry.describe(name, metric_type, description)
+
+    monkeypatch.setattr(metrics, '_REGISTRY', registry)
+    plugin_config.set_global(METRICS={'enabled': True, 'path': str(tmp_path / 'metrics' / 'prowler_collector.prom')})
+    return tmp_path / 'metrics' / 'prowler_collector.prom'
+
+
+def test_phase_excludes_the_time_of_nested_phases():
+    from cloudforet.plugin.lib.metrics import PhaseTimer
+
+    phase_timer = PhaseTimer()
+
+    def _load():
+        for item in range(3):
+            time.sleep(0.1)
+            yield item
+
+    with phase_timer.phase('aggregation', exclude=['json_loading']):
+        assert list(phase_timer.time_iter('json_loading', _load(), count_name='findings')) == [0, 1, 2]
+        time.sleep(0.05)
+
+    assert phase_timer.phases['json_loading'] >= 0.3
+    # Without the loading time, which would make it at least 0.35 seconds
+    assert 0.05 <= phase_timer.phases['aggregation'] < 0.3
+    assert phase_timer.counts == {'findings': 3}
+
+
+def test_resource_usage_sums_cpu_and_keeps_the_peak_rss():
+    from cloudforet.plugin.lib.metrics import PhaseTimer
+
+    phase_timer = PhaseTimer()
+    phase_timer.add_resource_usage(1.5, 100)
+    phase_timer.add_resource_usage(2.0, 300)
+    phase_timer.add_resource_usage(0.5, 200)
+
+    assert phase_timer.resource_usage == {'cpu_seconds': 4.0, 'peak_rss': 300}
+
+
+def test_collect_writes_its_metrics(fake_prowler, secret_data, metrics_registry, monkeypatch):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    options = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': 'CIS-1.5', 'scan_concurrency': 2}
+    responses = list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+    monkeypatch.setenv('FAKE_PROWLER_FAIL_REGION', REGIONS[0])
+    list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+
+    types, samples = _parse(metrics_registry.read_text())
+
+    # Every sample belongs to a described metric.
+    assert {_get_metric_name(name, types) for name, _ in samples} <= set(types)
+
+    labels = (('framework', 'CIS-1.5'), ('provider', 'aws'))
+    assert samples[('prowler_collector_collects_total', labels + (('state', 'success'),))] == 1
+    assert samples[('prowler_collector_collects_total', labels + (('state', 'failure'),))] == 1
+    assert samples[('prowler_collector_findings_total', labels)] == \
+        len(get_framework_checks('cis_1.5_aws')) * len(REGIONS) * RESOURCES_PER_REGION
+    assert samples[('prowler_collector_resources_total', labels)] == len(responses)
+    assert samples[('prowler_collector_scan_cpu_seconds_total', labels)] > 0
+    assert samples[('prowler_collector_scan_peak_rss_bytes', labels)] > 0
+    assert samples[('prowler_collector_admission_running', ())] == 0
+
+    for phase in _PHASES:
+        phase_labels = tuple(sorted(labels + (('phase', phase),)))
+        count = samples[('prowler_collector_phase_duration_seconds_count', phase_labels)]
+        assert count >= 1, phase
+
+        buckets = sorted(((float(dict(sample_labels)['le']), value) for (name, sample_labels), value
+                          in samples.items() if name == 'prowler_collector_phase_duration_seconds_bucket'
+                          and tuple(label for label in sample_labels if label[0] != 'le') == phase_labels))
+        # Cumulative buckets, the last (+Inf) one holds every observation.
+        assert [value for _, value in buckets] == sorted(value for _, value in buckets)
+        assert buckets[-1] == (float('inf'), count)
+        assert samples[('prowler_collector_phase_duration_seconds_sum', phase_labels)] >= 0
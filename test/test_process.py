@@ -0,0 +1,100 @@
+""" Prowler processes run under a wall clock timeout and memory limits, with the tail of their stderr """
+import os
+import sys
+import time
+
+import pytest
+
+from fakes.fake_framework import REGIONS
+
+pytestmark = pytest.mark.skipif(not os.path.isdir('/proc'), reason='process states are read from /proc')
+
+_MB = 1024 * 1024
+
+
+def _python(code: str) -> list:
+    return [sys.executable, '-c', code]
+
+
+def _collect(secret_data: dict) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    options = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': 'CIS-1.5'}
+    return list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+
+
+def test_finished_process_reports_its_resource_usage():
+    from cloudforet.plugin.lib.process import run_process
+
+    result = run_process(_python('import sys; data = b"x" * (64 * 1024 * 1024); sys.exit(3)'))
+
+    assert result.returncode == 3
+    assert result.wall_time > 0
+    assert result.peak_rss >= 64 * _MB
+
+
+def test_timeout_kills_the_process():
+    from cloudforet.plugin.lib.process import run_process, ProcessLimitExceededError
+
+    started_at = time.monotonic()
+    with pytest.raises(ProcessLimitExceededError, match='time limit of 0.5 seconds'):
+        run_process(_python('import sys, time; print("scanning", file=sys.stderr, flush=True); time.sleep(30)'),
+                    timeout=0.5)
+
+    assert time.monotonic() - started_at < 10
+
+
+def test_rss_limit_counts_the_whole_process_group():
+    from cloudforet.plugin.lib.process import run_process, ProcessLimitExceededError
+
+    # The command itself stays small, its child takes the memory, like prowler's own workers.
+    child = 'import time; data = b"x" * (200 * 1024 * 1024); time.sleep(30)'
+    code = f'import subprocess, sys; subprocess.run([sys.executable, "-c", {child!r}])'
+
+    started_at = time.monotonic()
+    with pytest.raises(ProcessLimitExceededError, match='memory limit of 104857600 bytes'):
+        run_process(_python(code), max_rss=100 * _MB)
+
+    assert time.monotonic() - started_at < 10
+
+
+def test_virtual_memory_limit_fails_large_allocations():
+    from cloudforet.plugin.lib.process import run_process
+
+    if not hasattr(pytest.importorskip('resource'), 'prlimit'):
+        pytest.skip('RLIMIT_AS is set with prlimit')
+
+    result = run_process(_python('data = b"x" * (512 * 1024 * 1024)'), max_virtual_memory=256 * _MB)
+
+    assert result.returncode != 0
+    assert b'MemoryError' in result.stderr
+
+
+def test_stderr_keeps_its_tail():
+    from cloudforet.plugin.lib.process import run_process
+
+    code = 'import sys\nfor i in range(10000): print(f"line {i:05}", file=sys.stderr)'
+    result = run_process(_python(code), stderr_tail_size=100)
+
+    dropped = 10000 * len('line 00000\n') - 100
+    assert result.stderr.startswith(f'... ({dropped} bytes truncated)\n'.encode())
+    assert result.stderr.endswith(b'line 09999\n')
+    assert len(result.stderr.split(b'\n', 1)[1]) == 100
+
+
+def test_scan_over_the_limits_is_an_error_of_the_collect(plugin_config, fake_prowler, secret_data, tmp_path,
+                                                         monkeypatch):
+    monkeypatch.setenv('FAKE_PROWLER_DELAY', '30')
+    monkeypatch.setenv('FAKE_PROWLER_PID_DIR', str(tmp_path))
+    monkeypatch.setenv('FAKE_PROWLER_MEMORY', str(200 * _MB))
+
+    plugin_config.set_global(PROWLER_LIMITS={'max_rss': 100 * _MB})
+    responses = _collect(secret_data)
+    assert [response['resource_type'] for response in responses] == ['inventory.ErrorResource']
+    assert 'memory limit' in responses[0]['message']
+
+    plugin_config.set_global(PROWLER_LIMITS={'max_rss': 0, 'timeout': 1})
+    monkeypatch.setenv('FAKE_PROWLER_MEMORY', '0')
+    responses = _collect(secret_data)
+    assert [response['resource_type'] for response in responses] == ['inventory.ErrorResource']
+    assert 'time limit' in responses[0]['message']
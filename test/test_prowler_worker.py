@@ -0,0 +1,110 @@
+import sys
+import time
+
+import pytest
+
+from cloudforet.plugin.lib import prowler_worker
+
+
+@pytest.fixture
+def worker_pool():
+    yield
+    prowler_worker._reset_pool()
+
+
+def test_execute_prowler_without_prowler_raises_import_error(monkeypatch, worker_pool):
+    monkeypatch.setattr(prowler_worker, '_is_prowler_installed', lambda: False)
+
+    with pytest.raises(ImportError):
+        prowler_worker.execute_prowler(['aws'], {})
+
+
+def test_failed_preload_keeps_the_pool_usable(monkeypatch, worker_pool):
+    if prowler_worker._is_prowler_installed():
+        pytest.skip('prowler is installed')
+
+    # The workers cannot import prowler, their initializer must not break the pool.
+    monkeypatch.setattr(prowler_worker, '_is_prowler_installed', lambda: True)
+
+    for _ in range(2):
+        with pytest.raises(ImportError):
+            prowler_worker.execute_prowler(['aws'], {})
+
+
+def test_purge_service_modules_keeps_service_models(monkeypatch):
+    prefix = 'prowler.providers.aws.services.'
+    module_names = [
+        'ec2', 'ec2.ec2_client', 'ec2.ec2_service', 'ec2.ec2_ami_public', 'ec2.ec2_ami_public.ec2_ami_public',
+        'iam.lib.policy'
+    ]
+    for module_name in module_names:
+        monkeypatch.setitem(sys.modules, prefix + module_name, object())
+
+    prowler_worker._purge_service_modules('aws')
+
+    assert [name for name in module_names if prefix + name in sys.modules] == [
+        'ec2', 'ec2.ec2_service', 'ec2.ec2_ami_public', 'iam.lib.policy'
+    ]
+
+
+def test_cancelled_scan_leaves_the_other_scans_of_its_pool(fake_prowler_worker):
+    import threading
+    from cloudforet.plugin.lib.cancellation import CancellationToken
+
+    results = {}
+
+    def _scan(name: str, delay: float, cancellation_token: CancellationToken = None):
+        try:
+            results[name] = prowler_worker.execute_prowler(['aws', '--checks', 'ec2_check_0', '-f', 'us-east-1'],
+                                                          {'FAKE_PROWLER_DELAY': str(delay)}, max_workers=2,
+                                                          cancellation_token=cancellation_token)
+        except prowler_worker.ProwlerWorkerError as e:
+            results[name] = e
+
+    # Start the pool, so that both scans are running when one of them is cancelled.
+    _scan('warm_up', 0)
+    cancellation_token = CancellationToken()
+    threads = [threading.Thread(target=_scan, args=('cancelled', 60, cancellation_token)),
+               threading.Thread(target=_scan, args=('other', 2))]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(1)
+    cancellation_token.cancel()
+    for thread in threads:
+        thread.join(30)
+
+    assert isinstance(results['cancelled'], prowler_worker.ProwlerWorkerCancelledError)
+    # The other scan ran again in a new pool.
+    assert results['other'] == results['warm_up'] != []
+    assert prowler_worker.execute_prowler(['aws'], {}, max_workers=2) != []
+
+
+def test_scan_cancelled_before_it_started_keeps_the_pool(fake_prowler_worker):
+    from cloudforet.plugin.lib.cancellation import CancellationToken
+
+    prowler_worker.execute_prowler(['aws'], {}, max_workers=1)
+    pool = prowler_worker._get_pool(1)
+
+    cancellation_token = CancellationToken()
+    cancellation_token.cancel()
+    with pytest.raises(prowler_worker.ProwlerWorkerCancelledError):
+        prowler_worker.execute_prowler(['aws'], {}, max_workers=1, cancellation_token=cancellation_token)
+
+    assert prowler_worker._get_pool(1) is pool
+
+
+def test_worker_collect_matches_subprocess_collect(plugin_config, fake_prowler, fake_prowler_worker, secret_data):
+    from fakes.fake_framework import REGIONS
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    options = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': ['CIS-1.5', 'SOC2'],
+               'scan_concurrency': 2, 'check_batch_size': 3}
+
+    def _collect(execution_mode: str) -> list:
+        plugin_config.set_global(PROWLER_EXECUTION_MODE=execution_mode)
+        return list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+
+    worker_responses = _collect('worker')
+    assert [response for response in worker_responses if response['resource_type'] == 'inventory.ErrorResource'] == []
+    assert worker_responses == _collect('subprocess')
@@ -0,0 +1,121 @@
+""" A stored prowler output gives the results of the scan that wrote it, through the option and the CLI """
+import io
+import os
+import gzip
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from fakes.fake_framework import CHECKS, REGIONS, make_findings
+
+_OPTIONS = {'provider': 'aws', 'regions': REGIONS, 'compliance_framework': ['CIS-1.5', 'SOC2']}
+
+
+def _write_output(replay_dir, name: str) -> str:
+    """ The findings of a full fake prowler scan, stored plain, compressed or in an archive """
+    content = json.dumps(make_findings(CHECKS, REGIONS)).encode()
+    path = replay_dir / name
+
+    if name.endswith('.json'):
+        path.write_bytes(content)
+    elif name.endswith('.json.gz'):
+        path.write_bytes(gzip.compress(content))
+    elif name.endswith('.zip'):
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('output/prowler-output.json', content)
+    else:
+        with tarfile.open(path, 'w:gz') as archive:
+            member = tarfile.TarInfo('output/prowler-output.json')
+            member.size = len(content)
+            archive.addfile(member, io.BytesIO(content))
+
+    return str(path)
+
+
+def _collect(options: dict, secret_data: dict) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    return list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+
+
+@pytest.fixture
+def replay_dir(plugin_config, fake_compliance_frameworks, tmp_path):
+    replay_dir = tmp_path / 'replay'
+    replay_dir.mkdir()
+    plugin_config.set_global(REPLAY={'enabled': True, 'path': str(replay_dir)})
+    return replay_dir
+
+
+@pytest.mark.parametrize('name', ['output.json', 'output.json.gz', 'output.zip', 'output.tar.gz'])
+def test_replay_gives_the_results_of_the_scan(fake_prowler, replay_dir, secret_data, name):
+    scanned_responses = _collect(_OPTIONS, secret_data)
+    _write_output(replay_dir, name)
+
+    replayed_responses = _collect(dict(_OPTIONS, replay_file=name), {})
+
+    assert replayed_responses == scanned_responses
+
+
+@pytest.mark.parametrize('replay_file', ['../outside.json', '{outside}', 'link.json', 'missing.json'])
+def test_replay_file_must_be_inside_the_replay_directory(replay_dir, tmp_path, replay_file):
+    from spaceone.core.error import ERROR_INVALID_PARAMETER
+
+    outside_file = _write_output(tmp_path, 'outside.json')
+    os.symlink(outside_file, replay_dir / 'link.json')
+
+    with pytest.raises(ERROR_INVALID_PARAMETER):
+        _collect(dict(_OPTIONS, replay_file=replay_file.format(outside=outside_file)), {})
+
+
+def test_replay_must_be_enabled(plugin_config, replay_dir):
+    from spaceone.core.error import ERROR_INVALID_PARAMETER
+
+    _write_output(replay_dir, 'output.json')
+    plugin_config.set_global(REPLAY={'enabled': False})
+
+    with pytest.raises(ERROR_INVALID_PARAMETER, match='not enabled'):
+        _collect(dict(_OPTIONS, replay_file='output.json'), {})
+
+
+def test_invalid_replay_file_is_an_error_of_the_collect(replay_dir):
+    (replay_dir / 'output.json.gz').write_bytes(b'not gzip')
+
+    responses = _collect(dict(_OPTIONS, replay_file='output.json.gz'), {})
+
+    resource_types = [response['resource_type'] for response in responses]
+    assert [resource_type for resource_type in resource_types if resource_type != 'inventory.CloudServiceType'] == \
+        ['inventory.ErrorResource']
+    assert 'Replay file is invalid' in responses[-1]['message']
+
+
+@pytest.mark.parametrize('compliance_framework_args', [['-c', 'CIS-1.5', '-c', 'SOC2'], ['-c', 'all']])
+def test_cli_writes_the_results_of_the_scan(fake_prowler, replay_dir, secret_data, tmp_path, capsys,
+                                            compliance_framework_args):
+    from cloudforet.plugin import replay
+
+    scanned_responses = _collect(_OPTIONS, secret_data)
+    replay_file = _write_output(replay_dir, 'output.zip')
+    output_file = tmp_path / 'results.jsonl'
+
+    exit_code = replay.main([replay_file, *compliance_framework_args, '--output', str(output_file), '--repeat', '2',
+                             '--protobuf', '--options', json.dumps({'regions': REGIONS})])
+
+    assert exit_code == 0
+    replayed_responses = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert replayed_responses == json.loads(json.dumps(scanned_responses, default=str))
+    assert 'replays: 2' in capsys.readouterr().err
+
+
+def test_cli_fails_on_an_invalid_replay_file(fake_compliance_frameworks, tmp_path, capsys):
+    from cloudforet.plugin import replay
+
+    replay_file = tmp_path / 'output.json'
+    replay_file.write_text('[{"CheckID": ')
+
+    assert replay.main([str(replay_file), '-c', 'CIS-1.5']) == 1
+    assert 'Replay file is invalid' in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        replay.main([str(tmp_path / 'missing.json'), '-c', 'CIS-1.5'])
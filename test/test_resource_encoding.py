@@ -0,0 +1,89 @@
+""" ResourceInfo encodes the resources in place, the bytes must be those of change_struct_type """
+from enum import Enum
+
+import pytest
+
+from fakes.fake_framework import REGIONS
+
+
+class _Color(str, Enum):
+    red = 'RED'
+
+
+_RESOURCES = {
+    'empty': {},
+    'none': {'name': None, 'data': {'value': None}, 'tags': [None]},
+    'str_enum': {'state': _Color.red, 'data': {'colors': [_Color.red, 'RED']}},
+    'scalars': {'count': 3, 'ratio': 0.5, 'enabled': True, 'disabled': False, 'large': 2 ** 40},
+    'empty_containers': {'data': {}, 'tags': [], 'nested': {'list': [[], {}], 'dict': {'empty': {}}}},
+    'metadata': {'metadata': {'view': {'sub_data': {'layouts': []}}, 'other': [1, 'a']}},
+    'empty_metadata': {'metadata': {}},
+    'metadata_without_view_dict': {'metadata': {'view': ['table'], 'search': None}},
+    'unicode': {'name': '규정 준수 ✓', 'data': {'description': 'line\nbreak "quoted"'}},
+}
+
+
+def _encode_reference(response: dict) -> bytes:
+    from spaceone.api.inventory.plugin import collector_pb2
+    from spaceone.core.pygrpc.message_type import change_struct_type
+
+    resource_info = collector_pb2.ResourceInfo(
+        state=response['state'], message=response.get('message', ''), resource_type=response['resource_type'],
+        match_rules=change_struct_type(response.get('match_rules')),
+        resource=change_struct_type(response.get('resource')))
+    return resource_info.SerializeToString(deterministic=True)
+
+
+def _encode(response: dict) -> bytes:
+    from cloudforet.plugin.info.collector_info import ResourceInfo
+
+    return ResourceInfo(response).SerializeToString(deterministic=True)
+
+
+def _collect(secret_data: dict, **options) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    options = dict({'provider': 'aws', 'regions': REGIONS}, **options)
+    return list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+
+
+@pytest.mark.parametrize('name', list(_RESOURCES.keys()))
+def test_resource_matches_change_struct_type(name):
+    from cloudforet.plugin.info.collector_info import _encode_resource
+    from google.protobuf import struct_pb2
+    from spaceone.core.pygrpc.message_type import change_struct_type
+
+    resource = _RESOURCES[name]
+    expected = change_struct_type(resource).SerializeToString(deterministic=True)
+
+    # The second encoding copies the view block from its template.
+    for _ in range(2):
+        struct = struct_pb2.Struct()
+        _encode_resource(struct, resource)
+        assert struct.SerializeToString(deterministic=True) == expected
+
+
+@pytest.mark.parametrize('response_validation', ['fast', 'full'])
+def test_collect_responses_match_change_struct_type(plugin_config, fake_prowler, secret_data, response_validation):
+    plugin_config.set_global(RESPONSE_VALIDATION=response_validation)
+
+    responses = _collect(secret_data, compliance_framework=['CIS-1.5', 'SOC2'], max_findings_per_resource=2)
+    # Cloud service types, compliance results and their finding pages
+    assert {response['resource_type'] for response in responses} == {'inventory.CloudServiceType',
+                                                                      'inventory.CloudService'}
+    assert {response['resource']['cloud_service_type'] for response in responses
+            if response['resource_type'] == 'inventory.CloudService'} == {'CIS-1.5', 'CIS-1.5-Findings', 'SOC2',
+                                                                          'SOC2-Findings'}
+
+    for response in responses:
+        assert _encode(response) == _encode_reference(response)
+
+
+def test_error_response_matches_change_struct_type(fake_prowler, secret_data, monkeypatch):
+    monkeypatch.setenv('FAKE_PROWLER_FAIL_REGION', REGIONS[0])
+
+    responses = _collect(secret_data, compliance_framework='CIS-1.5')
+    assert [response['resource_type'] for response in responses] == ['inventory.ErrorResource']
+
+    for response in responses:
+        assert _encode(response) == _encode_reference(response)
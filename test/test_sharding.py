@@ -0,0 +1,72 @@
+import pytest
+
+from fakes.fake_framework import REGIONS
+
+_SHARDED_OPTIONS = [
+    {'scan_concurrency': 3, 'check_batch_size': 2},
+    {'scan_concurrency': 2, 'check_batch_size': 5},
+    {'scan_concurrency': 4, 'check_batch_size': 1, 'regions': list(reversed(REGIONS))},
+]
+
+
+def _collect(options: dict, secret_data: dict) -> list:
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    options = dict({'provider': 'aws', 'regions': REGIONS}, **options)
+    responses = list(AWSProwlerManager().collect(options, secret_data, None, 'domain-test'))
+    assert [response for response in responses if response['resource_type'] == 'inventory.ErrorResource'] == []
+    return responses
+
+
+@pytest.mark.parametrize('compliance_framework', ['CIS-1.5', ['CIS-1.5', 'SOC2']])
+@pytest.mark.parametrize('sharded_options', _SHARDED_OPTIONS)
+def test_sharded_scan_matches_serial_scan(fake_prowler, secret_data, compliance_framework, sharded_options):
+    serial_responses = _collect({'compliance_framework': compliance_framework}, secret_data)
+    sharded_responses = _collect(dict(sharded_options, compliance_framework=compliance_framework), secret_data)
+
+    assert len(serial_responses) > 1
+    assert sharded_responses == serial_responses
+
+
+def test_streamed_scan_matches_serial_scan(fake_prowler, secret_data):
+    serial_responses = _collect({'compliance_framework': 'CIS-1.5'}, secret_data)
+    streamed_responses = _collect({'compliance_framework': 'CIS-1.5', 'scan_concurrency': 3, 'check_batch_size': 2,
+                                   'stream_results': True}, secret_data)
+
+    # Streamed requirements go out as soon as their checks complete, only their content must match.
+    def _get_resource_id(response: dict) -> str:
+        return response['resource']['reference']['resource_id'] if 'reference' in response['resource'] else ''
+
+    assert sorted(streamed_responses, key=_get_resource_id) == sorted(serial_responses, key=_get_resource_id)
+
+
+def test_first_check_gives_requirement_metadata(fake_prowler, secret_data):
+    from fakes.fake_framework import make_requirements
+
+    requirements = {requirement.Id: requirement for requirement in make_requirements('cis_1.5_aws')}
+    responses = _collect({'compliance_framework': 'CIS-1.5', 'scan_concurrency': 3, 'check_batch_size': 2},
+                         secret_data)
+
+    for response in responses:
+        if response['resource_type'] != 'inventory.CloudService':
+            continue
+
+        data = response['resource']['data']
+        first_check_id = min(requirements[data['requirement_id']].Checks)
+        assert data['description'] == f'Description of {first_check_id}.'
+        assert data['service'] == first_check_id.split('_', 1)[0]
+        assert [check['check_id'] for check in data['checks']] == sorted(requirements[data['requirement_id']].Checks)
+
+
+def test_requirements_are_in_framework_order(fake_prowler, secret_data):
+    from fakes.fake_framework import FRAMEWORKS, make_requirements
+
+    responses = _collect({'compliance_framework': ['SOC2', 'CIS-1.5'], 'scan_concurrency': 3,
+                          'check_batch_size': 2}, secret_data)
+
+    requirement_ids = [(response['resource']['cloud_service_type'], response['resource']['data']['requirement_id'])
+                       for response in responses if response['resource_type'] == 'inventory.CloudService']
+    # Frameworks in the order of the option, their requirements in the order of the framework.
+    expected_ids = [(cloud_service_type, requirement.Id) for cloud_service_type in ['SOC2', 'CIS-1.5']
+                    for requirement in make_requirements(FRAMEWORKS[cloud_service_type])]
+    assert list(dict.fromkeys(requirement_ids)) == expected_ids
@@ -0,0 +1,78 @@
+""" AWS credentials are verified with one STS identity call, and successful verifications are reused for a while """
+import pytest
+
+from fakes import fake_identity_connector
+from fakes.fake_identity_connector import INVALID_SECRET_ACCESS_KEY
+
+_OPTIONS = {'provider': 'aws'}
+
+
+@pytest.fixture
+def fake_identity(plugin_config, monkeypatch):
+    from cloudforet.plugin.manager import collector_manager
+
+    plugin_config.set_global(CONNECTORS={
+        'AWSIdentityConnector': {'backend': 'fakes.fake_identity_connector.FakeAWSIdentityConnector'}
+    })
+    monkeypatch.setattr(fake_identity_connector, 'CALLS', [])
+    monkeypatch.setattr(collector_manager, '_VERIFIED_CREDENTIALS', {})
+    return fake_identity_connector
+
+
+def _verify(secret_data: dict, **options):
+    from cloudforet.plugin.manager.aws_prowler_manager import AWSProwlerManager
+
+    AWSProwlerManager().verify_client(dict(_OPTIONS, **options), secret_data, None)
+
+
+def test_valid_credentials_are_verified(fake_identity, secret_data):
+    _verify(secret_data)
+
+    assert fake_identity.CALLS == [secret_data['aws_access_key_id']]
+
+
+def test_invalid_credentials_are_not_cached(fake_identity, secret_data):
+    from spaceone.core.error import ERROR_AUTHENTICATE_FAILURE
+
+    secret_data = dict(secret_data, aws_secret_access_key=INVALID_SECRET_ACCESS_KEY)
+    for _ in range(2):
+        with pytest.raises(ERROR_AUTHENTICATE_FAILURE):
+            _verify(secret_data)
+
+    assert len(fake_identity.CALLS) == 2
+
+
+def test_missing_credentials_are_not_sent(fake_identity):
+    from spaceone.core.error import ERROR_REQUIRED_PARAMETER
+
+    with pytest.raises(ERROR_REQUIRED_PARAMETER):
+        _verify({'aws_access_key_id': 'AKIAFAKE'})
+
+    assert fake_identity.CALLS == []
+
+
+def test_verified_credentials_are_reused_until_the_ttl(plugin_config, fake_identity, secret_data, monkeypatch):
+    from cloudforet.plugin.manager import collector_manager
+
+    plugin_config.set_global(VERIFY_CACHE_TTL=60)
+    now = collector_manager.time.monotonic()
+    monkeypatch.setattr(collector_manager.time, 'monotonic', lambda: now)
+
+    _verify(secret_data)
+    _verify(secret_data)
+    assert len(fake_identity.CALLS) == 1
+
+    # Other credentials, or the same ones with a role, are verified on their own.
+    _verify(dict(secret_data, aws_access_key_id='AKIAOTHER'))
+    _verify(dict(secret_data, role_arn='arn:aws:iam::210987654321:role/scan'))
+    assert len(fake_identity.CALLS) == 3
+
+    monkeypatch.setattr(collector_manager.time, 'monotonic', lambda: now + 61)
+    _verify(secret_data)
+    assert len(fake_identity.CALLS) == 4
+
+
+def test_prowler_verify_mode_runs_prowler(fake_prowler, fake_identity, secret_data):
+    _verify(secret_data, verify_mode='prowler')
+
+    assert fake_identity.CALLS == []